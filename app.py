@@ -4,14 +4,19 @@ Full v1.3 functionality with clean, vibrant UI design
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from collections import Counter
 from datetime import datetime
-import json
+import os
 import re
+import time
+
+# pandas, plotly and the engine's analysis modules are imported inside the
+# modes that use them, so a cold start on the Dashboard loads none of them
+from nexus_engine import (
+    default_store,
+    TIMINGS,
+    span,
+    timed
+)
 
 # ==================== PAGE CONFIG ====================
 
@@ -24,7 +29,7 @@ st.set_page_config(
 
 # ==================== VIBRANT STYLING ====================
 
-st.markdown("""
+PAGE_CSS = """
 <style>
 * {
     margin: 0;
@@ -195,7 +200,16 @@ hr {
     }
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def page_css():
+    """PAGE_CSS minified once per process; every rerun re-sends the same string"""
+    css = re.sub(r'/\*.*?\*/', '', PAGE_CSS, flags=re.DOTALL)
+    return re.sub(r'\s+', ' ', css).strip()
+
+with span('css'):
+    st.markdown(page_css(), unsafe_allow_html=True)
 
 # ==================== SESSION STATE ====================
 
@@ -204,74 +218,15 @@ if 'mode' not in st.session_state:
 if 'interactions' not in st.session_state:
     st.session_state.interactions = {'queries': 0, 'uploads': 0}
 
-# ==================== HELPER FUNCTIONS ====================
+# Analysis history on disk (NEXUS_STORE_PATH; empty disables it), shared by every session
+store = default_store()
 
-def validate_text(text, max_words=2000):
-    """Validate text input"""
-    if not text or len(text.strip()) < 10:
+def compaction_note(df):
+    """'12.3 KB in memory (was 40.1 KB as parsed)' for a compacted upload, else None"""
+    report = df.attrs.get('compaction') if df is not None else None
+    if not report:
         return None
-    if len(text.split()) > max_words:
-        return ' '.join(text.split()[:max_words])
-    return text
-
-def validate_csv(file, max_rows=1000):
-    """Validate CSV file"""
-    try:
-        df = pd.read_csv(file)
-        if df.empty or len(df.columns) < 2:
-            return None
-        return df.head(max_rows)
-    except:
-        return None
-
-def detect_echo_chamber(text):
-    """Simple echo chamber detection"""
-    words = text.lower().split()
-    word_freq = Counter(words)
-    top_words = word_freq.most_common(5)
-    
-    # If top words appear very frequently, likely echo chamber
-    if top_words and top_words[0][1] > len(words) * 0.15:
-        return True, top_words[0][0]
-    return False, None
-
-def calculate_mismatch(text, df):
-    """Calculate text-data mismatch score"""
-    if df is None or text is None:
-        return 0
-    
-    text_words = set(text.lower().split())
-    df_cols = set(str(df.columns).lower().split())
-    
-    overlap = len(text_words & df_cols)
-    total = len(text_words | df_cols)
-    
-    mismatch = 100 - (overlap / total * 100 if total > 0 else 0)
-    return max(0, min(100, mismatch))
-
-def generate_stories(text, df):
-    """Generate 3 story branches"""
-    stories = [
-        {
-            'title': '📈 Growth Path',
-            'description': 'Focus on expansion and new opportunities',
-            'outcome': '+15-20% growth potential',
-            'risk': 'Medium (35%)'
-        },
-        {
-            'title': '🛡️ Stability Path',
-            'description': 'Maintain current operations with optimization',
-            'outcome': '+5-8% steady growth',
-            'risk': 'Low (15%)'
-        },
-        {
-            'title': '🚀 Bold Path',
-            'description': 'Aggressive transformation and innovation',
-            'outcome': '+25-35% growth potential',
-            'risk': 'High (55%)'
-        }
-    ]
-    return stories
+    return f"{report['after_bytes'] / 1024:.1f} KB in memory (was {report['before_bytes'] / 1024:.1f} KB as parsed)"
 
 # ==================== DASHBOARD ====================
 
@@ -293,6 +248,15 @@ def show_dashboard():
     with col3:
         st.metric("Status", "🟢 Live")
     
+    # The job registry (and the engine behind it) only loads once this session has submitted a job
+    job = None
+    if 'hybrid_job_id' in st.session_state:
+        from nexus_engine import JOBS
+        job = JOBS.status(st.session_state.hybrid_job_id)
+    if job is not None and job['status'] in ('queued', 'running'):
+        st.info(f"⏳ Your analysis of {job['label']} is still running ({job['progress']:.0%}). "
+                "Open Hybrid to see the results.")
+    
     st.markdown("---")
     
     st.subheader("📊 Choose Your Analysis Mode")
@@ -307,33 +271,62 @@ def show_dashboard():
     
     with col3:
         st.info("**📊 Solo Mode**\n\nAnalyze CSV data with interactive visualizations")
+    
+    if store is not None and store.stats()['analyses']:
+        history = store.recent(limit=10)
+        if not history.empty:
+            st.markdown("---")
+            st.subheader("📚 Recent Analyses")
+            st.dataframe(
+                history[['created_at', 'text_name', 'csv_name', 'top_region', 'top_word', 'mismatch_score', 'is_echo']],
+                use_container_width=True, hide_index=True
+            )
+            keywords = store.top_keywords(limit=5)
+            if not keywords.empty:
+                st.caption("Most frequent echo keywords: " + ", ".join(keywords['keyword']))
 
 # ==================== NLQ MODE ====================
 
+@timed('nlq')
 def show_nlq_mode():
     """Natural Language Query Mode"""
+    from nexus_engine import (
+        NLQ_CACHE, generate_mock_df, generate_nlq_insights, generate_stories, parse_nlq_intent, query_history
+    )
+    
     st.title("💬 Natural Language Query")
     st.markdown("Ask your business question in plain English")
     
     st.markdown("---")
     
     query = st.text_area("What's your business question?", height=100, placeholder="e.g., Sales dropping in rural areas—how can I fix it?")
+    if query:
+        # Indexed rules: microseconds per query, so this runs on every edit
+        parsed = parse_nlq_intent(query)
+        terms = f" · key terms: {', '.join(parsed['key_terms'])}" if parsed['key_terms'] else ""
+        st.caption(f"🧭 Intent: {parsed['intent'].replace('_', ' ')} · sentiment: {parsed['sentiment']}{terms}")
     
     if st.button("🔍 Analyze", use_container_width=True):
         if query and len(query) > 10:
             st.session_state.interactions['queries'] += 1
             
             with st.spinner("🧠 Analyzing..."):
-                # Generate mock insights
-                insights = [
-                    "📊 Data shows regional disparities",
-                    "⚠️ Potential bias in strategy",
-                    "💡 Opportunity for diversification"
-                ]
+                def answer():
+                    # No upload here: insights come from mock data shaped by the intent
+                    parsed = parse_nlq_intent(query)
+                    insights = generate_nlq_insights(parsed, generate_mock_df(parsed))
+                    with span('nlq.stories'):
+                        stories = generate_stories(query, None)
+                    return {'insights': insights, 'stories': stories}
                 
-                stories = generate_stories(query, None)
+                # Rewordings of an earlier question reuse its answer
+                with span('nlq.answer'):
+                    result, kind, matched = NLQ_CACHE.get_or_compute(query, answer)
+                insights, stories = result['insights'], result['stories']
                 
                 st.success("✅ Analysis Complete!")
+                if kind == 'near':
+                    st.caption(f"⚡ Answered from a similar earlier question: “{matched}”")
                 
                 st.subheader("📈 Key Insights")
                 for insight in insights:
@@ -345,13 +338,155 @@ def show_nlq_mode():
                         st.write(f"**Description:** {story['description']}")
                         st.write(f"**Potential Outcome:** {story['outcome']}")
                         st.write(f"**Risk Level:** {story['risk']}")
+                
+                with span('nlq.history'):
+                    history = query_history(query, store)
+                if history is not None:
+                    st.subheader("📚 From Your Past Analyses")
+                    st.dataframe(
+                        history[['created_at', 'text_name', 'top_region', 'top_word', 'mismatch_score', 'is_echo']],
+                        use_container_width=True, hide_index=True
+                    )
         else:
             st.warning("Please ask a more specific question (at least 10 characters)")
 
 # ==================== HYBRID MODE ====================
 
+JOB_POLL_SECONDS = 0.2
+
+def wait_for_job(job_id):
+    """Progress bar while a background job is queued or running; its final status"""
+    from nexus_engine import JOBS
+    bar = st.progress(0.0, text="⏳ Queued...")
+    status = JOBS.status(job_id)
+    while status['status'] in ('queued', 'running'):
+        bar.progress(min(status['progress'], 1.0), text=f"🧠 {status['message'] or 'Analyzing...'}")
+        time.sleep(JOB_POLL_SECONDS)
+        status = JOBS.status(job_id)
+    bar.empty()
+    return status
+
+def session_id():
+    """Stable id of this browser session, which jobs record as a follower"""
+    if 'session_id' not in st.session_state:
+        import uuid
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def forget_hybrid_job():
+    """Drop this session's analysis job and the uploads it was for"""
+    st.session_state.pop('hybrid_job_id', None)
+    st.session_state.pop('hybrid_upload', None)
+
+def follow_hybrid_job(key):
+    """(analyzed, result) of this session's analysis job, if it is for the uploads under key"""
+    from nexus_engine import JOBS
+    job_id = st.session_state.get('hybrid_job_id')
+    status = JOBS.status(job_id)
+    if status is None or status['key'] != key:
+        return False, None
+    if status['status'] in ('queued', 'running'):
+        if st.button("✖️ Cancel analysis", key='cancel_hybrid'):
+            # Other sessions sharing the job keep it running
+            stopped = JOBS.cancel(job_id, follower=session_id())
+            forget_hybrid_job()
+            st.info("Analysis cancelled" if stopped else
+                    "Analysis cancelled for you; it keeps running for the other sessions that asked for it")
+            return False, None
+        status = wait_for_job(job_id)
+    if status['status'] == 'done':
+        return True, JOBS.result(job_id)
+    if status['status'] == 'failed':
+        st.error(f"❌ Analysis failed: {status['error']}")
+    elif status['status'] == 'cancelled':
+        st.warning("✖️ This analysis was cancelled. Press Analyze to run it again.")
+    forget_hybrid_job()
+    return False, None
+
+def resume_hybrid_analysis():
+    """(analyzed, result) of this session's last Hybrid analysis, found by its key without the uploads"""
+    from nexus_engine import RESULT_CACHE
+    upload = st.session_state.hybrid_upload
+    st.caption(f"📎 {upload['text_name']} + {upload['csv_name']} (upload files to analyze others)")
+    result = RESULT_CACHE.get(upload['key'])
+    if result is not None:
+        return True, result
+    return follow_hybrid_job(upload['key'])
+
+def run_hybrid_analysis(text_file, csv_file):
+    """(analyzed, result) of a capped Hybrid analysis, run as a job in a worker process
+
+    The job id, input key and file names stay in session_state, so reruns
+    and trips to other modes (which clear the uploaders) pick the job up
+    again; another session with the same uploads shares it.
+    """
+    from nexus_engine import (
+        JOBS, RESULT_CACHE, QueueFull, analysis_key, analyze_upload_job, content_hash, default_columnar
+    )
+    
+    columnar = default_columnar()
+    text_data, csv_data = text_file.getvalue(), csv_file.getvalue()
+    key = analysis_key(text_data, csv_data)
+    st.session_state.hybrid_upload = {'key': key, 'text_name': text_file.name, 'csv_name': csv_file.name}
+    result = RESULT_CACHE.get(key)
+    if result is not None:
+        return True, result
+    try:
+        # Inline (under the spinner) when NEXUS_WORKERS=0
+        with st.spinner("🧠 Analyzing..."):
+            st.session_state.hybrid_job_id = JOBS.submit(
+                key, analyze_upload_job, text_data, csv_data,
+                store_path=store.path if store is not None else None,
+                columnar_dir=columnar.directory if columnar is not None else None,
+                text_name=text_file.name, csv_name=csv_file.name, label=text_file.name,
+                tags=(content_hash(text_data), content_hash(csv_data)), follower=session_id()
+            )
+    except QueueFull:
+        st.warning("⏳ Every analysis worker is busy. Please try again in a moment.")
+        return False, None
+    return follow_hybrid_job(key)
+
+def echo_network_figure(graph):
+    """Plotly network of the co-occurring keywords: size by frequency, colour by centrality"""
+    import networkx as nx
+    import plotly.graph_objects as go
+    
+    graph = graph.subgraph([term for term, degree in graph.degree() if degree])
+    positions = nx.spring_layout(graph, weight='weight', seed=0)
+    edge_x, edge_y = [], []
+    for a, b in graph.edges():
+        edge_x += [positions[a][0], positions[b][0], None]
+        edge_y += [positions[a][1], positions[b][1], None]
+    terms = list(graph.nodes)
+    fig = go.Figure([
+        go.Scatter(x=edge_x, y=edge_y, mode='lines', line=dict(width=1, color='#C7D2FE'), hoverinfo='none'),
+        go.Scatter(
+            x=[positions[t][0] for t in terms], y=[positions[t][1] for t in terms],
+            mode='markers+text', text=terms, textposition='top center',
+            marker=dict(
+                size=[10 + 2 * graph.nodes[t]['frequency'] ** 0.5 for t in terms],
+                color=[graph.nodes[t]['centrality'] for t in terms], colorscale='Viridis', showscale=True
+            ),
+            hovertext=[f"{t}: {graph.nodes[t]['frequency']} mentions" for t in terms], hoverinfo='text'
+        )
+    ])
+    fig.update_layout(
+        showlegend=False, template="plotly_white", height=450,
+        xaxis=dict(visible=False), yaxis=dict(visible=False)
+    )
+    return fig
+
+@timed('hybrid')
 def show_hybrid_mode():
     """Hybrid Mode - Text + CSV"""
+    import pandas as pd
+    from nexus_engine import (
+        analysis_key, analyze_lineage_upload, build_echo_graph, default_columnar, load_csv_upload,
+        load_text_upload, rank_echo_clusters, series_echoes_upload
+    )
+    
+    # Arrow copies of accepted CSV uploads (NEXUS_COLUMNAR_DIR; needs pyarrow), memory-mapped on reload
+    columnar = default_columnar()
     st.title("📤 Hybrid Analysis")
     st.markdown("Upload meeting notes + sales data to detect biases")
     
@@ -364,7 +499,8 @@ def show_hybrid_mode():
         text_file = st.file_uploader("Upload TXT file", type=['txt'], key='txt_hybrid')
         text_content = None
         if text_file:
-            text_content = text_file.read().decode('utf-8')
+            with span('hybrid.load_text'):
+                text_content = load_text_upload(text_file.getvalue())
             st.success(f"✅ Loaded {len(text_content)} characters")
     
     with col2:
@@ -372,50 +508,128 @@ def show_hybrid_mode():
         csv_file = st.file_uploader("Upload CSV file", type=['csv'], key='csv_hybrid')
         df = None
         if csv_file:
-            df = validate_csv(csv_file)
+            with span('hybrid.load_csv'):
+                df = load_csv_upload(csv_file.getvalue(), columnar=columnar)
             if df is not None:
                 st.success(f"✅ Loaded {len(df)} rows")
+                if compaction_note(df):
+                    st.caption(f"🗜️ {compaction_note(df)}")
             else:
                 st.error("Invalid CSV format")
     
     st.markdown("---")
     
+    full_data = st.checkbox("🔭 Analyze full data (no 1,000-row / 2,000-word caps)", key='full_hybrid')
+    
+    analyzed, result = False, None
     if st.button("🔍 Analyze", use_container_width=True):
         if text_content and df is not None:
             st.session_state.interactions['uploads'] += 1
             
-            with st.spinner("🧠 Analyzing..."):
-                # Detect echo chamber
-                is_echo, top_word = detect_echo_chamber(text_content)
-                mismatch = calculate_mismatch(text_content, df)
-                stories = generate_stories(text_content, df)
-                
-                st.success("✅ Analysis Complete!")
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Echo Chamber", "Yes" if is_echo else "No")
-                with col2:
-                    st.metric("Text-Data Mismatch", f"{mismatch:.0f}%")
-                with col3:
-                    st.metric("Top Word", top_word or "N/A")
-                
-                st.subheader("📈 Data Preview")
-                st.dataframe(df.head(10), use_container_width=True)
+            with span('hybrid.analyze'):
+                # Cached on the upload bytes, so re-opening the same pack is instant.
+                # A re-upload of running notes with text appended only tokenizes the new part;
+                # those counts live in this process, so full-data runs stay inline.
+                if full_data:
+                    # Not a job, so there is nothing to pick up on a return from another mode
+                    st.session_state.pop('hybrid_upload', None)
+                    with st.spinner("🧠 Analyzing..."):
+                        result = analyze_lineage_upload(text_file.name, text_file.getvalue(), csv_file.getvalue(),
+                                                        store=store, csv_name=csv_file.name, columnar=columnar)
+                    analyzed = True
+                else:
+                    analyzed, result = run_hybrid_analysis(text_file, csv_file)
+        else:
+            st.warning("Please upload both a TXT file and a CSV file")
+    elif 'hybrid_job_id' in st.session_state and text_content and df is not None:
+        # A rerun picks this session's job up again
+        with span('hybrid.analyze'):
+            analyzed, result = follow_hybrid_job(analysis_key(text_file.getvalue(), csv_file.getvalue()))
+    elif 'hybrid_upload' in st.session_state and text_file is None and csv_file is None:
+        # Another mode cleared the uploaders; the last analysis is still found by its key
+        with span('hybrid.analyze'):
+            analyzed, result = resume_hybrid_analysis()
+    
+    if analyzed:
+        if result is None:
+            st.warning("Meeting notes are too short to analyze")
+        else:
+            is_echo, top_word = result['is_echo'], result['top_word']
+            mismatch = result['mismatch']
+            stories = result['stories']
+            branches = result['branches']
+            
+            st.success("✅ Analysis Complete!")
+            st.caption(f"Analyzed {result['rows_analyzed']:,} rows and {result['words_analyzed']:,} words")
+            if result.get('incremental'):
+                st.caption(f"♻️ Updated the earlier analysis of {text_file.name} with {result['new_chars']:,} new characters")
+            if result['rows_capped'] or result['words_capped']:
+                st.info("ℹ️ Your upload hit the row/word cap, so scores cover only the first part. Tick 'Analyze full data' to cover everything.")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Echo Chamber", "Yes" if is_echo else "No")
+            with col2:
+                st.metric("Text-Data Mismatch", f"{mismatch:.0f}%")
+            with col3:
+                st.metric("Top Word", top_word or "N/A")
+            
+            with span('hybrid.render'):
+                if df is not None:
+                    st.subheader("📈 Data Preview")
+                    st.dataframe(df.head(10), use_container_width=True)
                 
                 st.subheader("🎯 Strategic Paths")
-                for i, story in enumerate(stories, 1):
+                for i, story in enumerate(stories):
                     with st.expander(f"{story['title']}"):
                         st.write(f"**Description:** {story['description']}")
                         st.write(f"**Potential Outcome:** {story['outcome']}")
                         st.write(f"**Risk Level:** {story['risk']}")
-        else:
-            st.warning("Please upload both a TXT file and a CSV file")
+                        if i < len(branches):
+                            branch = branches[i]
+                            st.write(f"**Simulated Revenue (P5–P95):** ${branch['p5']:,.0f} – ${branch['p95']:,.0f} (median ${branch['p50']:,.0f})")
+                
+                # One linear pass over the whole upload, cached on its text
+                if text_content:
+                    with span('hybrid.echo_graph'):
+                        graph = build_echo_graph(text_content)
+                        clusters = rank_echo_clusters(graph)
+                else:
+                    clusters = []
+                    st.caption("Upload the files again to see the data preview and echo network")
+                if clusters:
+                    st.subheader("🕸️ Echo Network")
+                    st.plotly_chart(echo_network_figure(graph), use_container_width=True)
+                    for cluster in clusters[:3]:
+                        st.write(f"**{', '.join(cluster['terms'][:5])}** — {cluster['frequency']} mentions, "
+                                 f"{cluster['centrality']:.0%} of co-occurrences")
+    
+    st.markdown("---")
+    
+    with st.expander("🔁 Echoes across a meeting series"):
+        series_files = st.file_uploader(
+            "Upload a series of meeting notes (ordered by file name, oldest first)",
+            type=['txt'], accept_multiple_files=True, key='txt_series'
+        )
+        if series_files:
+            series_files = sorted(series_files, key=lambda f: f.name)
+            with span('hybrid.series'):
+                echoes = series_echoes_upload([(f.name, f.getvalue()) for f in series_files])
+            if echoes:
+                st.caption(f"Terms recurring in most of {len(series_files)} meetings and still growing")
+                st.dataframe(pd.DataFrame(echoes), use_container_width=True)
+            else:
+                st.info("No term keeps recurring and growing across these meetings")
 
 # ==================== SOLO MODE ====================
 
+@timed('solo')
 def show_solo_mode():
     """Solo Mode - CSV Only"""
+    import plotly.graph_objects as go
+    from nexus_engine import default_columnar, load_profile_upload, stream_profile_upload
+    
+    columnar = default_columnar()
     st.title("📊 Solo Analysis")
     st.markdown("Upload CSV data for interactive analysis")
     
@@ -424,11 +638,21 @@ def show_solo_mode():
     csv_file = st.file_uploader("Upload CSV file", type=['csv'], key='csv_solo')
     
     if csv_file:
-        df = validate_csv(csv_file)
+        full_data = st.checkbox("🔭 Profile full data (no 1,000-row cap)", key='full_solo')
+        
+        # Parsed and profiled once per upload; selectbox reruns reuse the profile
+        with span('solo.profile'):
+            if full_data:
+                profile = stream_profile_upload(csv_file.getvalue(), store=store, name=csv_file.name,
+                                                columnar=columnar)
+            else:
+                profile = load_profile_upload(csv_file.getvalue(), store=store, name=csv_file.name,
+                                              columnar=columnar)
         
-        if df is not None:
+        if profile is not None:
+            df = profile.df
             st.session_state.interactions['uploads'] += 1
-            st.success(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns")
+            st.success(f"✅ Loaded {profile.n_rows} rows, {profile.n_columns} columns")
             
             st.markdown("---")
             
@@ -438,41 +662,101 @@ def show_solo_mode():
             st.subheader("📊 Statistics")
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Rows", len(df))
+                st.metric("Rows", profile.n_rows)
             with col2:
-                st.metric("Columns", len(df.columns))
+                st.metric("Columns", profile.n_columns)
             with col3:
-                st.metric("Memory", f"{df.memory_usage().sum() / 1024:.1f} KB")
+                report = df.attrs.get('compaction')
+                if report:
+                    saved = 1 - report['after_bytes'] / max(report['before_bytes'], 1)
+                    st.metric("Memory", f"{report['after_bytes'] / 1024:.1f} KB",
+                              delta=f"-{saved:.0%} vs {report['before_bytes'] / 1024:.1f} KB parsed",
+                              delta_color="inverse")
+                else:
+                    st.metric("Memory", f"{profile.memory_bytes / 1024:.1f} KB")
+            if report and report['dtypes']:
+                st.caption("🗜️ Compacted: " + ", ".join(
+                    f"{col} {old} → {new}" for col, (old, new) in report['dtypes'].items()
+                ))
             
             # Numeric columns analysis
-            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+            numeric_cols = profile.numeric_columns
             
             if numeric_cols:
                 st.subheader("📊 Numeric Analysis")
-                st.dataframe(df[numeric_cols].describe(), use_container_width=True)
+                with span('solo.describe'):
+                    summary = profile.summary
+                st.dataframe(summary, use_container_width=True)
                 
                 # Simple visualization
                 if len(numeric_cols) > 0:
                     st.subheader("📈 Visualization")
                     col = st.selectbox("Select column to visualize", numeric_cols)
                     
-                    fig = go.Figure()
-                    fig.add_trace(go.Histogram(x=df[col], nbinsx=30, name=col))
-                    fig.update_layout(
-                        title=f"Distribution of {col}",
-                        xaxis_title=col,
-                        yaxis_title="Frequency",
-                        template="plotly_white",
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Bins are computed server-side once per upload; only the bars are sent
+                    with span('solo.figure'):
+                        bars = profile.histogram_bars(col)
+                        fig = go.Figure()
+                        if bars is not None:
+                            fig.add_trace(go.Bar(x=bars['x'], y=bars['y'], width=bars['width'], name=col))
+                        fig.update_layout(
+                            title=f"Distribution of {col}",
+                            xaxis_title=col,
+                            yaxis_title="Frequency",
+                            template="plotly_white",
+                            bargap=0,
+                            height=400
+                        )
+                    with span('solo.render_chart'):
+                        st.plotly_chart(fig, use_container_width=True)
         else:
             st.error("Invalid CSV format. Please check your file.")
     else:
         st.info("👆 Upload a CSV file to get started")
 
+# ==================== DIAGNOSTICS ====================
+
+def diagnostics_enabled():
+    """Hidden unless ?diagnostics=1 or NEXUS_DIAGNOSTICS=1"""
+    return st.query_params.get('diagnostics') == '1' or os.environ.get('NEXUS_DIAGNOSTICS') == '1'
+
+def show_diagnostics():
+    """Per-stage p50/p95 timings and shared cache hit rates across every rerun served by this process"""
+    import pandas as pd
+    from nexus_engine import NLQ_CACHE, RESULT_CACHE
+    
+    with st.expander("⏱️ Performance diagnostics"):
+        cache_stats = RESULT_CACHE.stats()
+        st.caption(
+            f"Shared cache: {cache_stats['entries']} entries, {cache_stats['bytes'] / 1024 ** 2:.1f} MB, "
+            f"{cache_stats['hit_rate']:.0%} hit rate"
+        )
+        if cache_stats['namespaces']:
+            st.dataframe(pd.DataFrame(cache_stats['namespaces']).T, use_container_width=True)
+        nlq_stats = NLQ_CACHE.stats()
+        st.caption(
+            f"Question cache: {nlq_stats['questions']} questions, {nlq_stats['exact_hits']} exact and "
+            f"{nlq_stats['near_hits']} reworded hits, {nlq_stats['misses']} misses, {nlq_stats['hit_rate']:.0%} hit rate"
+        )
+        stats = TIMINGS.stats()
+        if not stats:
+            st.caption("No timings recorded yet")
+            return
+        st.dataframe(pd.DataFrame(stats).T, use_container_width=True)
+        st.download_button(
+            "Download timings (JSON)",
+            TIMINGS.to_json(),
+            file_name=f"nexus_timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
+
 # ==================== MAIN APP ====================
 
+def switch_mode(mode):
+    """Show another mode; analysis jobs keep running and are picked up on return"""
+    st.session_state.mode = mode
+    st.rerun()
+
 # Header with mode selection
 st.markdown("---")
 
@@ -480,23 +764,19 @@ col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     if st.button("🏠 Dashboard", use_container_width=True):
-        st.session_state.mode = 'dashboard'
-        st.rerun()
+        switch_mode('dashboard')
 
 with col2:
     if st.button("💬 NLQ", use_container_width=True):
-        st.session_state.mode = 'nlq'
-        st.rerun()
+        switch_mode('nlq')
 
 with col3:
     if st.button("📤 Hybrid", use_container_width=True):
-        st.session_state.mode = 'hybrid'
-        st.rerun()
+        switch_mode('hybrid')
 
 with col4:
     if st.button("📊 Solo", use_container_width=True):
-        st.session_state.mode = 'solo'
-        st.rerun()
+        switch_mode('solo')
 
 st.markdown("---")
 
@@ -510,6 +790,9 @@ elif st.session_state.mode == 'hybrid':
 elif st.session_state.mode == 'solo':
     show_solo_mode()
 
+if diagnostics_enabled():
+    show_diagnostics()
+
 # Footer
 st.markdown("---")
 st.markdown("""
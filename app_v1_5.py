@@ -1,10 +1,4 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime
-import re
 
 # ==================== v1.5 UI TWEAK: VIBRANT COLORS & TOP NAV BAR ====================
 
@@ -0,0 +1,4 @@
+"""
+Narrative Nexus Benchmarks
+Timing harnesses for the analysis engine
+"""
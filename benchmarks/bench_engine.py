@@ -0,0 +1,199 @@
+"""
+Narrative Nexus Benchmarks - Analysis Engine
+Times every analysis function over generated inputs from 1KB to 100MB and
+writes machine-readable JSON for comparing versions
+
+Usage:
+    python -m benchmarks.bench_engine --output bench.json
+    python -m benchmarks.bench_engine --sizes 1KB,10KB --compare bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nexus_engine
+from nexus_engine import (
+    analyze,
+    analyze_sentiment_basic,
+    analyze_stream,
+    build_echo_graph,
+    calculate_mismatch,
+    calculate_mismatch_score,
+    detect_echo_chamber,
+    detect_echo_chambers,
+    extract_keywords,
+    generate_mock_df,
+    generate_stories,
+    parse_nlq_intent,
+    run_monte_carlo_simulation,
+    simulate_branches,
+    validate_csv,
+)
+from nexus_engine.columnar import ColumnarCache, pa
+from benchmarks.inputs import generate_notes, generate_sales_csv, parse_size
+
+DEFAULT_SIZES = ['1KB', '10KB', '100KB', '1MB', '10MB', '100MB']
+MIN_TIME = 0.5
+MAX_REPEATS = 5
+DEFAULT_THRESHOLD = 1.25
+
+# ==================== CASES ====================
+
+# name -> callable(inputs) timed per size; inputs are prepared outside the timer
+CASES = {
+    'validate_csv': lambda i: validate_csv(io.BytesIO(i['csv'])),
+    'detect_echo_chamber': lambda i: detect_echo_chamber(i['text']),
+    'calculate_mismatch': lambda i: calculate_mismatch(i['text'], i['df']),
+    'extract_keywords': lambda i: extract_keywords(i['text']),
+    'detect_echo_chambers': lambda i: detect_echo_chambers(i['text']),
+    'analyze_sentiment_basic': lambda i: analyze_sentiment_basic(i['text']),
+    'calculate_mismatch_score': lambda i: calculate_mismatch_score(i['text'], i['df']),
+    'run_monte_carlo_simulation': lambda i: run_monte_carlo_simulation(i['df'], bias_flip=True, n_runs=10_000, seed=0),
+    'simulate_branches': lambda i: simulate_branches(i['df'], i['stories'], n_runs=10_000, seed=0),
+    'generate_stories': lambda i: generate_stories(i['text'], i['df']),
+    'build_echo_graph': lambda i: build_echo_graph(i['text']),
+    'parse_nlq_intent': lambda i: parse_nlq_intent(i['text']),
+    'generate_mock_df': lambda i: generate_mock_df({'intent': 'forecast'}, n_rows=len(i['df']), seasonality=0.1),
+    'analyze': lambda i: analyze(i['text'], i['df'], max_words=10 ** 9),
+    'analyze_stream': lambda i: analyze_stream(i['text'], io.BytesIO(i['csv'])),
+}
+if pa is not None:
+    # Every row of an upload already converted to Arrow (validate_csv parses only the first 1,000)
+    CASES['columnar_load'] = lambda i: i['columnar'].load(i['csv'])
+
+def prepare_inputs(n_bytes, seed=0):
+    """Notes and CSV of n_bytes each, plus the parsed frame and stories"""
+    csv_bytes = generate_sales_csv(n_bytes, seed)
+    df = pd.read_csv(io.BytesIO(csv_bytes))
+    inputs = {
+        'text': generate_notes(n_bytes, seed),
+        'csv': csv_bytes,
+        'df': df,
+        'stories': generate_stories('', df)
+    }
+    if pa is not None:
+        inputs['columnar'] = ColumnarCache(tempfile.mkdtemp(prefix='nexus_bench_'))
+        inputs['columnar'].convert(csv_bytes)
+    return inputs
+
+def time_case(fn, inputs, min_time=MIN_TIME, max_repeats=MAX_REPEATS):
+    """Repeat fn until min_time has elapsed or max_repeats runs; return timings in seconds
+
+    Every run starts with an empty shared cache, so memoized functions are
+    timed computing rather than hitting their previous result.
+    """
+    timings = []
+    while len(timings) < max_repeats and (not timings or sum(timings) < min_time):
+        nexus_engine.RESULT_CACHE.clear()
+        start = time.perf_counter()
+        fn(inputs)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, min_time=MIN_TIME, max_repeats=MAX_REPEATS, log=None):
+    """Run the selected cases at every size and return a JSON-ready report"""
+    names = cases or list(CASES)
+    results = []
+    for label in sizes:
+        n_bytes = parse_size(label)
+        inputs = prepare_inputs(n_bytes)
+        for name in names:
+            timings = time_case(CASES[name], inputs, min_time, max_repeats)
+            median = statistics.median(timings)
+            results.append({
+                'function': name,
+                'size': label,
+                'bytes': n_bytes,
+                'repeats': len(timings),
+                'min_s': min(timings),
+                'median_s': median,
+                'mean_s': statistics.fmean(timings),
+                'mb_per_s': (n_bytes / 1024 ** 2) / median if median > 0 else None
+            })
+            if log:
+                log(f"{name:<28} {label:>6}  median {median * 1000:10.3f} ms  ({len(timings)} runs)")
+        if 'columnar' in inputs:
+            shutil.rmtree(inputs['columnar'].directory, ignore_errors=True)
+        del inputs
+
+    return {
+        'suite': 'nexus_engine',
+        'version': nexus_engine.__version__,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+# ==================== COMPARISON ====================
+
+def compare_reports(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Best-time ratio per (function, size); ratio > threshold is a regression"""
+    base = {(r['function'], r['size']): r for r in baseline['results']}
+    rows = []
+    for r in current['results']:
+        old = base.get((r['function'], r['size']))
+        if old is None or not old['min_s']:
+            continue
+        ratio = r['min_s'] / old['min_s']
+        rows.append({
+            'function': r['function'],
+            'size': r['size'],
+            'baseline_s': old['min_s'],
+            'current_s': r['min_s'],
+            'ratio': ratio,
+            'regression': ratio > threshold
+        })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Narrative Nexus analysis engine")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES), help="comma-separated input sizes, e.g. 1KB,10MB")
+    parser.add_argument('--cases', default=None, help="comma-separated function names (default: all)")
+    parser.add_argument('--output', default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument('--compare', default=None, help="baseline JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="slowdown ratio counted as a regression")
+    parser.add_argument('--min-time', type=float, default=MIN_TIME)
+    parser.add_argument('--max-repeats', type=int, default=MAX_REPEATS)
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(',') if args.cases else None
+    unknown = set(cases or []) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = run_benchmarks(args.sizes.split(','), cases, args.min_time, args.max_repeats, log=log)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare_reports(report, json.load(f), args.threshold)
+        for row in report['comparison']:
+            flag = '❌ REGRESSION' if row['regression'] else '✅'
+            log(f"{row['function']:<28} {row['size']:>6}  x{row['ratio']:.2f}  {flag}")
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+
+    regressions = [r for r in report.get('comparison', []) if r['regression']]
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Narrative Nexus Benchmarks - Cold Start
+Times imports and the app's first Dashboard run, each in a fresh interpreter,
+and records which heavy libraries they pulled in
+
+Usage:
+    python -m benchmarks.bench_startup --output startup.json
+    python -m benchmarks.bench_startup --targets app_dashboard --compare startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nexus_engine
+from benchmarks.bench_engine import DEFAULT_THRESHOLD, compare_reports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'app.py')
+REPEATS = 5
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'plotly.express', 'plotly.graph_objects')
+
+# ==================== TARGETS ====================
+
+# name -> statements timed in a fresh interpreter
+TARGETS = {
+    'import_nexus_engine': 'import nexus_engine',
+    'import_pipeline': 'import nexus_engine.pipeline',
+    'import_streamlit': 'import streamlit',
+    'app_dashboard': (
+        'from streamlit.testing.v1 import AppTest\n'
+        f'AppTest.from_file({APP!r}, default_timeout=120).run()'
+    ),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statements}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def time_target(statements, repeats=REPEATS):
+    """(timings, heavy modules loaded) of statements run in repeats fresh interpreters"""
+    # No history database or Arrow directory is written by a benchmark run
+    env = dict(os.environ, NEXUS_STORE_PATH='', NEXUS_COLUMNAR_DIR='', PYTHONPATH=ROOT)
+    code = PROBE.format(statements=statements, heavy=HEAVY_MODULES)
+    timings, modules = [], []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(probe['seconds'])
+        modules = probe['modules']
+    return timings, modules
+
+def run_startup(targets=None, repeats=REPEATS, log=None):
+    """Time the selected targets and return a report shaped like bench_engine's"""
+    results = []
+    for name in targets or list(TARGETS):
+        timings, modules = time_target(TARGETS[name], repeats)
+        median = statistics.median(timings)
+        results.append({
+            'function': name,
+            'size': 'cold',
+            'repeats': len(timings),
+            'min_s': min(timings),
+            'median_s': median,
+            'mean_s': statistics.fmean(timings),
+            'modules': modules
+        })
+        if log:
+            log(f"{name:<20} median {median * 1000:8.1f} ms  loads: {', '.join(modules) or '-'}")
+
+    return {
+        'suite': 'nexus_startup',
+        'version': nexus_engine.__version__,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Narrative Nexus cold-start import times")
+    parser.add_argument('--targets', default=None, help="comma-separated targets (default: all)")
+    parser.add_argument('--repeats', type=int, default=REPEATS, help="fresh interpreters per target")
+    parser.add_argument('--output', default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument('--compare', default=None, help="baseline JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    targets = args.targets.split(',') if args.targets else None
+    unknown = set(targets or []) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    report = run_startup(targets, args.repeats, log=log)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare_reports(report, json.load(f), args.threshold)
+        for row in report['comparison']:
+            flag = '❌ REGRESSION' if row['regression'] else '✅'
+            log(f"{row['function']:<20} x{row['ratio']:.2f}  {flag}")
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+
+    regressions = [r for r in report.get('comparison', []) if r['regression']]
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
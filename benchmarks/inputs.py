@@ -0,0 +1,55 @@
+"""
+Benchmark inputs - meeting notes and sales CSVs of a requested size
+Shaped like sample_data/notes.txt and the Region/Revenue frames used in the tests
+"""
+
+import io
+import os
+
+import numpy as np
+
+from nexus_engine.nlq import generate_mock_df, iter_mock_chunks
+
+SAMPLE_NOTES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_data', 'notes.txt')
+REGIONS = ['Lagos', 'Abuja', 'Kano', 'Ibadan', 'Port Harcourt']
+# Flat revenue per region with 10% noise: Abuja ahead of the Lagos the notes keep echoing
+SALES_QUERY = {'intent': 'general_advice'}
+SALES_OPTIONS = {'regions': REGIONS, 'base': [5200.0, 8100.0, 4300.0, 6000.0, 7000.0], 'noise': 0.1}
+
+UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+def parse_size(label):
+    """'10KB' -> 10240"""
+    label = label.strip().upper()
+    for unit, factor in UNITS.items():
+        if label.endswith(unit):
+            return int(float(label[:-len(unit)]) * factor)
+    return int(label)
+
+def generate_notes(n_bytes, seed=0):
+    """Meeting notes of n_bytes built from shuffled sample_data/notes.txt lines"""
+    with open(SAMPLE_NOTES, encoding='utf-8') as f:
+        lines = [line.encode('ascii', 'ignore').decode() for line in f.read().splitlines() if line.strip()]
+    rng = np.random.default_rng(seed)
+    avg = sum(len(line) + 1 for line in lines) / len(lines)
+    parts, size = [], 0
+    while size < n_bytes:
+        picks = rng.integers(0, len(lines), int((n_bytes - size) / avg) + 16)
+        block = '\n'.join(lines[i] for i in picks) + '\n'
+        parts.append(block)
+        size += len(block)
+    return ''.join(parts)[:n_bytes]
+
+def generate_sales_df(n_rows, seed=0):
+    """Date/Region/Revenue/Units_Sold frame with n_rows rows, from the NLQ mock generator"""
+    return generate_mock_df(SALES_QUERY, n_rows, seed, **SALES_OPTIONS)
+
+def generate_sales_csv(n_bytes, seed=0):
+    """CSV bytes of about n_bytes in the Region/Revenue shape, written chunk by chunk"""
+    probe = generate_sales_df(1000, seed).to_csv(index=False).encode('utf-8')
+    row_bytes = len(probe) / 1000
+    n_rows = max(2, int(n_bytes / row_bytes))
+    out = io.BytesIO()
+    for i, chunk in enumerate(iter_mock_chunks(SALES_QUERY, n_rows, seed, **SALES_OPTIONS)):
+        chunk.to_csv(out, header=i == 0, index=False)
+    return out.getvalue()
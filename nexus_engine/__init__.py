@@ -0,0 +1,208 @@
+"""
+Narrative Nexus Engine
+Streamlit-free analysis core shared by the UI, tests and batch workers
+"""
+
+__version__ = '1.5.0'
+
+import importlib
+
+# Public name -> submodule defining it. Submodules (and pandas, numpy and
+# pyarrow behind them) load on first use, so importing the package is cheap
+# and a cold app start pays only for the modes it shows.
+_EXPORTS = {
+    'ResultCache': 'cache',
+    'content_hash': 'cache',
+    'fingerprint': 'cache',
+    'memoize': 'cache',
+    'ColumnarCache': 'columnar',
+    'default_columnar': 'columnar',
+    'compact_frame': 'compact',
+    'frame_bytes': 'compact',
+    'AnalysisExecutor': 'executor',
+    'JobCancelled': 'executor',
+    'QueueFull': 'executor',
+    'analyze_upload_job': 'executor',
+    'default_executor': 'executor',
+    'report_progress': 'executor',
+    'build_echo_graph': 'graph',
+    'cooccurrence_counts': 'graph',
+    'rank_echo_clusters': 'graph',
+    'LINEAGES': 'incremental',
+    'IncrementalDocument': 'incremental',
+    'analyze_incremental': 'incremental',
+    'analyze_lineage_upload': 'incremental',
+    'update_lineage': 'incremental',
+    'infer_schema': 'ingest',
+    'iter_csv_chunks': 'ingest',
+    'read_csv_stream': 'ingest',
+    'train_intent_model': 'intent_model',
+    'JOBS': 'jobs',
+    'JobRegistry': 'jobs',
+    'Lexicon': 'lexicon',
+    'load_gazetteer': 'lexicon',
+    'REGION_GAZETTEER': 'mismatch',
+    'calculate_mismatch': 'mismatch',
+    'calculate_mismatch_score': 'mismatch',
+    'calculate_nlq_score': 'nlq',
+    'generate_mock_df': 'nlq',
+    'generate_nlq_insights': 'nlq',
+    'generate_nlq_stories': 'nlq',
+    'INTENT_INDEX': 'nlq',
+    'IntentIndex': 'nlq',
+    'iter_mock_chunks': 'nlq',
+    'parse_nlq_intent': 'nlq',
+    'parse_nlq_intents': 'nlq',
+    'query_history': 'nlq',
+    'StreamingDocument': 'outofcore',
+    'StreamingProfile': 'outofcore',
+    'analyze_stream': 'outofcore',
+    'analyze_stream_upload': 'outofcore',
+    'stream_document': 'outofcore',
+    'stream_profile': 'outofcore',
+    'stream_profile_upload': 'outofcore',
+    'RESULT_CACHE': 'pipeline',
+    'analysis_key': 'pipeline',
+    'analyze': 'pipeline',
+    'analyze_document': 'pipeline',
+    'analyze_many': 'pipeline',
+    'analyze_upload': 'pipeline',
+    'load_csv_upload': 'pipeline',
+    'load_profile_upload': 'pipeline',
+    'load_text_upload': 'pipeline',
+    'DataProfile': 'profile',
+    'as_profile': 'profile',
+    'NLQ_CACHE': 'querycache',
+    'QueryCache': 'querycache',
+    'normalize_query': 'querycache',
+    'detect_series_echoes': 'series',
+    'series_echoes_upload': 'series',
+    'series_term_stats': 'series',
+    'run_monte_carlo_simulation': 'simulation',
+    'simulate_branches': 'simulation',
+    'summarize_branches': 'simulation',
+    'generate_stories': 'stories',
+    'AnalysisStore': 'store',
+    'default_store': 'store',
+    'SENTIMENT_LEXICON': 'text',
+    'analyze_sentiment_basic': 'text',
+    'detect_echo_chamber': 'text',
+    'detect_echo_chambers': 'text',
+    'extract_keywords': 'text',
+    'TIMINGS': 'timing',
+    'SpanRecorder': 'timing',
+    'span': 'timing',
+    'timed': 'timing',
+    'Document': 'tokens',
+    'as_document': 'tokens',
+    'health_check': 'validation',
+    'validate_csv': 'validation',
+    'validate_csv_input': 'validation',
+    'validate_query_input': 'validation',
+    'validate_text': 'validation',
+    'validate_text_input': 'validation'
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+__all__ = [
+    'AnalysisExecutor',
+    'AnalysisStore',
+    'ColumnarCache',
+    'StreamingDocument',
+    'StreamingProfile',
+    'DataProfile',
+    'Document',
+    'INTENT_INDEX',
+    'IncrementalDocument',
+    'IntentIndex',
+    'JOBS',
+    'JobCancelled',
+    'JobRegistry',
+    'LINEAGES',
+    'Lexicon',
+    'NLQ_CACHE',
+    'QueryCache',
+    'QueueFull',
+    'REGION_GAZETTEER',
+    'RESULT_CACHE',
+    'ResultCache',
+    'SENTIMENT_LEXICON',
+    'SpanRecorder',
+    'TIMINGS',
+    'analysis_key',
+    'analyze',
+    'analyze_document',
+    'analyze_incremental',
+    'analyze_lineage_upload',
+    'analyze_many',
+    'analyze_stream',
+    'analyze_stream_upload',
+    'analyze_upload',
+    'analyze_upload_job',
+    'as_profile',
+    'analyze_sentiment_basic',
+    'as_document',
+    'build_echo_graph',
+    'calculate_mismatch',
+    'calculate_mismatch_score',
+    'calculate_nlq_score',
+    'compact_frame',
+    'content_hash',
+    'cooccurrence_counts',
+    'default_columnar',
+    'default_executor',
+    'default_store',
+    'detect_echo_chamber',
+    'detect_echo_chambers',
+    'detect_series_echoes',
+    'extract_keywords',
+    'fingerprint',
+    'frame_bytes',
+    'generate_mock_df',
+    'generate_nlq_insights',
+    'generate_nlq_stories',
+    'generate_stories',
+    'health_check',
+    'infer_schema',
+    'iter_csv_chunks',
+    'iter_mock_chunks',
+    'load_csv_upload',
+    'load_gazetteer',
+    'load_profile_upload',
+    'load_text_upload',
+    'memoize',
+    'normalize_query',
+    'parse_nlq_intent',
+    'parse_nlq_intents',
+    'query_history',
+    'rank_echo_clusters',
+    'read_csv_stream',
+    'report_progress',
+    'run_monte_carlo_simulation',
+    'series_echoes_upload',
+    'series_term_stats',
+    'simulate_branches',
+    'span',
+    'stream_document',
+    'stream_profile',
+    'stream_profile_upload',
+    'summarize_branches',
+    'timed',
+    'train_intent_model',
+    'update_lineage',
+    'validate_csv',
+    'validate_csv_input',
+    'validate_query_input',
+    'validate_text',
+    'validate_text_input',
+]
@@ -0,0 +1,186 @@
+"""
+Narrative Nexus Engine - Batch Scoring
+Score a directory of meeting-notes/CSV pairs headlessly into JSONL
+
+Usage:
+    python -m nexus_engine.batch exports/ --output results.jsonl
+    python -m nexus_engine.batch exports/ --output results.jsonl --workers 8 --full
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+
+from .cache import content_hash
+from .outofcore import analyze_stream
+from .pipeline import BRANCH_RUNS, RESULT_SCHEMA_VERSION, analyze
+from .store import AnalysisStore, json_default
+from .validation import MAX_ROWS, MAX_WORDS, validate_csv
+
+TEXT_SUFFIXES = ('.txt',)
+CSV_SUFFIXES = ('.csv',)
+CHUNKSIZE = 4
+
+# ==================== PAIRING ====================
+
+def find_pairs(root):
+    """(pair_id, text_path, csv_path or None) for every TXT under root
+
+    A TXT pairs with the CSV of the same stem in the same folder
+    (team_a.txt + team_a.csv); a folder left with exactly one TXT and one
+    CSV pairs those (notes.txt + sales.csv). Unpaired TXTs are scored
+    text-only; unpaired CSVs are ignored.
+    """
+    pairs = []
+    for folder, _, files in os.walk(root):
+        texts = {os.path.splitext(f)[0]: f for f in files if f.lower().endswith(TEXT_SUFFIXES)}
+        csvs = {os.path.splitext(f)[0]: f for f in files if f.lower().endswith(CSV_SUFFIXES)}
+        matched = {stem: (name, csvs[stem]) for stem, name in texts.items() if stem in csvs}
+        left_texts = [name for stem, name in texts.items() if stem not in matched]
+        left_csvs = [name for stem, name in csvs.items() if stem not in matched]
+        if len(left_texts) == 1 and len(left_csvs) == 1:
+            matched[left_texts[0]] = (left_texts[0], left_csvs[0])
+            left_texts = []
+
+        for text_name, csv_name in list(matched.values()) + [(name, None) for name in left_texts]:
+            text_path = os.path.join(folder, text_name)
+            pairs.append((
+                os.path.relpath(text_path, root),
+                text_path,
+                os.path.join(folder, csv_name) if csv_name else None
+            ))
+    return sorted(pairs)
+
+# ==================== SCORING ====================
+
+def input_hash(text_path, csv_path, **params):
+    """Content hash of a pair plus the scoring parameters and result version"""
+    with open(text_path, 'rb') as f:
+        text_bytes = f.read()
+    csv_bytes = b''
+    if csv_path:
+        with open(csv_path, 'rb') as f:
+            csv_bytes = f.read()
+    return content_hash(text_bytes, csv_bytes, version=RESULT_SCHEMA_VERSION, **params)
+
+def score_pair(task):
+    """Worker: analyze one pair and return its JSONL record"""
+    pair_id, text_path, csv_path, params = task
+    record = {'pair_id': pair_id, 'text_path': text_path, 'csv_path': csv_path}
+    start = time.perf_counter()
+    try:
+        record['input_hash'] = input_hash(text_path, csv_path, **params)
+        if params['full']:
+            result = analyze_stream(text_path, csv_path, n_runs=params['n_runs'])
+        else:
+            with open(text_path, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+            df = validate_csv(csv_path, max_rows=params['max_rows']) if csv_path else None
+            result = analyze(text, df, n_runs=params['n_runs'], max_words=params['max_words'])
+        record['status'] = 'ok' if result is not None else 'skipped'
+        record['result'] = result
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+# ==================== RESUME ====================
+
+def completed_hashes(output):
+    """Input hashes already written to output; a torn last line is truncated away"""
+    if not os.path.exists(output):
+        return set()
+    with open(output, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+            data = data[:data.rfind(b'\n') + 1]
+
+    done = set()
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('status') in ('ok', 'skipped') and record.get('input_hash'):
+            done.add(record['input_hash'])
+    return done
+
+def run_batch(root, output, workers=None, n_runs=BRANCH_RUNS, max_words=MAX_WORDS,
+              max_rows=MAX_ROWS, full=False, resume=True, store=None, log=None):
+    """Score every pair under root, appending records to output (and store); returns counts"""
+    params = {'n_runs': n_runs, 'max_words': max_words, 'max_rows': max_rows, 'full': full}
+    if not resume and os.path.exists(output):
+        os.remove(output)
+    done = completed_hashes(output)
+
+    tasks = []
+    counts = defaultdict(int)
+    for pair_id, text_path, csv_path in find_pairs(root):
+        if done and input_hash(text_path, csv_path, **params) in done:
+            counts['resumed'] += 1
+            continue
+        tasks.append((pair_id, text_path, csv_path, params))
+
+    start = time.perf_counter()
+    with open(output, 'a', encoding='utf-8') as out:
+        if workers == 1:
+            records = map(score_pair, tasks)
+            pool = None
+        else:
+            pool = Pool(workers)
+            records = pool.imap_unordered(score_pair, tasks, chunksize=CHUNKSIZE)
+        try:
+            for record in records:
+                # One flushed line per pair, so an interrupted run resumes where it stopped
+                out.write(json.dumps(record, default=json_default) + '\n')
+                out.flush()
+                counts[record['status']] += 1
+                if store is not None and record['status'] == 'ok':
+                    store.save_analysis(record['input_hash'], record['result'], kind='batch',
+                                        text_name=record['pair_id'], csv_name=record['csv_path'])
+                if log and record['status'] == 'error':
+                    log(f"❌ {record['pair_id']}: {record['error']}")
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    counts['seconds'] = time.perf_counter() - start
+    return dict(counts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score meeting-notes/CSV pairs into JSONL")
+    parser.add_argument('root', help="directory searched recursively for TXT/CSV pairs")
+    parser.add_argument('--output', default='nexus_results.jsonl')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--n-runs', type=int, default=BRANCH_RUNS, help="Monte Carlo runs per story branch")
+    parser.add_argument('--max-words', type=int, default=MAX_WORDS)
+    parser.add_argument('--max-rows', type=int, default=MAX_ROWS)
+    parser.add_argument('--full', action='store_true', help="stream full files instead of capping rows/words")
+    parser.add_argument('--no-resume', action='store_true', help="start over instead of skipping scored pairs")
+    parser.add_argument('--store', default=None, help="also record results in this analysis history database")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"not a directory: {args.root}")
+
+    log = lambda msg: print(msg, file=sys.stderr)
+    store = AnalysisStore(args.store) if args.store else None
+    counts = run_batch(args.root, args.output, workers=args.workers, n_runs=args.n_runs,
+                       max_words=args.max_words, max_rows=args.max_rows, full=args.full,
+                       resume=not args.no_resume, store=store, log=log)
+    scored = counts.get('ok', 0) + counts.get('skipped', 0) + counts.get('error', 0)
+    rate = scored / counts['seconds'] if counts['seconds'] > 0 else 0
+    log(f"✅ {counts.get('ok', 0)} scored, {counts.get('skipped', 0)} skipped, "
+        f"{counts.get('error', 0)} errors, {counts.get('resumed', 0)} already done "
+        f"({rate:.1f} pairs/s) -> {args.output}")
+    return 1 if counts.get('error') else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Narrative Nexus Engine - Result Cache
+Content-hash keyed LRU cache with TTL and a memory budget, shared by every
+session, job and engine function in the process
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# ==================== KEYS & SIZES ====================
+
+def content_hash(*parts, **params):
+    """Stable SHA-256 key over raw content plus analysis parameters"""
+    h = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b''
+        elif isinstance(part, str):
+            part = part.encode('utf-8')
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    for name in sorted(params):
+        h.update(f"|{name}={params[name]!r}".encode('utf-8'))
+    return h.hexdigest()
+
+def fingerprint(value):
+    """Content digest of a function argument, or None when it has no stable content
+
+    Text and bytes hash like content_hash(value), so an argument decoded
+    from an upload has that upload's digest. Documents and profiles answer
+    through their own fingerprint attribute. Raw frames have none: hashing
+    every row on every call costs more than most engine functions, and
+    profiles of uploads already carry the upload's hash.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    if isinstance(value, (str, bytes)):
+        return content_hash(value)
+    pandas = sys.modules.get('pandas')  # Without pandas loaded, value cannot be a frame
+    if pandas is not None and isinstance(value, (pandas.DataFrame, pandas.Series)):
+        return None
+    if isinstance(value, (tuple, list)):
+        parts = [fingerprint(v) for v in value]
+        return None if None in parts else content_hash(type(value).__name__, *parts)
+    if isinstance(value, dict):
+        parts = [fingerprint(item) for item in sorted(value.items(), key=repr)]
+        return None if None in parts else content_hash('dict', *parts)
+    return getattr(value, 'fingerprint', None)
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes"""
+    if hasattr(value, 'memory_usage'):
+        # DataFrame / Series
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+# ==================== CACHE ====================
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache bounded by entry count and total bytes
+
+    Entries may be tagged with the content hashes they were derived from;
+    invalidate_content() drops every entry carrying a hash. Lookups made
+    with a namespace are also counted per namespace.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_bytes=DEFAULT_MAX_BYTES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, tags)
+        self._tagged = {}              # content hash -> keys derived from it
+        self._namespaces = {}          # namespace -> [hits, misses]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _count=False) is not None
+
+    @property
+    def total_bytes(self):
+        return self._bytes
+
+    def get(self, key, default=None, _count=True, namespace=None):
+        """Return a live entry and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= self._clock():
+                self._drop(key)
+                entry = None
+            if _count:
+                self._count(entry is not None, namespace)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tags=()):
+        """Store a value, evicting expired then least recently used entries"""
+        size = estimate_size(value)
+        tags = frozenset(tag for tag in tags if tag)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                # Never cache something bigger than the whole budget
+                return value
+            self._entries[key] = (value, size, self._clock() + self.ttl_seconds, tags)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            self._bytes += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute, namespace=None, tags=()):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key, namespace=namespace)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, tags=tags)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def invalidate_content(self, digest):
+        """Drop every entry derived from content with this content_hash(); returns how many"""
+        with self._lock:
+            keys = [key for key in self._tagged.get(digest, ()) if key in self._entries]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters (overall and per namespace) and current footprint"""
+        lookups = self.hits + self.misses
+        with self._lock:
+            namespaces = {
+                name: {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+                for name, (hits, misses) in sorted(self._namespaces.items())
+            }
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'namespaces': namespaces
+        }
+
+    def _count(self, hit, namespace):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if namespace is not None:
+            self._namespaces.setdefault(namespace, [0, 0])[0 if hit else 1] += 1
+
+    def _drop(self, key):
+        _, size, _, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def _evict(self):
+        now = self._clock()
+        for key in [k for k, (_, _, expires, _) in self._entries.items() if expires <= now]:
+            self._drop(key)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+# Shared by every session in this process; keyed on upload bytes + parameters
+RESULT_CACHE = ResultCache()
+
+# ==================== MEMOIZATION ====================
+
+def _content_tags(value, digest):
+    """Content hashes an argument was derived from: its own digest and, for profiles, its upload's"""
+    if value is None or isinstance(value, (bool, int, float, tuple, list, dict)):
+        return ()
+    if isinstance(value, (str, bytes)):
+        return (digest,)
+    return (digest, getattr(value, 'source', None))
+
+def memoize(namespace, cache=None, copy_result=True):
+    """Cache a deterministic engine function on the content of its arguments
+
+    The engine's st.cache_data: calls with equal text, bytes, frames,
+    Documents or profiles share one result in the process-wide cache,
+    whichever session or job computed it first. Results are deep-copied on
+    the way out so callers can mutate them; copy_result=False shares them,
+    like st.cache_resource. A call with an argument that has no fingerprint
+    runs uncached. Entries are tagged with their arguments' fingerprints and
+    sources for invalidate_content().
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            prints = []
+            for value in bound.arguments.values():
+                prints.append(fingerprint(value))
+                if prints[-1] is None:
+                    return fn(*args, **kwargs)
+            tags = set()
+            for value, digest in zip(bound.arguments.values(), prints):
+                tags.update(_content_tags(value, digest))
+            target = cache if cache is not None else RESULT_CACHE
+            value = target.get_or_compute(
+                content_hash(name, *prints), lambda: fn(*args, **kwargs),
+                namespace=namespace, tags=tags
+            )
+            return copy.deepcopy(value) if copy_result else value
+
+        wrapper.namespace = namespace
+        return wrapper
+    return decorate
@@ -0,0 +1,232 @@
+"""
+Narrative Nexus Engine - Columnar Upload Cache
+Each uploaded CSV is parsed once into a memory-mapped Arrow file with
+dictionary-encoded Region/Category columns; reruns, modes, sessions and
+worker processes reload it instead of parsing text again
+"""
+
+import io
+import os
+import tempfile
+import threading
+
+import pandas as pd
+
+from .cache import content_hash
+from .ingest import infer_schema, iter_csv_chunks, read_csv_stream
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # Optional: without pyarrow uploads are parsed from CSV every time
+    pa = None
+
+# Failures of the cache itself (unwritable directory, corrupt file): callers parse the CSV instead
+CACHE_ERRORS = (OSError,) if pa is None else (OSError, pa.ArrowException)
+
+DEFAULT_COLUMNAR_DIR = '.nexus_columnar'
+DEFAULT_MAX_BYTES = 1024 ** 3
+BATCH_ROWS = 50_000
+CATEGORICAL_COLUMNS = ('Region', 'Category')
+
+def _categorize(chunk, categories):
+    """Dictionary-encode categorical columns, extending each column's categories in order of appearance
+
+    Earlier categories keep their codes, so every batch of a file shares one
+    growing dictionary.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col not in chunk.columns or pd.api.types.is_numeric_dtype(chunk[col]):
+            continue
+        known = categories.setdefault(col, [])
+        seen = set(known)
+        known.extend(v for v in pd.unique(chunk[col].dropna()) if v not in seen)
+        chunk[col] = pd.Categorical(chunk[col], categories=known)
+    return chunk
+
+def _sort_categories(frame):
+    """Sorted categories, so groupbys list groups in the same order as over the parsed CSV"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype):
+            categories = frame[col].cat.categories
+            if not categories.is_monotonic_increasing:
+                frame[col] = frame[col].cat.reorder_categories(categories.sort_values())
+    return frame
+
+def _schema(chunk):
+    """Arrow schema of the first batch, with 32-bit dictionary codes so categories can keep growing"""
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), field.type.value_type)))
+    return schema
+
+class ColumnarCache:
+    """Directory of Arrow IPC files, one per distinct upload and row cap
+
+    Files are written once (atomically, so concurrent sessions never see a
+    partial file) and read through a memory map, so every process shares
+    the same page-cache pages. Least recently loaded files are pruned past
+    max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_COLUMNAR_DIR, max_bytes=DEFAULT_MAX_BYTES, batch_rows=BATCH_ROWS):
+        if pa is None:
+            raise ImportError("pyarrow is required for the columnar upload cache")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.batch_rows = batch_rows
+        self._lock = threading.Lock()
+        self.conversions = 0
+        self.loads = 0
+
+    def path_for(self, data, max_rows=None):
+        key = content_hash('columnar', data, max_rows=max_rows)
+        return os.path.join(self.directory, f"{key}.arrow")
+
+    # ==================== CONVERSION ====================
+
+    def _frames(self, data, max_rows):
+        """CSV chunks with a sample-inferred schema, as read_csv_stream reads them"""
+        source = io.BytesIO(data)
+        schema = infer_schema(source)
+        return iter_csv_chunks(source, schema=schema, max_rows=max_rows, chunk_rows=self.batch_rows)
+
+    def _write(self, path, frames):
+        """Write frames as record batches; False (and nothing written) for an invalid CSV"""
+        categories = {}
+        writer = None
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as sink:
+                for frame in frames:
+                    if writer is None:
+                        if frame.empty or len(frame.columns) < 2:
+                            return False
+                        frame = _categorize(frame, categories)
+                        schema = _schema(frame)
+                        writer = ipc.new_file(sink, schema, options=ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+                    else:
+                        frame = _categorize(frame, categories)
+                    writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                if writer is None:
+                    return False
+                writer.close()
+            os.replace(tmp, path)
+            return True
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def convert(self, data, max_rows=None):
+        """Path of the Arrow file for an upload, converting it on first use; None if the CSV is invalid"""
+        path = self.path_for(data, max_rows)
+        if os.path.exists(path):
+            return path
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            written = self._write(path, self._frames(data, max_rows))
+        except (ValueError, TypeError, pa.ArrowException):
+            # A later value broke the sampled schema; parse in one piece like read_csv_stream
+            written = self._write(path, [read_csv_stream(io.BytesIO(data), max_rows=max_rows)])
+        if not written:
+            return None
+        with self._lock:
+            self.conversions += 1
+        self.prune(keep=path)
+        return path
+
+    # ==================== LOADING ====================
+
+    def _reader(self, path):
+        os.utime(path)
+        with self._lock:
+            self.loads += 1
+        return ipc.open_file(pa.memory_map(path))
+
+    def load(self, data, max_rows=None):
+        """The upload as a dataframe (same rows as validate_csv, categorical Region/Category); None if invalid
+
+        Raises CACHE_ERRORS when the cache itself fails, so a valid upload is
+        never reported as an invalid CSV.
+        """
+        try:
+            path = self.convert(data, max_rows)
+        except pa.ArrowException:
+            raise
+        except (ValueError, TypeError):
+            return None
+        if path is None:
+            return None
+        return _sort_categories(self._reader(path).read_all().to_pandas(split_blocks=True))
+
+    def iter_chunks(self, data, max_rows=None):
+        """The upload as dataframe chunks, one per record batch, for streaming aggregators
+
+        Raises ValueError/TypeError for an invalid CSV and CACHE_ERRORS when the cache fails.
+        """
+        path = self.convert(data, max_rows)
+        if path is None:
+            return
+        reader = self._reader(path)
+        for i in range(reader.num_record_batches):
+            yield _sort_categories(reader.get_batch(i).to_pandas())
+
+    # ==================== HOUSEKEEPING ====================
+
+    def files(self):
+        """(path, bytes, last used) of every cached file, least recently used first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.arrow'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def prune(self, keep=None):
+        """Delete least recently used files (never keep) until the directory fits in max_bytes"""
+        entries = self.files()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        entries = self.files()
+        return {
+            'files': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'conversions': self.conversions,
+            'loads': self.loads
+        }
+
+    def clear(self):
+        for path, _, _ in self.files():
+            os.remove(path)
+
+_DEFAULT_COLUMNAR = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_columnar():
+    """Process-wide cache at NEXUS_COLUMNAR_DIR (default .nexus_columnar); None if set to '' or without pyarrow"""
+    global _DEFAULT_COLUMNAR
+    directory = os.environ.get('NEXUS_COLUMNAR_DIR', DEFAULT_COLUMNAR_DIR)
+    if not directory or pa is None:
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT_COLUMNAR is None or _DEFAULT_COLUMNAR.directory != directory:
+            _DEFAULT_COLUMNAR = ColumnarCache(directory)
+        return _DEFAULT_COLUMNAR
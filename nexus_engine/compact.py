@@ -0,0 +1,77 @@
+"""
+Narrative Nexus Engine - Dtype Compaction
+Shrink parsed uploads before they are cached: categoricals for low-cardinality
+text, the narrowest lossless int/float widths and parsed dates
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .profile import MAX_CATEGORIES
+
+# A text column is categorical when it repeats: at most this share of its values are distinct
+CATEGORY_RATIO = 0.5
+
+def frame_bytes(df):
+    """Real footprint of a dataframe, string payloads included"""
+    return int(df.memory_usage(deep=True).sum())
+
+def _is_text(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+def _as_dates(series):
+    """Parsed datetimes if every non-null value is a date, else None"""
+    values = series.dropna()
+    if values.empty:
+        return None
+    with warnings.catch_warnings():
+        # Per-element fallback parsing warns; the all-parsed check below is what decides
+        warnings.simplefilter('ignore', UserWarning)
+        parsed = pd.to_datetime(series, errors='coerce')
+    if parsed.notna().sum() < len(values):
+        return None
+    return parsed
+
+def _downcast_float(series):
+    """float32 only when every value survives the round trip exactly"""
+    narrow = series.astype(np.float32)
+    same = (narrow.astype(np.float64) == series) | series.isna()
+    return narrow if same.all() else series
+
+def compact_column(series, max_categories=MAX_CATEGORIES):
+    """Smallest lossless dtype for one column"""
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        # Signed only: unsigned columns would wrap around on subtraction
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        return _downcast_float(series)
+    if _is_text(series):
+        if 'date' in str(series.name).lower():
+            dates = _as_dates(series)
+            if dates is not None:
+                return dates
+        n_unique = series.nunique(dropna=True)
+        if n_unique <= max_categories and n_unique <= CATEGORY_RATIO * len(series):
+            return series.astype('category')
+    return series
+
+def compact_frame(df, max_categories=MAX_CATEGORIES):
+    """Compacted copy of df; df.attrs['compaction'] records bytes before/after and changed dtypes"""
+    before = frame_bytes(df)
+    compacted = df.copy()
+    changed = {}
+    for col in df.columns:
+        column = compact_column(df[col], max_categories=max_categories)
+        if column.dtype != df[col].dtype:
+            compacted[col] = column
+            changed[col] = (str(df[col].dtype), str(column.dtype))
+    compacted.attrs['compaction'] = {
+        'before_bytes': before,
+        'after_bytes': frame_bytes(compacted),
+        'dtypes': changed
+    }
+    return compacted
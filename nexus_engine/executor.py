@@ -0,0 +1,267 @@
+"""
+Narrative Nexus Engine - Background Execution
+Process pool with a bounded queue that runs analyses off the Streamlit script
+thread, reporting progress and honouring cancellation
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .pipeline import analyze_upload
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+QUEUE_PER_WORKER = 2
+PROGRESS_HISTORY = 256
+
+class QueueFull(RuntimeError):
+    """Every slot of the bounded job queue is taken"""
+
+class JobCancelled(Exception):
+    """Raised inside a job, at its next progress report, once it is cancelled"""
+
+# ==================== WORKER SIDE ====================
+
+_progress_queue = None  # (job id, fraction, message) back to the parent
+_cancel_flags = None    # shared byte per slot, set by the parent to cancel
+_job = None             # (job id, slot) of the job running in this worker
+
+def _init_worker(progress_queue, cancel_flags):
+    global _progress_queue, _cancel_flags
+    _progress_queue = progress_queue
+    _cancel_flags = cancel_flags
+
+def _run(job_id, slot, fn, args, kwargs):
+    global _job
+    _job = (job_id, slot)
+    try:
+        result = fn(*args, **kwargs)
+        report_progress(1.0, "Done")
+        return result
+    finally:
+        _job = None
+
+def report_progress(fraction, message=None):
+    """Record a running job's progress; raises JobCancelled if it was cancelled
+
+    Outside a worker (an inline run) this does nothing, so engine code can
+    report unconditionally.
+    """
+    if _job is None:
+        return
+    job_id, slot = _job
+    if _cancel_flags[slot]:
+        raise JobCancelled(job_id)
+    _progress_queue.put((job_id, float(fraction), message))
+
+# ==================== PARENT SIDE ====================
+
+class Job:
+    """Handle on a submitted job: status, progress, result and cancel"""
+
+    def __init__(self, job_id, slot, future, executor):
+        self.id = job_id
+        self.slot = slot
+        self.future = future
+        self._executor = executor
+        self.cancel_requested = False
+
+    def done(self):
+        return self.future.done()
+
+    def progress(self):
+        """(fraction 0-1, latest message) reported so far"""
+        return self._executor.progress(self.id)
+
+    def status(self):
+        if self.future.cancelled() or (self.cancel_requested and self.future.done()):
+            return 'cancelled'
+        if self.future.done():
+            return 'failed' if self.future.exception() is not None else 'done'
+        return 'running' if self.future.running() else 'queued'
+
+    def result(self, timeout=None):
+        """Job's return value; raises JobCancelled for a cancelled job and re-raises job errors"""
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            raise JobCancelled(self.id) from None
+
+    def cancel(self):
+        self._executor.cancel(self)
+
+class AnalysisExecutor:
+    """Process pool accepting at most max_pending queued or running jobs
+
+    A job is a picklable top-level function; engine code inside it reports
+    progress with report_progress(), which is also where a cancelled job
+    stops. Workers are spawned (not forked) so they never inherit the web
+    server's threads.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=None, context='spawn'):
+        self.workers = workers
+        self.max_pending = max_pending or workers * QUEUE_PER_WORKER
+        self._context = multiprocessing.get_context(context)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._free = list(range(self.max_pending))
+        self._owners = {}  # slot -> id of the job holding it
+        self._progress = {}
+        self._pool = None
+        self._queue = None
+        self._cancel_flags = None
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._queue = self._context.Queue()
+            self._cancel_flags = self._context.Array('b', self.max_pending, lock=False)
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=self._context,
+                initializer=_init_worker, initargs=(self._queue, self._cancel_flags)
+            )
+        return self._pool
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); raises QueueFull when max_pending jobs are in flight
+
+        A pool broken by a dead worker (say one OOM-killed) is replaced
+        before the job goes in; if the job still can't be queued it comes
+        back as a failed job rather than an exception.
+        """
+        broken = []
+        with self._lock:
+            if not self._free:
+                raise QueueFull(f"{self.max_pending} jobs already queued or running")
+            slot = self._free.pop()
+            job_id = next(self._ids)
+            self._owners[slot] = job_id
+            self._progress[job_id] = (0.0, "Queued")
+            while len(self._progress) > PROGRESS_HISTORY:
+                del self._progress[next(iter(self._progress))]
+            try:
+                future = self._submit(slot, job_id, fn, args, kwargs, broken)
+                queued = True
+            except Exception as e:
+                # Nothing runs in the slot, so hand it straight back
+                self._owners.pop(slot, None)
+                self._free.append(slot)
+                future = Future()
+                future.set_exception(e)
+                queued = False
+        for pool in broken:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if queued:
+            future.add_done_callback(lambda _: self._release(slot))
+        return Job(job_id, slot, future, self)
+
+    def _submit(self, slot, job_id, fn, args, kwargs, broken):
+        """pool.submit, retried once on a fresh pool; broken pools are appended for shutdown"""
+        for attempt in range(2):
+            pool = self._ensure_pool()
+            self._cancel_flags[slot] = 0
+            try:
+                return pool.submit(_run, job_id, slot, fn, args, kwargs)
+            except BrokenProcessPool:
+                broken.append(pool)
+                self._pool = None
+                if attempt:
+                    raise
+
+    def _release(self, slot):
+        with self._lock:
+            self._owners.pop(slot, None)
+            self._free.append(slot)
+
+    def cancel(self, job):
+        """Drop a queued job, or ask a running one to stop at its next progress report
+
+        The flag is only raised while the slot still belongs to this job; once
+        it is released the slot may already be carrying someone else's job.
+        """
+        job.cancel_requested = True
+        if job.future.cancel():
+            return
+        with self._lock:
+            if self._owners.get(job.slot) == job.id:
+                self._cancel_flags[job.slot] = 1
+
+    def progress(self, job_id):
+        self._drain()
+        with self._lock:
+            return self._progress.get(job_id, (0.0, None))
+
+    def _drain(self):
+        if self._queue is None:
+            return
+        while True:
+            try:
+                job_id, fraction, message = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                previous = self._progress.get(job_id, (0.0, None))[1]
+                self._progress[job_id] = (fraction, message or previous)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self.max_pending - len(self._free)
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+# ==================== JOBS ====================
+
+_WORKER_RESOURCES = {}
+
+def _worker_resource(kind, location):
+    """One AnalysisStore / ColumnarCache per location per worker process"""
+    if not location:
+        return None
+    key = (kind, location)
+    if key not in _WORKER_RESOURCES:
+        if kind == 'store':
+            from .store import AnalysisStore
+            _WORKER_RESOURCES[key] = AnalysisStore(location)
+        else:
+            from .columnar import ColumnarCache
+            _WORKER_RESOURCES[key] = ColumnarCache(location)
+    return _WORKER_RESOURCES[key]
+
+def analyze_upload_job(text_data, csv_data, store_path=None, columnar_dir=None, **kwargs):
+    """analyze_upload inside a worker; the store and columnar cache are reopened there by location"""
+    return analyze_upload(
+        text_data, csv_data,
+        store=_worker_resource('store', store_path),
+        columnar=_worker_resource('columnar', columnar_dir),
+        progress=report_progress,
+        **kwargs
+    )
+
+_DEFAULT_EXECUTOR = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_executor():
+    """Process-wide executor with NEXUS_WORKERS processes (default up to 4); None if set to 0"""
+    global _DEFAULT_EXECUTOR
+    workers = int(os.environ.get('NEXUS_WORKERS', DEFAULT_WORKERS))
+    with _DEFAULT_LOCK:
+        previous = _DEFAULT_EXECUTOR
+        if previous is not None and previous.workers != workers:
+            # Let its running jobs finish, but don't leave its processes behind
+            previous.shutdown(wait=False)
+            _DEFAULT_EXECUTOR = None
+        if workers > 0 and _DEFAULT_EXECUTOR is None:
+            _DEFAULT_EXECUTOR = AnalysisExecutor(workers)
+        return _DEFAULT_EXECUTOR
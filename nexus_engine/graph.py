@@ -0,0 +1,82 @@
+"""
+Narrative Nexus Engine - Echo Graph
+Co-occurrence network of echo keywords: one sliding-window pass over the
+terms, pruned to the strongest edges and ranked by centrality
+"""
+
+from collections import Counter, deque
+
+import networkx as nx
+
+from .cache import memoize
+from .text import extract_keywords
+from .tokens import as_document
+
+TOP_TERMS = 30
+WINDOW = 10      # keywords co-occur when fewer than WINDOW terms apart
+MAX_EDGES = 60
+MIN_WEIGHT = 2
+CLUSTER_SEED = 0
+
+def cooccurrence_counts(terms, vocabulary, window=WINDOW):
+    """{(a, b): count} of vocabulary terms fewer than window terms apart, a < b
+
+    One pass: each vocabulary term pairs with the distinct vocabulary terms
+    still in the window behind it, so the cost is O(len(terms) * window)
+    and only pairs that actually occur are stored.
+    """
+    counts = Counter()
+    recent = deque()  # (position, term) of the vocabulary terms inside the window
+    for position, term in enumerate(terms):
+        if term not in vocabulary:
+            continue
+        while recent and position - recent[0][0] >= window:
+            recent.popleft()
+        for other in {other for _, other in recent if other != term}:
+            counts[(other, term) if other < term else (term, other)] += 1
+        recent.append((position, term))
+    return counts
+
+def top_edges(counts, max_edges=MAX_EDGES, min_weight=MIN_WEIGHT):
+    """(a, b, weight) of the max_edges heaviest pairs seen at least min_weight times"""
+    return [(a, b, weight) for (a, b), weight in counts.most_common(max_edges) if weight >= min_weight]
+
+@memoize('echo_graph')
+def build_echo_graph(text, top_n=TOP_TERMS, window=WINDOW, max_edges=MAX_EDGES, min_weight=MIN_WEIGHT):
+    """Graph of the top_n keywords joined by their strongest co-occurrences
+
+    Nodes carry 'frequency' and 'centrality' (weighted PageRank over the
+    connected keywords, 0.0 for a keyword with no strong co-occurrence);
+    edges carry 'weight'. text is a string or a tokenized Document.
+    """
+    doc = as_document(text)
+    keywords = dict(extract_keywords(doc, top_n=top_n))
+    graph = nx.Graph()
+    graph.add_nodes_from((term, {'frequency': freq}) for term, freq in keywords.items())
+    graph.add_weighted_edges_from(top_edges(cooccurrence_counts(doc.terms, keywords, window), max_edges, min_weight))
+
+    # Isolated keywords would only collect PageRank's teleport share, so they are left at zero
+    connected = graph.subgraph(term for term, degree in graph.degree() if degree)
+    centrality = dict.fromkeys(graph, 0.0)
+    centrality.update(nx.pagerank(connected, weight='weight'))
+    nx.set_node_attributes(graph, centrality, 'centrality')
+    return graph
+
+def rank_echo_clusters(graph):
+    """Groups of keywords that keep appearing together, most central first
+
+    [{'terms', 'centrality', 'frequency', 'weight'}], terms ordered by
+    centrality; keywords with no strong co-occurrence are left out.
+    """
+    nodes = graph.nodes
+    clusters = []
+    for community in nx.community.louvain_communities(graph, weight='weight', seed=CLUSTER_SEED):
+        if len(community) < 2:
+            continue
+        clusters.append({
+            'terms': sorted(community, key=lambda term: (-nodes[term]['centrality'], term)),
+            'centrality': sum(nodes[term]['centrality'] for term in community),
+            'frequency': sum(nodes[term]['frequency'] for term in community),
+            'weight': graph.subgraph(community).size(weight='weight')
+        })
+    return sorted(clusters, key=lambda cluster: cluster['centrality'], reverse=True)
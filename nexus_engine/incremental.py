@@ -0,0 +1,146 @@
+"""
+Narrative Nexus Engine - Incremental Analysis
+Re-analyze a running notes document by tokenizing only the text appended
+since the last analysis
+"""
+
+import hashlib
+import threading
+
+from .cache import ResultCache, content_hash, estimate_size
+from .mismatch import REGION_GAZETTEER
+from .outofcore import MAX_TERMS, StreamingDocument, stream_profile_upload
+from .pipeline import (
+    BRANCH_RUNS, RESULT_CACHE, RESULT_SCHEMA_VERSION, _as_profile, analyze_document, load_text_upload, through_store
+)
+from .text import SENTIMENT_LEXICON
+from .tokens import Document
+
+LINEAGE_ENTRIES = 64
+
+# Latest IncrementalDocument per lineage id (e.g. the uploaded file name)
+LINEAGES = ResultCache(max_entries=LINEAGE_ENTRIES)
+_LINEAGE_LOCK = threading.Lock()
+
+def _merge(counts, added, removed):
+    """counts += added - removed, dropping entries that fall to zero"""
+    counts.update(added)
+    for key, value in removed.items():
+        remaining = counts.get(key, 0) - value
+        if remaining > 0:
+            counts[key] = remaining
+        else:
+            counts.pop(key, None)
+
+class IncrementalDocument(StreamingDocument):
+    """Document counts that grow by appended text, in time proportional to the delta
+
+    A short tail of the text already seen is re-tokenized together with each
+    delta and its own counts subtracted again, so a word split across the
+    append boundary, multi-word phrases and negation windows count exactly
+    as if the whole text had been tokenized at once.
+    """
+
+    def __init__(self, max_terms=MAX_TERMS, lexicons=(SENTIMENT_LEXICON, REGION_GAZETTEER)):
+        super().__init__(max_terms=max_terms, lexicons=lexicons)
+        self.n_chars = 0
+        self._digest = hashlib.sha256()
+        self._tail = ''
+        self._context_terms = max([lexicon.context_terms for lexicon in lexicons], default=0) + 1
+
+    @property
+    def nbytes(self):
+        """Approximate footprint, for the lineage cache's byte budget"""
+        return estimate_size(self.word_counts) + estimate_size(self.term_counts) + len(self._tail)
+
+    def extends(self, text):
+        """Whether text starts with everything appended so far"""
+        if len(text) < self.n_chars:
+            return False
+        prefix = text[:self.n_chars].encode('utf-8', errors='surrogatepass')
+        return hashlib.sha256(prefix).digest() == self._digest.digest()
+
+    def append(self, delta):
+        """Fold appended text into every count"""
+        if not delta:
+            return
+        before = Document(self._tail)
+        after = Document(self._tail + delta)
+        self.n_words += len(after) - len(before)
+        _merge(self.word_counts, after.word_counts, before.word_counts)
+        _merge(self.term_counts, after.term_counts, before.term_counts)
+        for lexicon, hits in self._lexicon_counts.items():
+            _merge(hits, after.lexicon_counts(lexicon), before.lexicon_counts(lexicon))
+        self._keyword_counts.clear()
+        self._bound()
+
+        self.n_chars += len(delta)
+        self._digest.update(delta.encode('utf-8', errors='surrogatepass'))
+        self._tail = self._tail_of(after.text)
+
+    def _tail_of(self, text):
+        """Shortest whitespace-aligned suffix holding enough terms of left context"""
+        n_words = self._context_terms
+        while True:
+            parts = text.rsplit(None, n_words)
+            if len(parts) <= n_words:
+                return text
+            tail = text[len(parts[0]):]
+            if len(Document(tail).terms) >= self._context_terms:
+                return tail
+            n_words *= 2
+
+    def add(self, text):
+        self.append(text)
+
+def update_lineage(lineage_id, text, lineages=LINEAGES):
+    """Latest IncrementalDocument of a lineage and the number of new characters
+
+    Text that does not extend the previous version (an edit rather than an
+    append) restarts the lineage from scratch.
+    """
+    key = content_hash('lineage', lineage_id)
+    doc = lineages.get(key)
+    if doc is None or not doc.extends(text):
+        doc = IncrementalDocument()
+    new_chars = len(text) - doc.n_chars
+    doc.append(text[doc.n_chars:])
+    lineages.set(key, doc)
+    return doc, new_chars
+
+def analyze_incremental(lineage_id, text, df, n_runs=BRANCH_RUNS, lineages=LINEAGES):
+    """Hybrid analysis of the latest version of a running document, reusing earlier counts"""
+    text = text or ''
+    with _LINEAGE_LOCK:
+        doc, new_chars = update_lineage(lineage_id, text, lineages=lineages)
+        if len(doc) == 0:
+            return None
+        result = analyze_document(doc, _as_profile(df), n_runs=n_runs)
+    result['words_capped'] = False
+    result['approximate_terms'] = doc.approximate
+    result['new_chars'] = new_chars
+    result['incremental'] = new_chars < len(text)
+    return result
+
+def analyze_lineage_upload(lineage_id, text_data, csv_data, cache=RESULT_CACHE, lineages=LINEAGES,
+                           store=None, csv_name=None, columnar=None):
+    """Full-data analysis of an upload that may extend an earlier upload of the same lineage
+
+    lineages holds the in-memory counts; store is an optional persistent
+    AnalysisStore recording the results.
+    """
+    key = content_hash('analysis-lineage', lineage_id, text_data, csv_data, version=RESULT_SCHEMA_VERSION)
+
+    def compute():
+        profile = stream_profile_upload(csv_data, cache=cache, store=store, name=csv_name,
+                                        columnar=columnar) if csv_data else None
+        text = load_text_upload(text_data, cache=cache)
+        result = analyze_incremental(lineage_id, text, profile, lineages=lineages)
+        if result is not None:
+            result['rows_capped'] = False
+        return result
+
+    return cache.get_or_compute(key, lambda: through_store(
+        store, key, compute, kind='full', text_name=lineage_id, csv_name=csv_name,
+        profile_hash=content_hash('profile-full', csv_data, version=RESULT_SCHEMA_VERSION) if csv_data else None
+    ), namespace='analysis', tags=(content_hash(text_data), content_hash(csv_data) if csv_data else None))
@@ -0,0 +1,91 @@
+"""
+Narrative Nexus Engine - CSV Ingestion
+Chunked, schema-fixed CSV reads that stop as soon as enough rows are loaded
+"""
+
+import os
+
+import pandas as pd
+
+SAMPLE_ROWS = 500
+CHUNK_ROWS = 10_000
+
+# Sample dtypes we pin for the full read; anything else is left to pandas
+FIXED_DTYPE_KINDS = {'i': 'int64', 'f': 'float64', 'b': 'bool'}
+
+# ==================== HELPERS ====================
+
+def _tell(source):
+    """Current position of a file-like source, or None for paths"""
+    if hasattr(source, 'seek') and hasattr(source, 'tell'):
+        try:
+            return source.tell()
+        except (OSError, ValueError):
+            return None
+    return None
+
+def _replayable(source, position):
+    """Paths can be re-opened; file-likes only if we know where they started"""
+    return isinstance(source, (str, os.PathLike)) or position is not None
+
+def _rewind(source, position):
+    if position is not None:
+        source.seek(position)
+
+def _column_filter(usecols):
+    """Turn a column list into a projection that tolerates missing columns"""
+    if usecols is None or callable(usecols):
+        return usecols
+    wanted = set(usecols)
+    return lambda col: col in wanted
+
+# ==================== SCHEMA ====================
+
+def infer_schema(source, sample_rows=SAMPLE_ROWS, usecols=None):
+    """Infer a fixed dtype map from the first sample_rows rows"""
+    position = _tell(source)
+    sample = pd.read_csv(source, nrows=sample_rows, usecols=_column_filter(usecols))
+    _rewind(source, position)
+
+    schema = {}
+    for col, dtype in sample.dtypes.items():
+        fixed = FIXED_DTYPE_KINDS.get(dtype.kind)
+        if fixed:
+            schema[col] = fixed
+    return schema
+
+# ==================== STREAMING READS ====================
+
+def iter_csv_chunks(source, usecols=None, schema=None, max_rows=None, chunk_rows=CHUNK_ROWS):
+    """Yield dataframe chunks, stopping after max_rows rows"""
+    reader = pd.read_csv(
+        source,
+        usecols=_column_filter(usecols),
+        dtype=schema or None,
+        nrows=max_rows,
+        chunksize=chunk_rows
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+def read_csv_stream(source, max_rows=None, usecols=None, chunk_rows=CHUNK_ROWS, sample_rows=SAMPLE_ROWS):
+    """Read at most max_rows rows with a sample-inferred schema and bounded memory"""
+    position = _tell(source)
+    replayable = _replayable(source, position)
+    schema = infer_schema(source, sample_rows=sample_rows, usecols=usecols) if replayable else None
+
+    try:
+        chunks = list(iter_csv_chunks(source, usecols, schema, max_rows, chunk_rows))
+    except (ValueError, TypeError):
+        if not schema:
+            raise
+        # A value later in the file broke the sampled schema; fall back to inference
+        _rewind(source, position)
+        chunks = list(iter_csv_chunks(source, usecols, None, max_rows, chunk_rows))
+
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,40 @@
+"""
+Narrative Nexus Engine - Intent Model
+Optional linear classifier for NLQ queries the keyword rules cannot place,
+trained locally from a labelled CSV of (query, intent) rows
+"""
+
+import csv
+import os
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+except ImportError:  # Optional: without scikit-learn NLQ uses the keyword index alone
+    make_pipeline = None
+
+from .nlq import QUERY_WORD_PATTERN
+
+INTENT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nlq_intents.csv')
+
+def load_intent_rows(path=INTENT_FIXTURE):
+    """(queries, intents) from a CSV with query and intent columns"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = [(row['query'], row['intent']) for row in csv.DictReader(f) if row['query'].strip()]
+    return [query for query, _ in rows], [intent for _, intent in rows]
+
+def train_intent_model(path=INTENT_FIXTURE):
+    """TF-IDF (words and word pairs) + logistic regression fitted on the labelled queries
+
+    The result predicts a whole list of queries in one call, as
+    parse_nlq_intents(queries, model=...) uses it.
+    """
+    if make_pipeline is None:
+        raise ImportError("scikit-learn is required for the NLQ intent model")
+    queries, intents = load_intent_rows(path)
+    model = make_pipeline(
+        TfidfVectorizer(token_pattern=QUERY_WORD_PATTERN.pattern, ngram_range=(1, 2), sublinear_tf=True),
+        LogisticRegression(max_iter=1000)
+    )
+    return model.fit(queries, intents)
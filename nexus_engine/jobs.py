@@ -0,0 +1,182 @@
+"""
+Narrative Nexus Engine - Analysis Jobs
+Submit an analysis, keep its job id, poll status and result on later reruns;
+one job per input hash however many sessions ask for it
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .executor import JobCancelled, default_executor
+from .pipeline import RESULT_CACHE
+
+MAX_JOBS = 256
+
+class JobRecord:
+    """One submitted analysis: its input key, future and (when pooled) executor job"""
+
+    def __init__(self, key, future, job=None, label=None, tags=()):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.tags = tags
+        self.future = future
+        self.job = job
+        self.label = label
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self.followers = set()
+
+    def status(self):
+        if self.cancelled:
+            return 'cancelled'
+        if self.job is not None:
+            return self.job.status()
+        if not self.future.done():
+            return 'running'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def progress(self):
+        if self.job is not None:
+            return self.job.progress()
+        return (1.0, "Done") if self.future.done() else (0.0, None)
+
+class JobRegistry:
+    """Process-wide jobs by id and by input key, shared by every session
+
+    A job keeps running when the session that submitted it reruns or
+    navigates away. A second submit with the same input key gets the
+    existing job's id unless it failed or was cancelled, and its follower
+    joins the job; cancelling detaches one follower and stops the job only
+    once no follower is left. Finished results also go into the result
+    cache under their key.
+    """
+
+    def __init__(self, executor=default_executor, cache=RESULT_CACHE, max_jobs=MAX_JOBS):
+        self._executor = executor
+        self.cache = cache
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, label=None, tags=(), follower=None, **kwargs):
+        """Job id computing fn(*args, **kwargs) for input key; an equal live job is reused
+
+        Runs inline when there is no executor; raises QueueFull when its
+        queue is full. tags are the inputs' content hashes, for the cached
+        result's invalidate_content(). follower (a session id) is attached
+        to the job, new or reused.
+        """
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.status() not in ('failed', 'cancelled'):
+                if follower is not None:
+                    existing.followers.add(follower)
+                return existing.id
+
+            executor = self._executor() if callable(self._executor) else self._executor
+            if executor is None:
+                future = Future()
+                record = JobRecord(key, future, label=label, tags=tags)
+            else:
+                job = executor.submit(fn, *args, **kwargs)
+                record = JobRecord(key, job.future, job=job, label=label, tags=tags)
+            if follower is not None:
+                record.followers.add(follower)
+            self._jobs[record.id] = record
+            self._by_key[key] = record.id
+            self._evict()
+
+        record.future.add_done_callback(lambda _: self._finished(record))
+        if executor is None:
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        return record.id
+
+    def _finished(self, record):
+        record.finished_at = time.time()
+        if record.cancelled or record.future.cancelled() or record.future.exception() is not None:
+            return
+        result = record.future.result()
+        if result is not None and self.cache is not None:
+            self.cache.set(record.key, result, tags=record.tags)
+
+    def _evict(self):
+        """Forget the oldest finished jobs past max_jobs"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                return
+            record = self._jobs[job_id]
+            if record.future.done():
+                del self._jobs[job_id]
+                if self._by_key.get(record.key) == job_id:
+                    del self._by_key[record.key]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """{'id', 'key', 'label', 'status', 'progress', 'message', 'error', ...} or None for an unknown id"""
+        record = self.get(job_id)
+        if record is None:
+            return None
+        status = record.status()
+        fraction, message = record.progress()
+        error = None
+        if status == 'failed':
+            error = f"{type(record.future.exception()).__name__}: {record.future.exception()}"
+        return {
+            'id': record.id,
+            'key': record.key,
+            'label': record.label,
+            'status': status,
+            'progress': fraction,
+            'message': message,
+            'followers': len(record.followers),
+            'error': error,
+            'submitted_at': record.submitted_at,
+            'finished_at': record.finished_at
+        }
+
+    def result(self, job_id, timeout=None):
+        """A job's result, waiting up to timeout; raises JobCancelled / the job's error"""
+        record = self.get(job_id)
+        if record is None:
+            raise KeyError(job_id)
+        if record.cancelled:
+            raise JobCancelled(job_id)
+        if record.job is not None:
+            return record.job.result(timeout)
+        return record.future.result(timeout)
+
+    def cancel(self, job_id, follower=None):
+        """Detach follower from a job; True if that stopped it, False if other sessions still follow it"""
+        record = self.get(job_id)
+        if record is None or record.future.done():
+            return False
+        with self._lock:
+            record.followers.discard(follower)
+            if record.followers:
+                return False
+            record.cancelled = True
+            if self._by_key.get(record.key) == job_id:
+                del self._by_key[record.key]
+        if record.job is not None:
+            record.job.cancel()
+        return True
+
+    def active(self):
+        """Status of every queued or running job"""
+        with self._lock:
+            ids = [job_id for job_id, record in self._jobs.items() if not record.future.done()]
+        return [self.status(job_id) for job_id in ids]
+
+# Shared by every session in this process
+JOBS = JobRegistry()
@@ -0,0 +1,129 @@
+"""
+Narrative Nexus Engine - Lexicon Matching
+Compiled multi-word phrase matching (sentiment words, region/product gazetteers)
+in one linear pass over a document's terms
+"""
+
+import csv
+from collections import Counter, deque
+
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'none', 'nobody', 'nothing', 'neither', 'nor', 'without',
+    'cannot', 'hardly', 'barely', 'lack', 'lacks', 'lacking'
+})
+# Stems of contractions split by the tokenizer ("don't" -> "don", "t"); some are
+# words of their own ("we won the deal"), so they negate only when 't' follows
+CONTRACTIONS = frozenset({
+    'don', 'doesn', 'didn', 'isn', 'aren', 'wasn', 'weren', 'won', 'wouldn',
+    'shouldn', 'couldn', 'haven', 'hasn', 'hadn', 'ain'
+})
+# Terms after a negation that it still applies to; "don't" already spends two
+NEGATION_WINDOW = 4
+
+class Lexicon:
+    """Aho-Corasick automaton over terms: every entry phrase maps to a label
+
+    Phrases are matched on whole terms, so 'port harcourt' matches the terms
+    ['port', 'harcourt'] and 'lagos' never matches inside 'lagoslike'. With a
+    negation_window, a hit preceded by a negation term within that many terms
+    is reported as negated; a contraction stem counts as one only when the
+    next term is 't'.
+    """
+
+    def __init__(self, entries, negations=NEGATIONS, negation_window=0, contractions=CONTRACTIONS):
+        if not isinstance(entries, dict):
+            entries = {phrase: phrase for phrase in entries}
+        self.negations = frozenset(negations)
+        self.contractions = frozenset(contractions)
+        self.negation_window = negation_window
+        self.labels = frozenset(entries.values())
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._size = 0
+        self._longest = 0
+        for phrase, label in entries.items():
+            self._add(phrase.lower().split(), label)
+        self._link()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def context_terms(self):
+        """Preceding terms that can change whether a hit ends at a given term"""
+        return max(self._longest - 1, 0) + self.negation_window
+
+    def _add(self, terms, label):
+        if not terms:
+            return
+        self._size += 1
+        self._longest = max(self._longest, len(terms))
+        state = 0
+        for term in terms:
+            if term not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][term] = len(self._goto) - 1
+            state = self._goto[state][term]
+        self._out[state] = self._out[state] + ((label, len(terms)),)
+
+    def _link(self):
+        """Breadth-first failure links; each state inherits its fallback's outputs"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for term, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and term not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(term, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, terms):
+        """Yield (label, start, end, negated) for every occurrence, overlapping ones included"""
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        window = self.negation_window
+        negation_terms = self.negations if window else frozenset()
+        contraction_terms = self.contractions if window else frozenset()
+        # Negation positions still able to precede a phrase ending here
+        negations = deque(maxlen=window + self._longest)
+        state = 0
+        previous = None
+        for i, term in enumerate(terms):
+            if term in negation_terms:
+                negations.append(i)
+            elif term == 't' and previous in contraction_terms:
+                negations.append(i - 1)
+            previous = term
+            if not state and term not in root:
+                # Fast path: most terms start no phrase
+                continue
+            while state and term not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(term, 0)
+            for label, length in out[state]:
+                start = i - length + 1
+                negated = any(start - window <= p < start for p in negations) if window else False
+                yield label, start, i + 1, negated
+
+    def count(self, terms):
+        """Counter of (label, negated) over every hit"""
+        return Counter((label, negated) for label, _, _, negated in self.scan(terms))
+
+def load_gazetteer(path, negation_window=0):
+    """Lexicon from a file of one name per line, or 'phrase,label' CSV rows for aliases"""
+    entries = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                continue
+            phrase = row[0].strip()
+            entries[phrase] = row[1].strip() if len(row) > 1 and row[1].strip() else phrase
+    return Lexicon(entries, negation_window=negation_window)
+
+def mentioned_labels(hits):
+    """Labels with at least one hit, negated or not"""
+    return {label for label, _ in hits}
@@ -0,0 +1,53 @@
+"""
+Narrative Nexus Engine - Mismatch Scoring
+Compare what the meeting notes emphasise against what the data shows
+"""
+
+from .lexicon import Lexicon, mentioned_labels
+from .profile import as_profile
+from .tokens import as_document
+
+KNOWN_REGIONS = ['Lagos', 'Abuja']
+REGION_GAZETTEER = Lexicon({region.lower(): region for region in KNOWN_REGIONS})
+
+def calculate_mismatch(text, df):
+    """Calculate text-data mismatch score"""
+    if df is None or text is None:
+        return 0
+
+    text_words = set(as_document(text).word_counts)
+    df_cols = set(str(as_profile(df).columns).lower().split())
+
+    overlap = len(text_words & df_cols)
+    total = len(text_words | df_cols)
+
+    mismatch = 100 - (overlap / total * 100 if total > 0 else 0)
+    return max(0, min(100, mismatch))
+
+def calculate_mismatch_score(text, df, gazetteer=REGION_GAZETTEER):
+    """Calculate nexus mismatch score (df may be a DataProfile)
+
+    Regions are found with a compiled gazetteer; pass load_gazetteer(path)
+    to recognise more regions or aliases.
+    """
+    if df is None or df.empty:
+        return 50
+
+    try:
+        doc = as_document(text)
+        regions_in_text = mentioned_labels(doc.lexicon_counts(gazetteer))
+
+        top_region = as_profile(df).top_region
+        if top_region is not None:
+            if regions_in_text and top_region not in regions_in_text:
+                mismatch = 70
+            elif regions_in_text and top_region in regions_in_text:
+                mismatch = 20
+            else:
+                mismatch = 50
+        else:
+            mismatch = 50
+
+        return mismatch
+    except:
+        return 50
@@ -0,0 +1,319 @@
+"""
+Narrative Nexus Engine - Natural Language Query
+Intent parsing, mock data, insights and story weaving for NLQ mode
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .lexicon import mentioned_labels
+from .mismatch import REGION_GAZETTEER
+from .text import STOP_WORDS
+from .tokens import Document
+
+# ==================== INTENT RULES ====================
+
+# Checked in this order; ties go to the earlier intent
+INTENT_KEYWORDS = {
+    'bias_check': [
+        'bias', 'biased', 'echo', 'focus', 'focused', 'focusing', 'team',
+        'blind', 'assume', 'assumption', 'ignore', 'ignoring', 'happening'
+    ],
+    'sales_issue': [
+        'sales', 'sale', 'revenue', 'down', 'drop', 'dropped', 'dropping',
+        'decline', 'declining', 'low', 'fix', 'boost', 'losing', 'customers'
+    ],
+    'forecast': [
+        'forecast', 'predict', 'prediction', 'expect', 'growth', 'grow',
+        'next', 'future', 'quarter', 'projection', 'outlook'
+    ]
+}
+
+NLQ_POSITIVE_WORDS = {
+    'good', 'great', 'excellent', 'amazing', 'growing', 'growth', 'grow',
+    'opportunity', 'strong', 'success', 'profit', 'up', 'increase', 'happy',
+    'love', 'best', 'booming'
+}
+
+NLQ_NEGATIVE_WORDS = {
+    'bad', 'poor', 'terrible', 'awful', 'down', 'drop', 'dropped', 'dropping',
+    'decline', 'declining', 'low', 'loss', 'losing', 'unhappy', 'problem',
+    'problems', 'issue', 'issues', 'struggling', 'worse', 'fail', 'failing'
+}
+
+QUERY_WORD_PATTERN = re.compile(r'[a-z]+')
+
+MOCK_REGIONS = ['Urban', 'Rural', 'Suburban']
+MOCK_ROWS = 10
+MOCK_BASE = 6000.0
+MOCK_START = '2025-01-01'
+# Row intervals tried in order when none is given: the first whose dates fit
+MOCK_FREQS = ('1D', '1h', '1min', '1s')
+MOCK_CHUNK_ROWS = 1_000_000
+# Revenue change from the first period to the last, by intent
+MOCK_TRENDS = {'sales_issue': -0.36, 'forecast': 0.45, 'bias_check': 0.54}
+
+DEFAULT_INTENT = 'general_advice'
+MAX_KEY_TERMS = 5
+
+# ==================== INTENT PARSING ====================
+
+class IntentIndex:
+    """Inverted index from query word to the intents and sentiment it votes for
+
+    Built once from the rule lists, so classifying a query is one pass over
+    its words with a dict lookup each, whatever the number of rules.
+    """
+
+    def __init__(self, intent_keywords=INTENT_KEYWORDS, positive=NLQ_POSITIVE_WORDS,
+                 negative=NLQ_NEGATIVE_WORDS, stop_words=STOP_WORDS):
+        self.intents = list(intent_keywords)
+        self.stop_words = frozenset(stop_words)
+        votes = {}
+        for i, keywords in enumerate(intent_keywords.values()):
+            for word in keywords:
+                votes.setdefault(word, set()).add(i)
+        self._index = {
+            word: (tuple(sorted(votes.get(word, ()))), (word in positive) - (word in negative))
+            for word in set(votes) | set(positive) | set(negative)
+        }
+
+    def scores(self, words):
+        """(hits per intent, sentiment balance, key terms) in one pass over words"""
+        scores = [0] * len(self.intents)
+        balance = 0
+        key_terms = []
+        for word in words:
+            entry = self._index.get(word)
+            if entry is not None:
+                for i in entry[0]:
+                    scores[i] += 1
+                balance += entry[1]
+            if len(key_terms) < MAX_KEY_TERMS and len(word) > 3 and word not in self.stop_words \
+                    and word not in key_terms:
+                key_terms.append(word)
+        return scores, balance, key_terms
+
+    def classify(self, query):
+        """{'intent', 'sentiment', 'key_terms', 'query'}; ties go to the earlier intent"""
+        words = QUERY_WORD_PATTERN.findall((query or '').lower())
+        scores, balance, key_terms = self.scores(words)
+        best = max(scores, default=0)
+        return {
+            'intent': self.intents[scores.index(best)] if best > 0 else DEFAULT_INTENT,
+            'sentiment': 'positive' if balance > 0 else 'negative' if balance < 0 else 'neutral',
+            'key_terms': key_terms,
+            'query': query or ''
+        }
+
+# Built once at import; shared by every query
+INTENT_INDEX = IntentIndex()
+
+def parse_nlq_intent(query):
+    """Classify a query into an intent with sentiment and key terms"""
+    return INTENT_INDEX.classify(query)
+
+def parse_nlq_intents(queries, model=None):
+    """parse_nlq_intent for many queries; a trained model labels those no rule matched
+
+    model is anything with a batch predict(list of queries), such as
+    intent_model.train_intent_model()'s; it runs once over all the
+    rule-less queries.
+    """
+    parsed = [INTENT_INDEX.classify(query) for query in queries]
+    if model is not None:
+        fallback = [p for p in parsed if p['intent'] == DEFAULT_INTENT and p['query']]
+        if fallback:
+            for p, intent in zip(fallback, model.predict([p['query'] for p in fallback])):
+                p['intent'] = str(intent)
+    return parsed
+
+# ==================== MOCK DATA ====================
+
+def _mock_trends(intent, n_regions):
+    """Revenue change over the whole period for each region"""
+    if intent == 'bias_check':
+        # The region the team focuses on (the first) stays flat; the ignored ones grow
+        return np.r_[0.0, np.full(n_regions - 1, MOCK_TRENDS['bias_check'])]
+    return np.full(n_regions, MOCK_TRENDS.get(intent, 0.0))
+
+def _dates_fit(first, step, n_rows):
+    try:
+        return first + step * max(n_rows - 1, 0) <= pd.Timestamp.max
+    except (OverflowError, ValueError):
+        return False
+
+def _mock_step(first, n_rows, freq):
+    """Row interval: freq, or without one the longest of MOCK_FREQS whose dates fit"""
+    for candidate in (freq,) if freq is not None else MOCK_FREQS:
+        step = pd.Timedelta(candidate)
+        if _dates_fit(first, step, n_rows):
+            return step
+    raise ValueError(f"{n_rows:,} rows {freq or MOCK_FREQS[-1]} apart run past the last representable date; "
+                     "use a shorter freq")
+
+def iter_mock_chunks(query_data, n_rows=MOCK_ROWS, seed=42, regions=MOCK_REGIONS, base=MOCK_BASE,
+                     seasonality=0.0, season_length=7, noise=0.01, freq=None, start=MOCK_START,
+                     chunk_rows=MOCK_CHUNK_ROWS):
+    """Yield the mock Date/Region/Revenue/Units_Sold frame in chunks of up to chunk_rows rows
+
+    Row i is period i (freq, a Timedelta string like '1D' or '15min', after
+    start; daily unless the dates would pass pandas' last date) for region
+    i % len(regions). Revenue starts at base (one value, or one per region),
+    follows the intent's trend across the whole period, times a seasonal
+    sine of relative amplitude seasonality repeating every season_length
+    rows, plus Gaussian noise with standard deviation noise * base. The rows
+    depend only on the arguments and seed, never on chunk_rows.
+    """
+    first = pd.Timestamp(start)
+    step = _mock_step(first, n_rows, freq)
+
+    rng = np.random.default_rng(seed)
+    trends = _mock_trends(query_data.get('intent', DEFAULT_INTENT), len(regions))
+    bases = np.broadcast_to(np.asarray(base, dtype=float), (len(regions),))
+    categories = pd.Index(regions)
+    span = max(n_rows - 1, 1)
+    for offset in range(0, n_rows, chunk_rows):
+        steps = np.arange(offset, min(offset + chunk_rows, n_rows))
+        codes = steps % len(regions)
+        revenue = bases[codes] * (1 + trends[codes] * (steps / span))
+        if seasonality:
+            revenue *= 1 + seasonality * np.sin(2 * np.pi * steps / season_length)
+        # Drawn chunk by chunk from one generator: the same stream as a single draw
+        revenue = np.maximum(revenue + rng.standard_normal(len(steps)) * (bases[codes] * noise), 0).round(2)
+        yield pd.DataFrame({
+            'Date': first + pd.to_timedelta(steps * step.value),
+            'Region': pd.Categorical.from_codes(codes, categories=categories),
+            'Revenue': revenue,
+            'Units_Sold': (revenue / 50).round().astype(int)
+        })
+
+def generate_mock_df(query_data, n_rows=MOCK_ROWS, seed=42, **options):
+    """Region/Revenue dataset shaped by the query intent: declining sales, growing forecast, ...
+
+    Vectorized and deterministic per seed, 10 rows to 10M; options
+    (regions, base, seasonality, noise, freq, ...) are those of
+    iter_mock_chunks.
+    """
+    chunks = list(iter_mock_chunks(query_data, n_rows, seed, **options))
+    if not chunks:
+        return next(iter_mock_chunks(query_data, 1, seed, **options)).iloc[:0]
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+# ==================== INSIGHTS ====================
+
+def generate_nlq_insights(query_data, df):
+    """Generate 3-4 bullet insights for the query"""
+    intent = query_data.get('intent', 'general_advice')
+    insights = []
+
+    if df is None or df.empty or 'Revenue' not in df.columns:
+        return [
+            "💡 Upload data with a Revenue column for a deeper analysis",
+            "📊 Compare regions before committing resources",
+            "⚠️ Watch for repeated assumptions in team discussions"
+        ]
+
+    revenue = df['Revenue'].astype(float)
+    first, last = revenue.iloc[0], revenue.iloc[-1]
+    change = (last - first) / first * 100 if first else 0.0
+
+    region_means = None
+    if 'Region' in df.columns:
+        region_means = df.groupby('Region', observed=True)['Revenue'].mean().sort_values(ascending=False)
+
+    if intent == 'sales_issue':
+        insights.append(f"📉 Revenue changed {change:+.1f}% over the period")
+        insights.append(f"📊 Average revenue is ${revenue.mean():,.0f} per period")
+        if region_means is not None and len(region_means) > 1:
+            insights.append(f"🔍 Weakest region: {region_means.index[-1]} (${region_means.iloc[-1]:,.0f} avg)")
+        insights.append("💡 Focus recovery efforts where the decline started")
+    elif intent == 'forecast':
+        insights.append(f"📈 Revenue momentum is {change:+.1f}% across the period")
+        insights.append(f"🔮 Next period projection: ${last * (1 + change / 100 / max(len(df) - 1, 1)):,.0f}")
+        insights.append("💡 Lock in the channels driving current growth")
+    elif intent == 'bias_check':
+        if region_means is not None and len(region_means) > 1:
+            gap = region_means.iloc[0] - region_means.iloc[-1]
+            insights.append(f"⚖️ Regional gap of ${gap:,.0f} between {region_means.index[0]} and {region_means.index[-1]}")
+        else:
+            insights.append("⚖️ Add a Region column to check regional balance")
+        insights.append("🔍 Team focus may not match where revenue is growing")
+        insights.append("💡 Test the overlooked segment before reallocating budget")
+    else:
+        insights.append(f"📊 Average revenue is ${revenue.mean():,.0f} per period")
+        insights.append(f"📈 Overall trend: {change:+.1f}%")
+        insights.append("💡 Balance investment across your strongest regions")
+
+    return insights
+
+# ==================== STORIES & SCORE ====================
+
+def generate_nlq_stories(query_data, df, insights):
+    """Weave 4 strategic story branches for the query"""
+    intent = query_data.get('intent', 'general_advice')
+    focus = {
+        'sales_issue': 'recover lost sales',
+        'forecast': 'capture projected growth',
+        'bias_check': 'correct the team blind spot',
+        'general_advice': 'strengthen the business'
+    }.get(intent, 'strengthen the business')
+
+    return [
+        {
+            'title': '🛡️ Stay the Course',
+            'description': f"Keep the current plan and monitor whether it can {focus}",
+            'outcome': 'Predictable results, limited upside',
+            'growth': '+2%',
+            'risk': 20
+        },
+        {
+            'title': '🔄 Rebalance',
+            'description': f"Shift 20% of budget toward the data-backed opportunity to {focus}",
+            'outcome': 'Moderate, well-evidenced gains',
+            'growth': '+10%',
+            'risk': 35
+        },
+        {
+            'title': '🚀 Bold Pivot',
+            'description': f"Commit fully to the new direction to {focus}",
+            'outcome': 'High upside with execution risk',
+            'growth': '+25%',
+            'risk': 60
+        },
+        {
+            'title': '🧪 Test & Learn',
+            'description': f"Run a small pilot to {focus} before scaling",
+            'outcome': 'Evidence before commitment',
+            'growth': '+8%',
+            'risk': 15
+        }
+    ]
+
+def calculate_nlq_score(query_data, insights):
+    """Nexus Advice Score (0-100) - confidence in the advice"""
+    score = 60
+    if query_data.get('intent') != 'general_advice':
+        score += 15
+    score += min(len(insights), 4) * 5
+    if query_data.get('key_terms'):
+        score += 5
+    return max(0, min(100, score))
+
+# ==================== HISTORY ====================
+
+def query_history(query, store, limit=10):
+    """Stored analyses about the regions or echo keywords a question mentions"""
+    if store is None or not query:
+        return None
+    regions = mentioned_labels(Document(query).lexicon_counts(REGION_GAZETTEER))
+    terms = parse_nlq_intent(query)['key_terms']
+    frames = [store.find(region=r, limit=limit) for r in sorted(regions)]
+    frames += [store.find(keyword=t, limit=limit) for t in terms]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return None
+    history = pd.concat(frames).drop_duplicates('id')
+    return history.sort_values('created_at', ascending=False).head(limit)
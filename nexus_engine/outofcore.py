@@ -0,0 +1,374 @@
+"""
+Narrative Nexus Engine - Out-of-Core Analysis
+Stream arbitrarily large transcripts and CSVs through incremental aggregators
+so analyses cover the full data within a fixed memory budget
+"""
+
+import io
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash
+from .ingest import iter_csv_chunks
+from .mismatch import REGION_GAZETTEER
+from .pipeline import BRANCH_RUNS, RESULT_CACHE, RESULT_SCHEMA_VERSION, analyze_document, through_store
+from .profile import HISTOGRAM_BINS, MAX_CATEGORIES, DataProfile
+from .text import SENTIMENT_LEXICON
+from .tokens import Document
+
+CHUNK_ROWS = 50_000
+TEXT_CHUNK_CHARS = 1 << 20
+RESERVOIR_SIZE = 1000
+MAX_TERMS = 200_000
+
+# ==================== SOURCES ====================
+
+def _open_text(source):
+    """Text stream for a path, bytes, str or file-like source"""
+    if isinstance(source, (str, os.PathLike)) and os.path.exists(source):
+        return open(source, 'r', encoding='utf-8', errors='replace')
+    if isinstance(source, bytes):
+        return io.TextIOWrapper(io.BytesIO(source), encoding='utf-8', errors='replace')
+    if isinstance(source, str):
+        return io.StringIO(source)
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(source, encoding='utf-8', errors='replace')
+
+def iter_text_chunks(source, chunk_chars=TEXT_CHUNK_CHARS):
+    """Yield text chunks that never split a token across two chunks"""
+    stream = _open_text(source)
+    carry = ''
+    try:
+        while True:
+            block = stream.read(chunk_chars)
+            if not block:
+                break
+            block = carry + block
+            cut = max(block.rfind(' '), block.rfind('\n'), block.rfind('\t'))
+            if cut < 0:
+                carry = block
+                continue
+            carry = block[cut:]
+            yield block[:cut]
+        if carry:
+            yield carry
+    finally:
+        if stream is not source:
+            stream.close()
+
+# ==================== AGGREGATORS ====================
+
+class ReservoirSample:
+    """Uniform fixed-size row sample over a stream of dataframe chunks (Algorithm R)"""
+
+    def __init__(self, size=RESERVOIR_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.columns = None
+        self._rows = []
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        n = len(chunk)
+        fill = min(self.size - len(self._rows), n)
+        if fill > 0:
+            self._rows.extend(chunk.iloc[:fill].itertuples(index=False, name=None))
+        if fill < n:
+            positions = np.arange(fill, n)
+            slots = self._rng.integers(0, self.seen + positions + 1)
+            keep = slots < self.size
+            replacements = chunk.iloc[positions[keep]].itertuples(index=False, name=None)
+            for slot, row in zip(slots[keep], replacements):
+                self._rows[slot] = row
+        self.seen += n
+
+    def frame(self):
+        return pd.DataFrame(self._rows, columns=self.columns or [])
+
+class GroupAggregator:
+    """Running per-group sum, count and sum of squares for numeric columns"""
+
+    def __init__(self, by, columns):
+        self.by = by
+        self.columns = list(columns)
+        self._sum = None
+        self._count = None
+        self._sumsq = None
+
+    @property
+    def n_groups(self):
+        return 0 if self._sum is None else len(self._sum)
+
+    def add(self, chunk):
+        # float64 so integer sums of squares can't overflow int64 across chunks
+        values = chunk[self.columns].astype('float64')
+        keys = chunk[self.by]
+        parts = (
+            values.groupby(keys, observed=True).sum(),
+            values.groupby(keys, observed=True).count(),
+            (values ** 2).groupby(keys, observed=True).sum()
+        )
+        if self._sum is None:
+            self._sum, self._count, self._sumsq = parts
+        else:
+            self._sum = self._sum.add(parts[0], fill_value=0)
+            self._count = self._count.add(parts[1], fill_value=0)
+            self._sumsq = self._sumsq.add(parts[2], fill_value=0)
+
+    def result(self):
+        """Same layout as DataProfile.group_stats: (column, mean/sum/count/std)"""
+        frames = {}
+        for col in self.columns:
+            total, count, sumsq = self._sum[col], self._count[col], self._sumsq[col]
+            var = (sumsq - total ** 2 / count) / (count - 1)
+            frames[col] = pd.DataFrame({
+                'mean': total / count,
+                'sum': total,
+                'count': count.astype('int64'),
+                'std': np.sqrt(var.clip(lower=0)).where(count > 1)
+            })
+        stats = pd.concat(frames, axis=1)
+        stats.index.name = self.by
+        return stats
+
+class MomentAggregator:
+    """Running count/mean/std/min/max per numeric column"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        zeros = pd.Series(0.0, index=self.columns)
+        self.count, self.total, self.sumsq = zeros.copy(), zeros.copy(), zeros.copy()
+        self.min = pd.Series(np.inf, index=self.columns)
+        self.max = pd.Series(-np.inf, index=self.columns)
+
+    def add(self, values):
+        values = values.astype('float64')
+        self.count += values.count()
+        self.total += values.sum()
+        self.sumsq += (values ** 2).sum()
+        self.min = np.minimum(self.min, values.min().fillna(np.inf))
+        self.max = np.maximum(self.max, values.max().fillna(-np.inf))
+
+    def describe(self, sample):
+        """describe()-shaped summary; quartiles come from the reservoir sample"""
+        mean = self.total / self.count
+        var = (self.sumsq - self.total ** 2 / self.count) / (self.count - 1)
+        quartiles = sample[self.columns].quantile([0.25, 0.5, 0.75]) if len(sample) else None
+        rows = {
+            'count': self.count,
+            'mean': mean,
+            'std': np.sqrt(var.clip(lower=0)),
+            'min': self.min,
+            '25%': quartiles.loc[0.25] if quartiles is not None else np.nan,
+            '50%': quartiles.loc[0.5] if quartiles is not None else np.nan,
+            '75%': quartiles.loc[0.75] if quartiles is not None else np.nan,
+            'max': self.max
+        }
+        return pd.DataFrame(rows).T
+
+# ==================== STREAMING DOCUMENT & PROFILE ====================
+
+class StreamingDocument(Document):
+    """Document built chunk by chunk by merging per-chunk counters
+
+    Vocabulary is bounded by max_terms: when it grows past twice the budget
+    the rarest terms are dropped and the counts become approximate. Lexicon
+    hits are merged per chunk for the lexicons given up front.
+    """
+
+    # Only counts are kept, so there is no text to key memoized results on
+    fingerprint = None
+
+    def __init__(self, max_terms=MAX_TERMS, lexicons=(SENTIMENT_LEXICON, REGION_GAZETTEER)):
+        self.text = None
+        self.lower_text = None
+        self.words = None
+        self.word_counts = Counter()
+        self.term_counts = Counter()
+        self._keyword_counts = {}
+        self.n_words = 0
+        self.max_terms = max_terms
+        self.approximate = False
+        self._lexicon_counts = {lexicon: Counter() for lexicon in lexicons}
+
+    def __len__(self):
+        return self.n_words
+
+    def add(self, text):
+        chunk = Document(text)
+        self.n_words += len(chunk)
+        self.word_counts.update(chunk.word_counts)
+        self.term_counts.update(chunk.term_counts)
+        for lexicon, hits in self._lexicon_counts.items():
+            hits.update(chunk.lexicon_counts(lexicon))
+        self._keyword_counts.clear()
+        self._bound()
+
+    def _bound(self):
+        """Drop the rarest terms once the vocabulary outgrows twice max_terms"""
+        if len(self.word_counts) > 2 * self.max_terms:
+            self.word_counts = Counter(dict(self.word_counts.most_common(self.max_terms)))
+            self.approximate = True
+        if len(self.term_counts) > 2 * self.max_terms:
+            self.term_counts = Counter(dict(self.term_counts.most_common(self.max_terms)))
+            self.approximate = True
+
+    def lexicon_counts(self, lexicon):
+        if lexicon not in self._lexicon_counts:
+            raise ValueError("lexicon was not tracked while streaming; pass it to stream_document")
+        return self._lexicon_counts[lexicon]
+
+class StreamingProfile(DataProfile):
+    """DataProfile filled from dataframe chunks; df holds only a reservoir sample
+
+    Counts, sums, means, std, group aggregates and date series are exact over
+    every row; quartiles and histograms come from the sample. Region revenue
+    is aggregated exactly however many regions there are, even past
+    max_categories.
+    """
+
+    def __init__(self, chunks, reservoir_size=RESERVOIR_SIZE, bins=HISTOGRAM_BINS,
+                 max_categories=MAX_CATEGORIES, seed=0):
+        self.bins = bins
+        self.max_categories = max_categories
+        self.n_rows = 0
+        sample = ReservoirSample(reservoir_size, seed=seed)
+        moments = None
+        groups = {}
+        region = None
+        daily = None
+        date_col = None
+
+        for chunk in chunks:
+            if moments is None:
+                first = DataProfile(chunk, max_categories=max_categories)
+                self.columns = chunk.columns
+                self.numeric_columns = first.numeric_columns
+                date_col = first.date_column
+                moments = MomentAggregator(self.numeric_columns)
+                if self.numeric_columns:
+                    groups = {col: GroupAggregator(col, self.numeric_columns) for col in first.category_columns}
+                if 'Region' in chunk.columns and 'Revenue' in self.numeric_columns:
+                    # One float per region, so it is kept when Region has too many values to group by
+                    region = GroupAggregator('Region', ['Revenue'])
+            chunk = chunk.copy()
+            for col in self.numeric_columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+            self.n_rows += len(chunk)
+            sample.add(chunk)
+            moments.add(chunk[self.numeric_columns])
+            if region is not None:
+                region.add(chunk)
+            for col in list(groups):
+                groups[col].add(chunk)
+                if groups[col].n_groups > max_categories:
+                    del groups[col]
+            if date_col is not None and self.numeric_columns:
+                dates = pd.to_datetime(chunk[date_col], errors='coerce')
+                valid = dates.notna()
+                sums = chunk.loc[valid, self.numeric_columns].groupby(dates[valid].dt.floor('D')).sum()
+                daily = sums if daily is None else daily.add(sums, fill_value=0)
+
+        if moments is None:
+            self.columns = pd.Index([])
+            self.numeric_columns = []
+        self.df = sample.frame()
+        self.category_columns = list(groups)
+        self.group_stats = {col: agg.result() for col, agg in groups.items()}
+        self.region_stats = region.result()['Revenue'] if region is not None and region.n_groups else None
+        self.summary = moments.describe(self.df) if self.numeric_columns else None
+        self.n_columns = len(self.columns)
+        self.date_column = date_col
+        self.date_series = self._bucket(daily)
+
+    @staticmethod
+    def _bucket(daily):
+        if daily is None or daily.empty:
+            return None
+        daily = daily.sort_index()
+        span = daily.index.max() - daily.index.min()
+        freq = 'MS' if span > pd.Timedelta(days=183) else 'W'
+        return daily.resample(freq).sum()
+
+# ==================== ENTRY POINTS ====================
+
+def stream_document(source, chunk_chars=TEXT_CHUNK_CHARS, max_terms=MAX_TERMS,
+                    lexicons=(SENTIMENT_LEXICON, REGION_GAZETTEER)):
+    """Tokenize a transcript of any size into a StreamingDocument"""
+    doc = StreamingDocument(max_terms=max_terms, lexicons=lexicons)
+    for chunk in iter_text_chunks(source, chunk_chars=chunk_chars):
+        doc.add(chunk)
+    return doc
+
+def stream_profile(source, chunk_rows=CHUNK_ROWS, reservoir_size=RESERVOIR_SIZE, usecols=None):
+    """Profile a CSV of any size without materializing it"""
+    return StreamingProfile(iter_csv_chunks(source, usecols=usecols, chunk_rows=chunk_rows),
+                            reservoir_size=reservoir_size)
+
+def analyze_stream(text_source, csv_source, n_runs=BRANCH_RUNS, chunk_rows=CHUNK_ROWS,
+                   chunk_chars=TEXT_CHUNK_CHARS, reservoir_size=RESERVOIR_SIZE, max_terms=MAX_TERMS):
+    """Hybrid analysis over the full transcript and CSV (or its profile), with no row or word caps"""
+    doc = stream_document(text_source, chunk_chars=chunk_chars, max_terms=max_terms)
+    if len(doc) == 0:
+        return None
+    profile = csv_source
+    if csv_source is not None and not isinstance(csv_source, DataProfile):
+        profile = stream_profile(csv_source, chunk_rows=chunk_rows, reservoir_size=reservoir_size)
+
+    result = analyze_document(doc, profile, n_runs=n_runs)
+    result['words_capped'] = False
+    result['rows_capped'] = False
+    result['approximate_terms'] = doc.approximate
+    return result
+
+def analyze_stream_upload(text_data, csv_data, cache=RESULT_CACHE, store=None, text_name=None, csv_name=None,
+                          columnar=None):
+    """Full-data analysis of raw upload bytes, cached on their content hash (and in store)"""
+    key = content_hash('analysis-full', text_data, csv_data, version=RESULT_SCHEMA_VERSION)
+
+    def compute():
+        profile = stream_profile_upload(csv_data, cache=cache, store=store, name=csv_name, columnar=columnar)
+        return analyze_stream(text_data, profile)
+
+    return cache.get_or_compute(key, lambda: through_store(
+        store, key, compute, kind='full', text_name=text_name, csv_name=csv_name,
+        profile_hash=content_hash('profile-full', csv_data, version=RESULT_SCHEMA_VERSION)
+    ), namespace='analysis', tags=(content_hash(text_data), content_hash(csv_data)))
+
+def stream_profile_upload(data, cache=RESULT_CACHE, store=None, name=None, columnar=None):
+    """Full-data profile of an uploaded CSV, cached on its content hash
+
+    With a ColumnarCache the chunks are read from its memory-mapped Arrow
+    copy of the upload rather than parsed from CSV.
+    """
+    key = content_hash('profile-full', data, version=RESULT_SCHEMA_VERSION)
+    source = content_hash(data)
+
+    def compute():
+        profile = None
+        try:
+            if columnar is not None:
+                from .columnar import CACHE_ERRORS
+                try:
+                    profile = StreamingProfile(columnar.iter_chunks(data))
+                except CACHE_ERRORS:
+                    pass  # Unusable cache directory or file: stream the CSV itself
+            if profile is None:
+                profile = stream_profile(io.BytesIO(data))
+        except (ValueError, TypeError):
+            return None
+        if profile.n_columns < 2 or profile.empty:
+            return None
+        profile.source = source
+        if store is not None:
+            store.save_profile(key, profile, name=name)
+        return profile
+
+    return cache.get_or_compute(key, compute, namespace='profile', tags=(source,))
@@ -0,0 +1,189 @@
+"""
+Narrative Nexus Engine - Analysis Pipeline
+Single and batch entry points used by the UI and headless workers
+"""
+
+import io
+
+import pandas as pd
+
+from .cache import RESULT_CACHE, content_hash
+from .compact import compact_frame
+from .mismatch import calculate_mismatch, calculate_mismatch_score
+from .profile import DataProfile, as_profile
+from .simulation import simulate_branches, summarize_branches
+from .stories import generate_stories
+from .text import analyze_sentiment_basic, detect_echo_chamber, detect_echo_chambers
+from .tokens import Document
+from .validation import MAX_ROWS, MAX_WORDS, validate_csv, validate_text
+
+BRANCH_RUNS = 10_000
+BRANCH_SEED = 0
+# Part of every analysis and profile key: bump it when a scoring change alters results,
+# so history stored by an older engine is recomputed instead of served
+RESULT_SCHEMA_VERSION = 1
+
+def _as_profile(data):
+    """Accept a DataProfile, a dataframe, a CSV path or a file-like object"""
+    if data is None or isinstance(data, (pd.DataFrame, DataProfile)):
+        return as_profile(data)
+    return as_profile(validate_csv(data))
+
+def _no_progress(fraction, message=None):
+    pass
+
+def analyze(text, df, n_runs=BRANCH_RUNS, max_words=MAX_WORDS, progress=None):
+    """Run the Hybrid analysis (echo, sentiment, mismatch, stories) on one pair"""
+    text = validate_text(text, max_words=max_words)
+    if text is None:
+        return None
+    # Tokenize and profile once; every analysis reads the same Document/DataProfile
+    result = analyze_document(Document(text), _as_profile(df), n_runs=n_runs, progress=progress)
+    result['words_capped'] = result['words_analyzed'] >= max_words
+    return result
+
+def analyze_document(doc, profile, n_runs=BRANCH_RUNS, progress=None):
+    """Run every analysis over an already tokenized document and profiled data
+
+    progress, if given, is called as progress(fraction, message) between
+    stages and during the simulation.
+    """
+    progress = progress or _no_progress
+    progress(0.05, "Detecting echo chambers")
+    is_echo, top_word = detect_echo_chamber(doc)
+    progress(0.15, "Generating story branches")
+    stories = generate_stories(doc.text, profile)
+    branches = []
+    if n_runs:
+        message = f"Simulating {n_runs:,} runs per branch"
+        progress(0.2, message)
+        branches = summarize_branches(simulate_branches(
+            profile, stories, n_runs=n_runs, seed=BRANCH_SEED,
+            progress=lambda done: progress(0.2 + 0.7 * done, message)
+        ))
+
+    progress(0.9, "Scoring sentiment and mismatch")
+    return {
+        'is_echo': is_echo,
+        'top_word': top_word,
+        'echoes': detect_echo_chambers(doc),
+        'sentiment': analyze_sentiment_basic(doc),
+        'mismatch': calculate_mismatch(doc, profile),
+        'mismatch_score': calculate_mismatch_score(doc, profile),
+        'stories': stories,
+        'branches': branches,
+        'words_analyzed': len(doc),
+        'rows_analyzed': profile.n_rows if profile is not None else 0,
+        'top_region': profile.top_region if profile is not None else None
+    }
+
+def analyze_many(pairs, n_runs=BRANCH_RUNS):
+    """Analyze an iterable of (text, df) pairs, returning results in order
+
+    None marks invalid input (notes too short); a pair whose analysis
+    raised gets {'error': 'ExceptionType: message'} like a batch record.
+    """
+    results = []
+    for text, df in pairs:
+        try:
+            results.append(analyze(text, df, n_runs=n_runs))
+        except Exception as e:
+            results.append({'error': f"{type(e).__name__}: {e}"})
+    return results
+
+# ==================== CACHED UPLOADS ====================
+
+def through_store(store, key, compute, **meta):
+    """Read a result from a persistent AnalysisStore, or compute and record it"""
+    if store is None:
+        return compute()
+    stored = store.get_analysis(key)
+    if stored is not None:
+        return stored
+    result = compute()
+    if result is not None:
+        store.save_analysis(key, result, **meta)
+    return result
+
+def decode_text(data):
+    """Uploaded notes as text; undecodable bytes become U+FFFD"""
+    return data.decode('utf-8', errors='replace')
+
+def load_text_upload(data, cache=RESULT_CACHE):
+    """Decode uploaded notes once per distinct upload"""
+    key = content_hash('text', data)
+    return cache.get_or_compute(key, lambda: decode_text(data), namespace='text', tags=(content_hash(data),))
+
+def load_csv_upload(data, max_rows=MAX_ROWS, cache=RESULT_CACHE, columnar=None):
+    """Parse, validate and compact an uploaded CSV once per distinct upload
+
+    With a ColumnarCache the parsed rows are also kept on disk as Arrow, so
+    other sessions and processes memory-map them instead of parsing again.
+    The cached frame is compact_frame()'d; its attrs['compaction'] holds the
+    footprint before and after.
+    """
+    key = content_hash('csv', data, max_rows=max_rows)
+
+    def compute():
+        df = None
+        if columnar is not None:
+            from .columnar import CACHE_ERRORS
+            try:
+                df = columnar.load(data, max_rows=max_rows)
+                return compact_frame(df) if df is not None else None
+            except CACHE_ERRORS:
+                pass  # Unusable cache directory or file: parse the CSV as if there were no cache
+        df = validate_csv(io.BytesIO(data), max_rows=max_rows)
+        return compact_frame(df) if df is not None else None
+
+    return cache.get_or_compute(key, compute, namespace='csv', tags=(content_hash(data),))
+
+def load_profile_upload(data, max_rows=MAX_ROWS, cache=RESULT_CACHE, store=None, name=None, columnar=None):
+    """Profile an uploaded CSV once per distinct upload (None if the CSV is invalid)
+
+    The profile's source is the upload's content hash, which is what
+    memoized functions of it are keyed and invalidated on.
+    """
+    key = content_hash('profile', data, max_rows=max_rows, version=RESULT_SCHEMA_VERSION)
+    source = content_hash(data)
+
+    def compute():
+        df = load_csv_upload(data, max_rows=max_rows, cache=cache, columnar=columnar)
+        if df is None:
+            return None
+        profile = DataProfile(df)
+        profile.source = source
+        if store is not None:
+            store.save_profile(key, profile, name=name)
+        return profile
+
+    return cache.get_or_compute(key, compute, namespace='profile', tags=(source,))
+
+def analysis_key(text_data, csv_data, max_words=MAX_WORDS, max_rows=MAX_ROWS):
+    """Cache/store key of analyze_upload's result for a pair of uploads"""
+    return content_hash('analysis', text_data, csv_data, max_words=max_words, max_rows=max_rows,
+                        version=RESULT_SCHEMA_VERSION)
+
+def analyze_upload(text_data, csv_data, max_words=MAX_WORDS, max_rows=MAX_ROWS, cache=RESULT_CACHE,
+                   store=None, text_name=None, csv_name=None, columnar=None, progress=None):
+    """Hybrid analysis of raw upload bytes, cached on their content hash
+
+    With an AnalysisStore the result is also read from / recorded in its
+    history, so it survives restarts.
+    """
+    key = analysis_key(text_data, csv_data, max_words=max_words, max_rows=max_rows)
+    profile_key = content_hash('profile', csv_data, max_rows=max_rows, version=RESULT_SCHEMA_VERSION)
+
+    def compute():
+        text = load_text_upload(text_data, cache=cache)
+        profile = load_profile_upload(csv_data, max_rows=max_rows, cache=cache, columnar=columnar)
+        result = analyze(text, profile, max_words=max_words, progress=progress)
+        if result is not None:
+            result['rows_capped'] = result['rows_analyzed'] >= max_rows
+            if store is not None and profile is not None:
+                store.save_profile(profile_key, profile, name=csv_name)
+        return result
+
+    return cache.get_or_compute(key, lambda: through_store(
+        store, key, compute, kind='hybrid', text_name=text_name, csv_name=csv_name, profile_hash=profile_key
+    ), namespace='analysis', tags=(content_hash(text_data), content_hash(csv_data)))
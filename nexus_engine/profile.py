@@ -0,0 +1,161 @@
+"""
+Narrative Nexus Engine - Data Profiling
+Per-upload summaries computed once and reused by every mode and chart
+"""
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash, estimate_size
+
+HISTOGRAM_BINS = 30
+MAX_CATEGORIES = 50
+DATE_PARSE_RATIO = 0.8
+AGGREGATES = ['mean', 'sum', 'count', 'std']
+# Computed summaries a profile holds besides its frame
+CACHED_ATTRS = ('summary', 'group_stats', 'region_stats', 'date_series', 'histograms')
+
+class DataProfile:
+    """Column summaries, group aggregates, date series and histograms of one dataframe"""
+
+    # content_hash() of the upload this profile was built from, if any
+    source = None
+
+    def __init__(self, df, bins=HISTOGRAM_BINS, max_categories=MAX_CATEGORIES):
+        self.df = df
+        self.bins = bins
+        self.max_categories = max_categories
+        self.n_rows = len(df)
+        self.n_columns = len(df.columns)
+        self.columns = df.columns
+        self.numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    @property
+    def empty(self):
+        return self.n_rows == 0
+
+    def _numeric(self):
+        """Numeric columns, compacted float32 widened so aggregates accumulate in float64"""
+        values = self.df[self.numeric_columns]
+        narrow = {col: np.float64 for col in self.numeric_columns if values[col].dtype == np.float32}
+        return values.astype(narrow) if narrow else values
+
+    @cached_property
+    def fingerprint(self):
+        """Key memoized functions of this profile share; None unless it was built from an upload"""
+        if self.source is None:
+            return None
+        return content_hash(type(self).__name__, self.source, n_rows=self.n_rows)
+
+    @cached_property
+    def memory_bytes(self):
+        return int(self.df.memory_usage(deep=True).sum())
+
+    @property
+    def nbytes(self):
+        """Footprint the result cache budgets for: the frame plus the summaries computed so far"""
+        computed = (self.__dict__.get(name) for name in CACHED_ATTRS)
+        return self.memory_bytes + sum(estimate_size(value) for value in computed if value is not None)
+
+    @cached_property
+    def summary(self):
+        """describe() of the numeric columns"""
+        if not self.numeric_columns:
+            return None
+        return self._numeric().describe()
+
+    @cached_property
+    def category_columns(self):
+        """Low-cardinality text columns worth grouping by"""
+        return [
+            col for col in self.df.columns
+            if col not in self.numeric_columns
+            and col != self.date_column
+            and self.df[col].nunique(dropna=True) <= self.max_categories
+        ]
+
+    @cached_property
+    def group_stats(self):
+        """{category column: mean/sum/count/std of every numeric column per group}"""
+        if not self.numeric_columns:
+            return {}
+        numeric = self._numeric()
+        return {
+            col: numeric.groupby(self.df[col], observed=True).agg(AGGREGATES)
+            for col in self.category_columns
+        }
+
+    @cached_property
+    def region_stats(self):
+        """Revenue mean/sum/count/std per Region, or None if either column is missing"""
+        if 'Region' not in self.df.columns or 'Revenue' not in self.numeric_columns:
+            return None
+        if 'Region' in self.group_stats:
+            return self.group_stats['Region']['Revenue']
+        return self._numeric()['Revenue'].groupby(self.df['Region'], observed=True).agg(AGGREGATES)
+
+    @cached_property
+    def top_region(self):
+        stats = self.region_stats
+        means = stats['mean'].dropna() if stats is not None else None
+        if means is None or means.empty:
+            return None
+        return means.idxmax()
+
+    @cached_property
+    def date_column(self):
+        """First column holding dates (datetime dtype, or mostly parseable 'date' column)"""
+        for col in self.df.columns:
+            if pd.api.types.is_datetime64_any_dtype(self.df[col]):
+                return col
+        for col in self.df.columns:
+            if 'date' in str(col).lower() and col not in self.numeric_columns:
+                parsed = pd.to_datetime(self.df[col], errors='coerce')
+                if parsed.notna().mean() >= DATE_PARSE_RATIO:
+                    return col
+        return None
+
+    @cached_property
+    def date_series(self):
+        """Numeric column sums bucketed by week (or month for spans over ~6 months)"""
+        col = self.date_column
+        if col is None or not self.numeric_columns:
+            return None
+        dates = pd.to_datetime(self.df[col], errors='coerce')
+        valid = dates.notna()
+        if not valid.any():
+            return None
+        span = dates[valid].max() - dates[valid].min()
+        freq = 'MS' if span > pd.Timedelta(days=183) else 'W'
+        values = self._numeric().loc[valid].set_index(dates[valid])
+        return values.resample(freq).sum()
+
+    @cached_property
+    def histograms(self):
+        """{numeric column: (counts, bin_edges)} over finite values"""
+        histograms = {}
+        for col in self.numeric_columns:
+            values = self.df[col].to_numpy(dtype=float, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            if values.size:
+                histograms[col] = np.histogram(values, bins=self.bins)
+        return histograms
+
+    def histogram_bars(self, col):
+        """Bar centers, counts and widths for a numeric column, ready to chart"""
+        if col not in self.histograms:
+            return None
+        counts, edges = self.histograms[col]
+        return {
+            'x': (edges[:-1] + edges[1:]) / 2,
+            'y': counts,
+            'width': np.diff(edges)
+        }
+
+def as_profile(data):
+    """Return data as a DataProfile, profiling a dataframe if needed"""
+    if data is None or isinstance(data, DataProfile):
+        return data
+    return DataProfile(data)
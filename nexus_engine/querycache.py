@@ -0,0 +1,188 @@
+"""
+Narrative Nexus Engine - NLQ Query Cache
+Answers to questions asked before, keyed on the normalized question; MinHash
+signatures of the stemmed terms let reworded repeats hit as well
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from .cache import ResultCache, content_hash
+from .nlq import QUERY_WORD_PATTERN, parse_nlq_intent
+from .text import STOP_WORDS
+
+MAX_QUERIES = 1024
+NUM_PERM = 64
+BANDS = 16              # 16 bands of 4 rows: questions about 0.5 similar become candidates
+NEAR_THRESHOLD = 0.75   # estimated Jaccard similarity of stemmed terms a near match needs
+MINHASH_SEED = 0
+PRIME = (1 << 31) - 1   # small enough that a * hash + b never overflows uint64
+SUFFIXES = ('ing', 'ed', 's')
+KEEP_DOUBLE = 'lsz'     # 'falling' -> 'fall', but 'dropping' -> 'drop'
+
+_rng = np.random.default_rng(MINHASH_SEED)
+_A = _rng.integers(1, PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, NUM_PERM, dtype=np.uint64)
+
+# ==================== NORMALIZATION ====================
+
+def query_terms(query):
+    """Sorted distinct lowercase terms of a question, without stop words"""
+    words = QUERY_WORD_PATTERN.findall((query or '').lower())
+    return sorted({w for w in words if w not in STOP_WORDS and len(w) > 2})
+
+def normalize_query(query):
+    """'intent|term term ...': questions that differ only in case, order or stop words share it"""
+    return f"{parse_nlq_intent(query)['intent']}|{' '.join(query_terms(query))}"
+
+def stem(term):
+    """Crude inflection strip so 'dropped', 'dropping' and 'drops' compare equal"""
+    for suffix in SUFFIXES:
+        base = term[:-len(suffix)]
+        if term.endswith(suffix) and len(base) >= 3 and not term.endswith('ss'):
+            if len(base) > 3 and base[-1] == base[-2] and base[-1] not in KEEP_DOUBLE:
+                base = base[:-1]
+            return base
+    return term
+
+def minhash(terms):
+    """NUM_PERM-value MinHash signature of the stemmed terms, or None when there are none"""
+    stems = {stem(term) for term in terms}
+    if not stems:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) & PRIME for s in stems), dtype=np.uint64, count=len(stems))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % PRIME).min(axis=1)
+
+# ==================== CACHE ====================
+
+class QueryCache:
+    """NLQ answers shared by every session, found by normalized key or MinHash near match
+
+    A near match must have the same intent and an estimated Jaccard
+    similarity of at least threshold between the questions' stemmed terms.
+    Candidates come from locality-sensitive hashing of signature bands, so
+    a lookup never scans every stored question.
+    """
+
+    def __init__(self, max_entries=MAX_QUERIES, threshold=NEAR_THRESHOLD, bands=BANDS, cache=None):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.cache = cache if cache is not None else ResultCache(max_entries=max_entries)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._questions = OrderedDict()  # normalized key -> (question, intent, signature)
+        self._buckets = {}               # (band, band values) -> normalized keys
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _index(self, key, question, intent, signature):
+        with self._lock:
+            if key in self._questions:
+                self._questions.move_to_end(key)
+                return
+            self._questions[key] = (question, intent, signature)
+            if signature is not None:
+                for bucket in self._band_keys(signature):
+                    self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._questions) > self.max_entries:
+                self._forget(next(iter(self._questions)))
+
+    def _forget(self, key):
+        _, _, signature = self._questions.pop(key)
+        if signature is not None:
+            for bucket in self._band_keys(signature):
+                keys = self._buckets.get(bucket)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._buckets[bucket]
+
+    def _nearest(self, intent, signature):
+        """(similarity, key) of the most similar stored question with this intent, or None"""
+        with self._lock:
+            candidates = set()
+            for bucket in self._band_keys(signature):
+                candidates.update(self._buckets.get(bucket, ()))
+            best = None
+            for key in candidates:
+                _, other_intent, other = self._questions[key]
+                if other_intent != intent:
+                    continue
+                similarity = float(np.mean(signature == other))
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, key)
+            return best
+
+    def lookup(self, query):
+        """(answer, kind, matched question); kind is 'exact', 'near' or 'miss'"""
+        intent = parse_nlq_intent(query)['intent']
+        terms = query_terms(query)
+        key = f"{intent}|{' '.join(terms)}"
+        answer = self.cache.get(content_hash('nlq', key), namespace='nlq')
+        if answer is not None:
+            with self._lock:
+                self.exact_hits += 1
+            return answer, 'exact', self._questions.get(key, (query,))[0]
+
+        signature = minhash(terms)
+        nearest = self._nearest(intent, signature) if signature is not None else None
+        if nearest is not None:
+            answer = self.cache.get(content_hash('nlq', nearest[1]), namespace='nlq')
+            if answer is not None:
+                with self._lock:
+                    self.near_hits += 1
+                return answer, 'near', self._questions[nearest[1]][0]
+            with self._lock:
+                # Evicted from the answer cache; stop offering it as a match
+                if nearest[1] in self._questions:
+                    self._forget(nearest[1])
+        with self._lock:
+            self.misses += 1
+        return None, 'miss', None
+
+    def store(self, query, answer):
+        """Remember the answer to a question"""
+        intent = parse_nlq_intent(query)['intent']
+        terms = query_terms(query)
+        key = f"{intent}|{' '.join(terms)}"
+        self.cache.set(content_hash('nlq', key), answer)
+        self._index(key, query, intent, minhash(terms))
+        return answer
+
+    def get_or_compute(self, query, compute):
+        """(answer, kind, matched question), calling compute() only on a miss"""
+        answer, kind, matched = self.lookup(query)
+        if kind == 'miss':
+            answer = compute()
+            if answer is not None:
+                self.store(query, answer)
+        return answer, kind, matched
+
+    def stats(self):
+        """Exact/near hits, misses and hit rate over every lookup"""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                'questions': len(self._questions),
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_rate': (self.exact_hits + self.near_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._questions.clear()
+            self._buckets.clear()
+        self.cache.clear()
+
+# Shared by every session in this process
+NLQ_CACHE = QueryCache()
@@ -0,0 +1,127 @@
+"""
+Narrative Nexus Engine - Meeting Series
+Echo chambers across many meetings: terms that keep recurring and keep growing,
+from one sparse document-term matrix
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash
+from .pipeline import RESULT_CACHE, decode_text
+from .text import STOP_WORDS
+from .tokens import MIN_KEYWORD_LENGTH, Document
+
+# Same keywords as extract_keywords: alphabetic terms of MIN_KEYWORD_LENGTH+ letters
+KEYWORD_PATTERN = r'\b[a-z]{%d,}\b' % MIN_KEYWORD_LENGTH
+MIN_MEETINGS = 3
+MIN_RECURRENCE = 0.5
+
+def _text(doc):
+    return doc.text if isinstance(doc, Document) else (doc or '')
+
+def series_term_stats(texts, stop_words=STOP_WORDS, min_meetings=2):
+    """Per-term recurrence, frequency share and drift over meetings in chronological order
+
+    Columns: meetings (documents containing the term), frequency (total count),
+    mean_share (mean share of each meeting's words), share_trend and
+    tfidf_drift (least-squares slope per meeting), growth (fitted change in
+    share over the series relative to mean_share) and first_seen (index of
+    the first meeting using the term).
+    """
+    # Imported here: scikit-learn/scipy are slow to import and only this analysis needs them
+    from scipy import sparse
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+    texts = [_text(t) for t in texts]
+    n_docs = len(texts)
+    columns = ['meetings', 'frequency', 'mean_share', 'share_trend', 'tfidf_drift', 'growth', 'first_seen']
+    if n_docs == 0:
+        return pd.DataFrame(columns=columns)
+
+    vectorizer = CountVectorizer(
+        token_pattern=KEYWORD_PATTERN,
+        stop_words=sorted(w for w in stop_words if len(w) >= MIN_KEYWORD_LENGTH),
+        min_df=min(min_meetings, n_docs),
+        dtype=np.int32
+    )
+    try:
+        counts = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Empty vocabulary
+        return pd.DataFrame(columns=columns)
+
+    # Shares are relative to every whitespace word, like detect_echo_chamber's 15% rule
+    lengths = np.array([len(t.split()) for t in texts], dtype=np.float64)
+    shares = sparse.diags(1 / np.maximum(lengths, 1)) @ counts
+    tfidf = TfidfTransformer().fit_transform(counts)
+
+    # Slope of y over meeting index t is sum((t - mean t) * y) / sum((t - mean t)^2)
+    centered = np.arange(n_docs) - (n_docs - 1) / 2
+    denom = float((centered ** 2).sum()) or 1.0
+    share_trend = shares.T @ centered / denom
+    tfidf_drift = tfidf.T @ centered / denom
+
+    by_term = counts.tocsc()
+    by_term.sort_indices()
+    mean_share = np.asarray(shares.sum(axis=0)).ravel() / n_docs
+
+    stats = pd.DataFrame({
+        'meetings': np.diff(by_term.indptr),
+        'frequency': np.asarray(counts.sum(axis=0)).ravel(),
+        'mean_share': mean_share,
+        'share_trend': share_trend,
+        'tfidf_drift': tfidf_drift,
+        'growth': share_trend * max(n_docs - 1, 1) / np.where(mean_share > 0, mean_share, 1),
+        'first_seen': by_term.indices[by_term.indptr[:-1]]
+    }, index=pd.Index(vectorizer.get_feature_names_out(), name='term'))
+    return stats
+
+def detect_series_echoes(texts, labels=None, min_meetings=MIN_MEETINGS, min_recurrence=MIN_RECURRENCE, top_n=20):
+    """Terms recurring in most meetings whose weight keeps growing across the series
+
+    echo_strength is recurrence (share of meetings) times growth, capped at
+    100 for a term in every meeting whose share at least doubles.
+    """
+    texts = list(texts)
+    n_docs = len(texts)
+    stats = series_term_stats(texts, min_meetings=min(min_meetings, max(n_docs, 1)))
+    if stats.empty:
+        return []
+
+    needed = max(min(min_meetings, n_docs), math.ceil(min_recurrence * n_docs))
+    echoes = stats[(stats['meetings'] >= needed) & (stats['tfidf_drift'] > 0) & (stats['growth'] > 0)]
+    recurrence = echoes['meetings'] / n_docs
+    strength = (100 * recurrence * echoes['growth'].clip(upper=1)).round().astype(int)
+    echoes = echoes.assign(echo_strength=strength).sort_values(
+        ['echo_strength', 'tfidf_drift'], ascending=False
+    ).head(top_n)
+
+    labels = list(labels) if labels is not None else list(range(1, n_docs + 1))
+    return [
+        {
+            'keyword': term,
+            'meetings': int(row['meetings']),
+            'frequency': int(row['frequency']),
+            'growth': float(row['growth']),
+            'tfidf_drift': float(row['tfidf_drift']),
+            'first_seen': labels[int(row['first_seen'])],
+            'echo_strength': int(row['echo_strength'])
+        }
+        for term, row in echoes.iterrows()
+    ]
+
+def series_echoes_upload(files, cache=RESULT_CACHE):
+    """Series echoes of [(file name, bytes)] uploads in order, cached on their content
+
+    Only the series result is cached: one decoded-text entry per meeting
+    would push uploads and analyses out of the shared cache.
+    """
+    names = [name for name, _ in files]
+    key = content_hash('series', *[data for _, data in files], names='|'.join(names))
+    return cache.get_or_compute(
+        key, lambda: detect_series_echoes([decode_text(data) for _, data in files], labels=names),
+        namespace='series', tags=[content_hash(data) for _, data in files]
+    )
@@ -0,0 +1,217 @@
+"""
+Narrative Nexus Engine - Simulations
+Monte Carlo what-if runs over revenue data
+"""
+
+import re
+
+import numpy as np
+
+from .profile import as_profile
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_RUNS = 16_384
+CHUNK_BYTES = 64 * 1024 ** 2  # working arrays per chunk, whatever the number of regions
+CELL_RUN_BYTES = 16           # float32 draw, float32 cell (with totals) and int32 bin index
+HISTOGRAM_BINS = 4096
+MIN_HISTOGRAM_BINS = 256
+HISTOGRAM_BYTES = 32 * 1024 ** 2
+SPREAD_SIGMAS = 6.0
+DEFAULT_RISK = 25.0
+
+GROWTH_PATTERN = re.compile(r'([+-]?\d+(?:\.\d+)?)(?:\s*-\s*(\d+(?:\.\d+)?))?\s*%')
+RISK_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+def run_monte_carlo_simulation(df, bias_flip=False, n_runs=100, seed=None):
+    """Run Monte Carlo simulation"""
+    if df is None or df.empty or 'Revenue' not in df.columns:
+        return None
+
+    try:
+        revenue_data = df['Revenue'].values
+        base_mean = revenue_data.mean()
+        base_std = revenue_data.std()
+
+        if bias_flip:
+            sim_mean = base_mean * 1.15
+            sim_std = base_std * 0.9
+        else:
+            sim_mean = base_mean
+            sim_std = base_std
+
+        rng = np.random.default_rng(seed)
+        simulations = rng.normal(sim_mean, sim_std, n_runs)
+        simulations = np.maximum(simulations, 0)
+
+        return {
+            'simulations': simulations,
+            'mean': simulations.mean(),
+            'std': simulations.std(),
+            'min': simulations.min(),
+            'max': simulations.max(),
+            'percentile_25': np.percentile(simulations, 25),
+            'percentile_75': np.percentile(simulations, 75)
+        }
+    except:
+        return None
+
+# ==================== BRANCH PARAMETERS ====================
+
+def _story_growth(story):
+    """Midpoint growth % from a story's growth/outcome text (e.g. '+15-20%')"""
+    match = GROWTH_PATTERN.search(str(story.get('growth') or story.get('outcome') or ''))
+    if not match:
+        return 0.0
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else abs(low)
+    return (low + np.sign(low or 1) * high) / 2
+
+def _story_risk(story):
+    """Risk % from a story (35 or 'Medium (35%)')"""
+    risk = story.get('risk')
+    if isinstance(risk, (int, float)):
+        return float(risk)
+    match = RISK_PATTERN.search(str(risk or ''))
+    return float(match.group(1)) if match else DEFAULT_RISK
+
+def _region_stats(profile):
+    """Per-region revenue mean and std; a single 'All' region without a Region column
+
+    Regions without a finite mean or std (no revenue values) are left out,
+    so the lists are empty when no row has revenue.
+    """
+    stats = profile.region_stats
+    if stats is not None:
+        names = [str(r) for r in stats.index]
+        mean, std = stats['mean'].to_numpy(float), stats['std'].fillna(0).to_numpy(float)
+    else:
+        revenue = profile.summary['Revenue']
+        if revenue['count'] == 0:
+            return [], np.array([]), np.array([])
+        names = ['All']
+        mean = np.array([revenue['mean']], dtype=float)
+        std = np.array([revenue['std'] if revenue['count'] > 1 else 0.0], dtype=float)
+    keep = np.isfinite(mean) & np.isfinite(std)
+    return [name for name, kept in zip(names, keep) if kept], mean[keep], std[keep]
+
+# ==================== BATCHED ENGINE ====================
+
+def simulate_branches(df, stories, n_runs=10_000, seed=None, percentiles=DEFAULT_PERCENTILES,
+                      chunk_runs=None, keep_samples=False, progress=None):
+    """Simulate every story branch for every region in one (scenarios x regions x runs) batch
+
+    Runs are drawn chunk by chunk into a float32 array; moments and fixed-bin
+    histograms are accumulated per (scenario, region) so percentiles are
+    estimated without holding all runs. The last region column is the total
+    across regions. Without chunk_runs, chunks and histogram bins are sized
+    to CHUNK_BYTES and HISTOGRAM_BYTES, so memory stays flat as regions grow.
+    progress, if given, is called with the fraction of runs done after every
+    chunk.
+    """
+    profile = as_profile(df)
+    if profile is None or profile.empty or 'Revenue' not in profile.numeric_columns or not stories:
+        return None
+
+    regions, region_mean, region_std = _region_stats(profile)
+    if not regions:
+        return None
+    growth = np.array([_story_growth(s) for s in stories])
+    risk = np.array([_story_risk(s) for s in stories])
+
+    n_scen, n_reg = len(stories), len(regions)
+    n_cells = n_scen * (n_reg + 1)
+    if chunk_runs is None:
+        chunk_runs = int(np.clip(CHUNK_BYTES // (n_cells * CELL_RUN_BYTES), 1, CHUNK_RUNS))
+    bins = int(np.clip(HISTOGRAM_BYTES // (n_cells * 8), MIN_HISTOGRAM_BINS, HISTOGRAM_BINS))
+    mu = (region_mean[None, :] * (1 + growth[:, None] / 100)).astype(np.float32)
+    sigma = (region_std[None, :] * (1 + risk[:, None] / 100)).astype(np.float32)
+
+    # Histogram range per cell: mean +/- SPREAD_SIGMAS, clipped at zero revenue
+    cell_mu = np.concatenate([mu, mu.sum(axis=1, keepdims=True)], axis=1).astype(np.float64)
+    cell_sigma = np.concatenate(
+        [sigma, np.sqrt((sigma.astype(np.float64) ** 2).sum(axis=1, keepdims=True))], axis=1
+    ).astype(np.float64)
+    lo = np.maximum(cell_mu - SPREAD_SIGMAS * cell_sigma, 0.0)
+    hi = np.maximum(cell_mu + SPREAD_SIGMAS * cell_sigma, lo + 1e-6)
+    lo32 = lo.astype(np.float32)[:, :, None]
+    inv_width32 = (bins / (hi - lo)).astype(np.float32)[:, :, None]
+
+    # Bin indexes are per scenario, so int32 always holds them
+    offsets = (np.arange(n_reg + 1, dtype=np.int32) * bins)[:, None]
+    counts = np.zeros((n_scen, (n_reg + 1) * bins), dtype=np.int64)
+    sums = np.zeros((n_scen, n_reg + 1))
+    sumsq = np.zeros((n_scen, n_reg + 1))
+    mins = np.full((n_scen, n_reg + 1), np.inf)
+    maxs = np.full((n_scen, n_reg + 1), -np.inf)
+    samples = np.empty((n_scen, n_reg, n_runs), dtype=np.float32) if keep_samples else None
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_runs, chunk_runs):
+        n = min(chunk_runs, n_runs - start)
+        block = rng.standard_normal((n_scen, n_reg, n), dtype=np.float32)
+        block *= sigma[:, :, None]
+        block += mu[:, :, None]
+        np.maximum(block, 0, out=block)
+        if samples is not None:
+            samples[:, :, start:start + n] = block
+
+        cells = np.concatenate([block, block.sum(axis=1, keepdims=True)], axis=1)
+        del block
+        # float32 runs, float64 accumulators: no widened copy of the chunk
+        sums += cells.sum(axis=2, dtype=np.float64)
+        sumsq += np.einsum('ijk,ijk->ij', cells, cells, dtype=np.float64)
+        np.minimum(mins, cells.min(axis=2), out=mins)
+        np.maximum(maxs, cells.max(axis=2), out=maxs)
+
+        cells -= lo32
+        cells *= inv_width32
+        np.clip(cells, 0, bins - 1, out=cells)
+        idx = cells.astype(np.int32)
+        del cells
+        idx += offsets
+        for i in range(n_scen):
+            counts[i] += np.bincount(idx[i].ravel(), minlength=counts.shape[1])
+        if progress is not None:
+            progress((start + n) / n_runs)
+
+    mean = sums / n_runs
+    std = np.sqrt(np.maximum(sumsq / n_runs - mean ** 2, 0.0))
+    hist = counts.reshape(n_scen, n_reg + 1, bins)
+    result = {
+        'scenarios': [s.get('title', f'Path {i + 1}') for i, s in enumerate(stories)],
+        'regions': regions + ['All regions'],
+        'n_runs': n_runs,
+        'seed': seed,
+        'mean': mean,
+        'std': std,
+        'min': mins,
+        'max': maxs,
+        'percentiles': {p: _histogram_percentile(hist, lo, hi, p, n_runs) for p in percentiles}
+    }
+    if samples is not None:
+        result['samples'] = samples
+    return result
+
+def _histogram_percentile(hist, lo, hi, p, n_runs):
+    """Percentile per cell from cumulative bin counts, interpolated within the bin"""
+    cdf = np.cumsum(hist, axis=-1)
+    target = p / 100 * n_runs
+    bin_idx = np.minimum((cdf < target).sum(axis=-1), hist.shape[-1] - 1)
+    below = np.take_along_axis(cdf, bin_idx[..., None], axis=-1)[..., 0] - \
+        np.take_along_axis(hist, bin_idx[..., None], axis=-1)[..., 0]
+    in_bin = np.take_along_axis(hist, bin_idx[..., None], axis=-1)[..., 0]
+    frac = np.where(in_bin > 0, (target - below) / np.maximum(in_bin, 1), 0.0)
+    width = (hi - lo) / hist.shape[-1]
+    return lo + (bin_idx + np.clip(frac, 0, 1)) * width
+
+def summarize_branches(sim):
+    """Per-branch totals across regions as plain floats for display and JSON"""
+    if sim is None:
+        return []
+    summary = []
+    for i, title in enumerate(sim['scenarios']):
+        row = {'title': title, 'mean': float(sim['mean'][i, -1]), 'std': float(sim['std'][i, -1])}
+        for p, values in sim['percentiles'].items():
+            row[f'p{p}'] = float(values[i, -1])
+        summary.append(row)
+    return summary
@@ -0,0 +1,282 @@
+"""
+Narrative Nexus Engine - Analysis Store
+Persistent SQLite history of analyses, data profiles and simulation summaries,
+indexed by content hash, time, region and echo keyword
+
+pandas is imported by the methods that return frames, so opening the store
+(as every app start does) stays cheap.
+"""
+
+import io
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = 'nexus_history.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    text_name TEXT,
+    csv_name TEXT,
+    profile_hash TEXT,
+    top_region TEXT,
+    top_word TEXT,
+    is_echo INTEGER,
+    sentiment REAL,
+    mismatch REAL,
+    mismatch_score REAL,
+    words_analyzed INTEGER,
+    rows_analyzed INTEGER,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS analyses_top_region ON analyses (top_region);
+CREATE INDEX IF NOT EXISTS analyses_profile_hash ON analyses (profile_hash);
+
+CREATE TABLE IF NOT EXISTS echo_keywords (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    frequency INTEGER,
+    echo_strength INTEGER
+);
+CREATE INDEX IF NOT EXISTS echo_keywords_keyword ON echo_keywords (keyword, analysis_id);
+
+CREATE TABLE IF NOT EXISTS branches (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    title TEXT,
+    mean REAL,
+    std REAL,
+    p5 REAL,
+    p50 REAL,
+    p95 REAL
+);
+CREATE INDEX IF NOT EXISTS branches_analysis ON branches (analysis_id);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    content_hash TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    name TEXT,
+    n_rows INTEGER,
+    n_columns INTEGER,
+    top_region TEXT,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS profiles_created_at ON profiles (created_at);
+
+CREATE TABLE IF NOT EXISTS regions (
+    profile_hash TEXT NOT NULL REFERENCES profiles (content_hash) ON DELETE CASCADE,
+    region TEXT NOT NULL,
+    mean REAL,
+    total REAL,
+    count INTEGER,
+    std REAL
+);
+CREATE INDEX IF NOT EXISTS regions_region ON regions (region, profile_hash);
+"""
+
+LISTED_COLUMNS = [
+    'id', 'content_hash', 'kind', 'created_at', 'text_name', 'csv_name', 'top_region',
+    'top_word', 'is_echo', 'sentiment', 'mismatch_score', 'words_analyzed', 'rows_analyzed'
+]
+
+def json_default(value):
+    """numpy scalars/arrays and anything else non-JSON"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def _float(value):
+    return None if value is None or math.isnan(value) else float(value)
+
+class AnalysisStore:
+    """Embedded SQLite store shared by the UI, batch runs and NLQ history lookups"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                # Readers never block the writer, so the app and a batch run can share a file
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA foreign_keys=ON')
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ==================== ANALYSES ====================
+
+    def save_analysis(self, content_hash, result, kind='hybrid', text_name=None, csv_name=None,
+                      profile_hash=None, created_at=None):
+        """Record one analysis result (first write per content hash wins); returns its id"""
+        created_at = time.time() if created_at is None else created_at
+        row = (
+            content_hash, kind, created_at, text_name, csv_name, profile_hash,
+            result.get('top_region'), result.get('top_word'), int(bool(result.get('is_echo'))),
+            _float(result.get('sentiment')), _float(result.get('mismatch')),
+            _float(result.get('mismatch_score')), result.get('words_analyzed'),
+            result.get('rows_analyzed'), json.dumps(result, default=json_default)
+        )
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO analyses (content_hash, kind, created_at, text_name, csv_name, '
+                'profile_hash, top_region, top_word, is_echo, sentiment, mismatch, mismatch_score, '
+                'words_analyzed, rows_analyzed, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                row
+            )
+            if cursor.rowcount == 0:
+                return self._conn.execute(
+                    'SELECT id FROM analyses WHERE content_hash = ?', (content_hash,)
+                ).fetchone()[0]
+            analysis_id = cursor.lastrowid
+            self._conn.executemany(
+                'INSERT INTO echo_keywords VALUES (?, ?, ?, ?)',
+                [(analysis_id, e['keyword'], e.get('frequency'), e.get('echo_strength'))
+                 for e in result.get('echoes') or []]
+            )
+            self._conn.executemany(
+                'INSERT INTO branches VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(analysis_id, b.get('title'), _float(b.get('mean')), _float(b.get('std')),
+                  _float(b.get('p5')), _float(b.get('p50')), _float(b.get('p95')))
+                 for b in result.get('branches') or []]
+            )
+        return analysis_id
+
+    def get_analysis(self, content_hash):
+        """Stored result for a content hash, or None"""
+        rows = self._query('SELECT result FROM analyses WHERE content_hash = ?', (content_hash,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def find(self, region=None, keyword=None, since=None, kind=None, limit=50):
+        """Past analyses, newest first, filtered by region, echo keyword, time or kind
+
+        A region matches the analysis's top region or any region in its data.
+        """
+        import pandas as pd
+        clauses, params = [], []
+        if region is not None:
+            clauses.append('(a.top_region = ? OR a.profile_hash IN (SELECT profile_hash FROM regions WHERE region = ?))')
+            params += [region, region]
+        if keyword is not None:
+            clauses.append('a.id IN (SELECT analysis_id FROM echo_keywords WHERE keyword = ?)')
+            params.append(keyword.lower())
+        if since is not None:
+            clauses.append('a.created_at >= ?')
+            params.append(since)
+        if kind is not None:
+            clauses.append('a.kind = ?')
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._query(
+            f"SELECT {', '.join('a.' + c for c in LISTED_COLUMNS)} FROM analyses a {where} "
+            'ORDER BY a.created_at DESC, a.id DESC LIMIT ?',
+            params + [limit]
+        )
+        history = pd.DataFrame(rows, columns=LISTED_COLUMNS)
+        history['created_at'] = pd.to_datetime(history['created_at'], unit='s')
+        history['is_echo'] = history['is_echo'].astype(bool)
+        return history
+
+    def recent(self, limit=20):
+        return self.find(limit=limit)
+
+    def branches(self, content_hash):
+        """Stored simulation summaries of one analysis"""
+        import pandas as pd
+        rows = self._query(
+            'SELECT b.title, b.mean, b.std, b.p5, b.p50, b.p95 FROM branches b '
+            'JOIN analyses a ON a.id = b.analysis_id WHERE a.content_hash = ?',
+            (content_hash,)
+        )
+        return pd.DataFrame(rows, columns=['title', 'mean', 'std', 'p5', 'p50', 'p95'])
+
+    def top_keywords(self, since=None, limit=10):
+        """Echo keywords flagged in the most analyses"""
+        import pandas as pd
+        where, params = ('JOIN analyses a ON a.id = e.analysis_id WHERE a.created_at >= ?', [since]) \
+            if since is not None else ('', [])
+        rows = self._query(
+            f'SELECT e.keyword, COUNT(*) AS analyses, SUM(e.frequency) AS frequency FROM echo_keywords e {where} '
+            'GROUP BY e.keyword ORDER BY analyses DESC, frequency DESC LIMIT ?',
+            params + [limit]
+        )
+        return pd.DataFrame(rows, columns=['keyword', 'analyses', 'frequency'])
+
+    # ==================== PROFILES ====================
+
+    def save_profile(self, content_hash, profile, name=None, created_at=None):
+        """Record a DataProfile's summary and per-region revenue stats (once per hash)"""
+        created_at = time.time() if created_at is None else created_at
+        summary = profile.summary.to_json() if profile.summary is not None else None
+        stats = profile.region_stats
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (content_hash, created_at, name, profile.n_rows, profile.n_columns,
+                 None if profile.top_region is None else str(profile.top_region), summary)
+            )
+            if cursor.rowcount and stats is not None:
+                self._conn.executemany(
+                    'INSERT INTO regions VALUES (?, ?, ?, ?, ?, ?)',
+                    [(content_hash, str(region), _float(row['mean']), _float(row['sum']),
+                      int(row['count']), _float(row['std']))
+                     for region, row in stats.iterrows()]
+                )
+
+    def get_profile_summary(self, content_hash):
+        """Stored describe() table of a profile, or None"""
+        import pandas as pd
+        rows = self._query('SELECT summary FROM profiles WHERE content_hash = ?', (content_hash,))
+        if not rows or rows[0][0] is None:
+            return None
+        return pd.read_json(io.StringIO(rows[0][0]))
+
+    def region_history(self, region):
+        """Revenue stats of one region across every stored profile, oldest first"""
+        import pandas as pd
+        rows = self._query(
+            'SELECT p.created_at, p.name, r.mean, r.total, r.count, r.std FROM regions r '
+            'JOIN profiles p ON p.content_hash = r.profile_hash WHERE r.region = ? ORDER BY p.created_at',
+            (region,)
+        )
+        history = pd.DataFrame(rows, columns=['created_at', 'name', 'mean', 'sum', 'count', 'std'])
+        history['created_at'] = pd.to_datetime(history['created_at'], unit='s')
+        return history
+
+    def stats(self):
+        """Row counts per table"""
+        return {
+            table: self._query(f'SELECT COUNT(*) FROM {table}')[0][0]
+            for table in ('analyses', 'profiles', 'echo_keywords', 'branches', 'regions')
+        }
+
+_DEFAULT_STORE = None
+_DEFAULT_LOCK = threading.Lock()
+
+def default_store():
+    """Process-wide store at NEXUS_STORE_PATH (default nexus_history.db); None if set to ''"""
+    global _DEFAULT_STORE
+    path = os.environ.get('NEXUS_STORE_PATH', DEFAULT_STORE_PATH)
+    if not path:
+        return None
+    with _DEFAULT_LOCK:
+        if _DEFAULT_STORE is None or _DEFAULT_STORE.path != path:
+            _DEFAULT_STORE = AnalysisStore(path)
+        return _DEFAULT_STORE
@@ -0,0 +1,28 @@
+"""
+Narrative Nexus Engine - Story Branches
+Strategic paths shown after a Hybrid analysis
+"""
+
+def generate_stories(text, df):
+    """Generate 3 story branches"""
+    stories = [
+        {
+            'title': '📈 Growth Path',
+            'description': 'Focus on expansion and new opportunities',
+            'outcome': '+15-20% growth potential',
+            'risk': 'Medium (35%)'
+        },
+        {
+            'title': '🛡️ Stability Path',
+            'description': 'Maintain current operations with optimization',
+            'outcome': '+5-8% steady growth',
+            'risk': 'Low (15%)'
+        },
+        {
+            'title': '🚀 Bold Path',
+            'description': 'Aggressive transformation and innovation',
+            'outcome': '+25-35% growth potential',
+            'risk': 'High (55%)'
+        }
+    ]
+    return stories
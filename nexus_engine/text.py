@@ -0,0 +1,87 @@
+"""
+Narrative Nexus Engine - Text Analysis
+Keyword extraction, echo chamber detection and basic sentiment scoring
+"""
+
+from .cache import memoize
+from .lexicon import NEGATION_WINDOW, Lexicon
+from .tokens import as_document
+
+# ==================== LEXICONS ====================
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he',
+    'she', 'it', 'we', 'they', 'what', 'which', 'who', 'when', 'where',
+    'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more', 'most',
+    'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'same', 'so',
+    'than', 'too', 'very', 'just', 'as', 'with', 'from', 'up', 'about',
+    'out', 'if', 'because', 'by', 'down', 'through', 'during'
+}
+
+POSITIVE_WORDS = {
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'love', 'best', 'perfect', 'awesome', 'brilliant', 'outstanding',
+    'success', 'growth', 'profit', 'increase', 'boost', 'strong',
+    'opportunity', 'potential', 'promising', 'positive', 'win'
+}
+
+NEGATIVE_WORDS = {
+    'bad', 'poor', 'terrible', 'awful', 'horrible', 'worst',
+    'hate', 'fail', 'loss', 'decrease', 'decline', 'weak',
+    'risk', 'danger', 'problem', 'issue', 'negative', 'concern',
+    'difficult', 'challenge', 'struggle', 'threat'
+}
+
+SENTIMENT_LEXICON = Lexicon(
+    {**{w: 'positive' for w in POSITIVE_WORDS}, **{w: 'negative' for w in NEGATIVE_WORDS}},
+    negation_window=NEGATION_WINDOW
+)
+
+# ==================== KEYWORDS & ECHOES ====================
+
+@memoize('keywords')
+def extract_keywords(text, top_n=20):
+    """Extract top keywords from text (str or Document)"""
+    return as_document(text).keyword_counts(STOP_WORDS).most_common(top_n)
+
+def detect_echo_chambers(text):
+    """Detect echo chambers (repeated ideas/keywords)"""
+    keywords = extract_keywords(text, top_n=30)
+    echoes = []
+    for word, freq in keywords:
+        if freq >= 3:
+            echoes.append({
+                'keyword': word,
+                'frequency': freq,
+                'echo_strength': min(100, freq * 15)
+            })
+    return sorted(echoes, key=lambda x: x['frequency'], reverse=True)
+
+def detect_echo_chamber(text):
+    """Simple echo chamber detection"""
+    doc = as_document(text)
+    top_words = doc.word_counts.most_common(5)
+
+    # If top words appear very frequently, likely echo chamber
+    if top_words and top_words[0][1] > len(doc) * 0.15:
+        return True, top_words[0][0]
+    return False, None
+
+# ==================== SENTIMENT ====================
+
+def analyze_sentiment_basic(text):
+    """Basic sentiment analysis (0-100, 50 = neutral)"""
+    hits = as_document(text).lexicon_counts(SENTIMENT_LEXICON)
+    # A negated word counts toward the opposite polarity ("not good", "no problem")
+    pos_count = hits['positive', False] + hits['negative', True]
+    neg_count = hits['negative', False] + hits['positive', True]
+
+    total = pos_count + neg_count
+    if total == 0:
+        return 50
+
+    sentiment_score = (pos_count / total) * 100
+    return sentiment_score
@@ -0,0 +1,93 @@
+"""
+Narrative Nexus Engine - Timing
+Lightweight span timings per stage, aggregated into p50/p95 for diagnostics
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+MAX_SAMPLES = 1000
+
+class SpanRecorder:
+    """Wall-clock durations per named stage, keeping the last max_samples of each
+
+    Shared by every session in the process, so the percentiles describe what
+    production reruns actually cost.
+    """
+
+    def __init__(self, max_samples=MAX_SAMPLES, clock=time.perf_counter):
+        self.max_samples = max_samples
+        self.clock = clock
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as one sample of stage `name`"""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, self.clock() - start)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function (stage defaults to its name)"""
+        def decorator(fn):
+            stage = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+                self._counts[name] = 0
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+
+    def stats(self):
+        """{stage: count, p50/p95/mean/max in ms} over the retained samples"""
+        import numpy as np  # Only when timings are read, not on every timed rerun
+        with self._lock:
+            snapshot = {name: (np.array(samples), self._counts[name]) for name, samples in self._samples.items()}
+        stats = {}
+        for name in sorted(snapshot):
+            values, count = snapshot[name]
+            values = values * 1000
+            p50, p95 = np.percentile(values, [50, 95])
+            stats[name] = {
+                'count': count,
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'mean_ms': float(values.mean()),
+                'max_ms': float(values.max())
+            }
+        return stats
+
+    def to_json(self, indent=2):
+        return json.dumps({'timestamp': datetime.now().isoformat(), 'stages': self.stats()}, indent=indent)
+
+    def dump(self, path):
+        """Write the current stats as JSON"""
+        with open(path, 'w') as f:
+            f.write(self.to_json() + '\n')
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+TIMINGS = SpanRecorder()
+span = TIMINGS.span
+timed = TIMINGS.timed
@@ -0,0 +1,78 @@
+"""
+Narrative Nexus Engine - Tokenization
+One pass over a document, shared by every text analysis
+"""
+
+import re
+from collections import Counter
+from functools import cached_property
+
+from .cache import content_hash
+
+WORD_PATTERN = re.compile(r'\b[a-z]+\b')
+
+MIN_KEYWORD_LENGTH = 4
+
+class Document:
+    """Tokenized meeting notes: lowercase tokens, terms and their counts"""
+
+    def __init__(self, text):
+        self.text = text or ''
+        self.lower_text = self.text.lower()
+        # Whitespace tokens, as used by echo detection, sentiment and mismatch
+        self.words = self.lower_text.split()
+        self._keyword_counts = {}
+        self._lexicon_counts = {}
+
+    def __len__(self):
+        return len(self.words)
+
+    @cached_property
+    def fingerprint(self):
+        """Content hash of the text, the key memoized functions of this document share"""
+        return content_hash(self.text)
+
+    @cached_property
+    def word_counts(self):
+        """Frequency of each lowercase whitespace token"""
+        return Counter(self.words)
+
+    @cached_property
+    def terms(self):
+        """Alphabetic terms (the \\b[a-z]+\\b matches), derived from the tokens"""
+        terms = []
+        for word in self.words:
+            if word.isascii() and word.isalpha():
+                terms.append(word)
+            else:
+                # Whitespace is always a word boundary, so matching per token
+                # gives the same terms as matching the whole text
+                terms.extend(WORD_PATTERN.findall(word))
+        return terms
+
+    @cached_property
+    def term_counts(self):
+        """Frequency of each alphabetic term"""
+        return Counter(self.terms)
+
+    def lexicon_counts(self, lexicon):
+        """(label, negated) hit counts of a compiled Lexicon over the terms, cached per lexicon"""
+        if lexicon not in self._lexicon_counts:
+            self._lexicon_counts[lexicon] = lexicon.count(self.terms)
+        return self._lexicon_counts[lexicon]
+
+    def keyword_counts(self, stop_words):
+        """Term counts without stop words or short terms, cached per stop list"""
+        key = frozenset(stop_words)
+        if key not in self._keyword_counts:
+            self._keyword_counts[key] = Counter({
+                term: count for term, count in self.term_counts.items()
+                if term not in stop_words and len(term) >= MIN_KEYWORD_LENGTH
+            })
+        return self._keyword_counts[key]
+
+def as_document(text):
+    """Return text as a Document, tokenizing only if it is not one already"""
+    if isinstance(text, Document):
+        return text
+    return Document(text)
@@ -0,0 +1,58 @@
+"""
+Narrative Nexus Engine - Input Validation
+Input caps and health check shared by the UI and batch workers
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from .ingest import read_csv_stream
+
+MAX_WORDS = 2000
+MAX_ROWS = 1000
+MAX_QUERY_CHARS = 500
+
+def validate_text(text, max_words=MAX_WORDS):
+    """Validate text input"""
+    if not text or len(text.strip()) < 10:
+        return None
+    words = text.split()
+    if len(words) > max_words:
+        return ' '.join(words[:max_words])
+    return text
+
+def validate_csv(file, max_rows=MAX_ROWS, usecols=None):
+    """Validate CSV file, reading only the first max_rows rows"""
+    try:
+        df = read_csv_stream(file, max_rows=max_rows, usecols=usecols)
+        if df.empty or len(df.columns) < 2:
+            return None
+        return df
+    except:
+        return None
+
+def validate_text_input(text, max_words=MAX_WORDS):
+    """Validate meeting notes text (alias kept for the v1.3 API)"""
+    return validate_text(text, max_words=max_words)
+
+def validate_csv_input(df, max_rows=MAX_ROWS):
+    """Validate an already-parsed dataframe"""
+    if df is None or not isinstance(df, pd.DataFrame):
+        return None
+    if df.empty or len(df.columns) < 2:
+        return None
+    return df.head(max_rows)
+
+def validate_query_input(query, max_chars=MAX_QUERY_CHARS):
+    """Validate a natural language query"""
+    if not query or len(query.strip()) < 3:
+        return None
+    return query.strip()[:max_chars]
+
+def health_check():
+    """Health check payload for uptime monitoring"""
+    return {
+        'status': "Nexus Alive!",
+        'timestamp': datetime.now().isoformat()
+    }
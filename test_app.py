@@ -8,151 +8,18 @@ import pandas as pd
 import numpy as np
 from io import StringIO
 import sys
+import os
 
-# Mock Streamlit for testing (since we can't run Streamlit in tests)
-class MockStreamlit:
-    @staticmethod
-    def warning(msg):
-        print(f"⚠️ {msg}")
-    
-    @staticmethod
-    def error(msg):
-        print(f"❌ {msg}")
-    
-    @staticmethod
-    def success(msg):
-        print(f"✅ {msg}")
-    
-    @staticmethod
-    def info(msg):
-        print(f"ℹ️ {msg}")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Import functions from app (we'll extract them for testing)
-def extract_keywords(text, top_n=20):
-    """Extract top keywords from text."""
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
-        'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
-        'might', 'can', 'this', 'that', 'these', 'those', 'i', 'you', 'he',
-        'she', 'it', 'we', 'they', 'what', 'which', 'who', 'when', 'where',
-        'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more', 'most',
-        'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'same', 'so',
-        'than', 'too', 'very', 'just', 'as', 'with', 'from', 'up', 'about',
-        'out', 'if', 'because', 'as', 'by', 'down', 'through', 'during'
-    }
-    
-    import re
-    from collections import Counter
-    
-    words = re.findall(r'\b[a-z]+\b', text.lower())
-    words = [w for w in words if w not in stop_words and len(w) > 3]
-    word_freq = Counter(words)
-    return word_freq.most_common(top_n)
-
-def detect_echo_chambers(text):
-    """Detect echo chambers (repeated ideas/keywords)."""
-    keywords = extract_keywords(text, top_n=30)
-    echoes = []
-    for word, freq in keywords:
-        if freq >= 3:
-            echoes.append({
-                'keyword': word,
-                'frequency': freq,
-                'echo_strength': min(100, freq * 15)
-            })
-    return sorted(echoes, key=lambda x: x['frequency'], reverse=True)
-
-def analyze_sentiment_basic(text):
-    """Basic sentiment analysis."""
-    positive_words = {
-        'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
-        'love', 'best', 'perfect', 'awesome', 'brilliant', 'outstanding',
-        'success', 'growth', 'profit', 'increase', 'boost', 'strong',
-        'opportunity', 'potential', 'promising', 'positive', 'win'
-    }
-    
-    negative_words = {
-        'bad', 'poor', 'terrible', 'awful', 'horrible', 'worst',
-        'hate', 'fail', 'loss', 'decrease', 'decline', 'weak',
-        'risk', 'danger', 'problem', 'issue', 'negative', 'concern',
-        'difficult', 'challenge', 'struggle', 'threat'
-    }
-    
-    words = text.lower().split()
-    pos_count = sum(1 for w in words if w in positive_words)
-    neg_count = sum(1 for w in words if w in negative_words)
-    
-    total = pos_count + neg_count
-    if total == 0:
-        return 50
-    
-    sentiment_score = (pos_count / total) * 100
-    return sentiment_score
-
-def calculate_mismatch_score(text, df):
-    """Calculate nexus mismatch score."""
-    if df is None or df.empty:
-        return 50
-    
-    try:
-        keywords = extract_keywords(text, top_n=10)
-        text_lower = text.lower()
-        regions_in_text = []
-        
-        if 'lagos' in text_lower:
-            regions_in_text.append('Lagos')
-        if 'abuja' in text_lower:
-            regions_in_text.append('Abuja')
-        
-        if 'Region' in df.columns and 'Revenue' in df.columns:
-            region_stats = df.groupby('Region')['Revenue'].agg(['mean', 'sum', 'count'])
-            top_region = region_stats['mean'].idxmax()
-            
-            if regions_in_text and top_region not in regions_in_text:
-                mismatch = 70
-            elif regions_in_text and top_region in regions_in_text:
-                mismatch = 20
-            else:
-                mismatch = 50
-        else:
-            mismatch = 50
-        
-        return mismatch
-    except:
-        return 50
-
-def run_monte_carlo_simulation(df, bias_flip=False, n_runs=100):
-    """Run Monte Carlo simulation."""
-    if df is None or df.empty or 'Revenue' not in df.columns:
-        return None
-    
-    try:
-        revenue_data = df['Revenue'].values
-        base_mean = revenue_data.mean()
-        base_std = revenue_data.std()
-        
-        if bias_flip:
-            sim_mean = base_mean * 1.15
-            sim_std = base_std * 0.9
-        else:
-            sim_mean = base_mean
-            sim_std = base_std
-        
-        simulations = np.random.normal(sim_mean, sim_std, n_runs)
-        simulations = np.maximum(simulations, 0)
-        
-        return {
-            'simulations': simulations,
-            'mean': simulations.mean(),
-            'std': simulations.std(),
-            'min': simulations.min(),
-            'max': simulations.max(),
-            'percentile_25': np.percentile(simulations, 25),
-            'percentile_75': np.percentile(simulations, 75)
-        }
-    except:
-        return None
+# Import engine functions (no Streamlit needed)
+from nexus_engine import (
+    extract_keywords,
+    detect_echo_chambers,
+    analyze_sentiment_basic,
+    calculate_mismatch_score,
+    run_monte_carlo_simulation
+)
 
 
 class TestNarrativeNexus(unittest.TestCase):
@@ -254,6 +121,43 @@ class TestNarrativeNexus(unittest.TestCase):
         print("✅ test_simulation_improvement passed")
 
 
+class TestHybridApp(unittest.TestCase):
+    """Test the Hybrid page of the Streamlit app."""
+    
+    def click(self, at, label):
+        next(b for b in at.button if b.label == label).click()
+        return at.run()
+    
+    def test_result_survives_trip_to_dashboard(self):
+        """Test Hybrid shows the analysis again after the Dashboard cleared the uploaders."""
+        import uuid
+        from unittest import mock
+        from streamlit.testing.v1 import AppTest
+        
+        # Unique notes, so the analysis runs as a job rather than coming from the shared cache
+        notes = f"Lagos launch only. Lagos is our focus. Lagos expansion is strong. {uuid.uuid4().hex}\n" * 5
+        csv = "Region,Revenue\nLagos,5000\nAbuja,8000\nLagos,5200\nAbuja,8100\n"
+        env = {'NEXUS_WORKERS': '0', 'NEXUS_STORE_PATH': '', 'NEXUS_COLUMNAR_DIR': ''}
+        with mock.patch.dict(os.environ, env):
+            at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'),
+                                   default_timeout=120).run()
+            self.click(at, "📤 Hybrid")
+            at.file_uploader(key='txt_hybrid').upload('notes.txt', notes.encode('utf-8'), 'text/plain')
+            at.file_uploader(key='csv_hybrid').upload('sales.csv', csv.encode('utf-8'), 'text/csv')
+            at.run()
+            self.click(at, "🔍 Analyze")
+            self.assertIn("Analysis Complete!", [el.value for el in at.success])
+            self.assertIn('hybrid_job_id', at.session_state)
+            
+            self.click(at, "🏠 Dashboard")
+            self.click(at, "📤 Hybrid")
+        
+        self.assertEqual(len(at.exception), 0)
+        self.assertIn("Analysis Complete!", [el.value for el in at.success])
+        self.assertTrue(any('notes.txt' in el.value and 'sales.csv' in el.value for el in at.caption))
+        print("✅ test_result_survives_trip_to_dashboard passed")
+
+
 def run_e2e_test():
     """Run end-to-end test with sample data."""
     print("\n" + "="*60)
@@ -0,0 +1,1284 @@
+"""
+Test Suite for the Narrative Nexus analysis engine
+Tests the Streamlit-free pipeline used by the UI and batch workers
+"""
+
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from nexus_engine import (
+    analyze,
+    analyze_many,
+    analyze_upload,
+    RESULT_CACHE,
+    ResultCache,
+    content_hash,
+    fingerprint,
+    memoize,
+    read_csv_stream,
+    validate_csv,
+    generate_stories,
+    simulate_branches,
+    summarize_branches,
+    DataProfile,
+    calculate_mismatch_score,
+    load_profile_upload,
+    analyze_stream,
+    stream_document,
+    stream_profile,
+    Document,
+    extract_keywords,
+    detect_echo_chamber,
+    analyze_sentiment_basic,
+    SpanRecorder,
+    Lexicon,
+    load_gazetteer,
+    REGION_GAZETTEER,
+    IncrementalDocument,
+    analyze_incremental,
+    detect_series_echoes,
+    series_echoes_upload,
+    series_term_stats,
+    build_echo_graph,
+    cooccurrence_counts,
+    rank_echo_clusters,
+    AnalysisStore,
+    analysis_key,
+    query_history,
+    ColumnarCache,
+    load_csv_upload,
+    stream_profile_upload,
+    compact_frame,
+    AnalysisExecutor,
+    JobCancelled,
+    QueueFull,
+    analyze_upload_job,
+    report_progress,
+    JobRegistry
+)
+from nexus_engine.batch import find_pairs, run_batch
+from nexus_engine.executor import Job, default_executor
+from nexus_engine.outofcore import ReservoirSample, StreamingProfile, iter_text_chunks
+from nexus_engine.pipeline import RESULT_SCHEMA_VERSION
+from nexus_engine.validation import MAX_ROWS
+
+def slow_job(steps):
+    """Background job reporting progress every 10ms (module level so workers can unpickle it)"""
+    for i in range(steps):
+        report_progress(i / steps, f"step {i}")
+        time.sleep(0.01)
+    return steps
+
+class TestEnginePipeline(unittest.TestCase):
+    """Test analyze() and analyze_many()"""
+
+    def setUp(self):
+        """Setup test data"""
+        self.notes = """
+        Team agrees: Lagos launch only—too risky elsewhere. Sales booming urban! Skip Abuja.
+        Lagos is our focus. Urban markets are where we should invest. Lagos expansion is critical.
+        The data shows Lagos is strong. We must prioritize Lagos above all else.
+        """
+        self.df = pd.DataFrame({
+            'Region': ['Lagos', 'Abuja'] * 4,
+            'Revenue': [5000, 8000, 5100, 8100, 5200, 8200, 5300, 8300]
+        })
+
+    def test_analyze_result_shape(self):
+        """Test analyze returns every Hybrid metric"""
+        result = analyze(self.notes, self.df)
+
+        for key in ['is_echo', 'top_word', 'echoes', 'sentiment', 'mismatch', 'mismatch_score', 'stories']:
+            self.assertIn(key, result)
+        self.assertEqual(result['echoes'][0]['keyword'], 'lagos')
+        self.assertEqual(result['mismatch_score'], 20)
+        self.assertEqual(len(result['stories']), 3)
+        print("✅ test_analyze_result_shape passed")
+
+    def test_analyze_invalid_text(self):
+        """Test analyze rejects empty notes"""
+        self.assertIsNone(analyze("", self.df))
+        print("✅ test_analyze_invalid_text passed")
+
+    def test_analyze_many_preserves_order(self):
+        """Test batch analysis keeps input order"""
+        pairs = [(self.notes, self.df), ("", self.df), (self.notes, None)]
+        results = analyze_many(pairs)
+
+        self.assertEqual(len(results), 3)
+        self.assertIsNotNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2]['mismatch_score'], 50)
+        print("✅ test_analyze_many_preserves_order passed")
+
+    def test_analyze_many_reports_errors(self):
+        """Test a pair that fails is reported with its error, unlike invalid input"""
+        real = analyze
+        def flaky(text, df, n_runs):
+            if df is None:
+                raise ValueError("no data")
+            return real(text, df, n_runs=n_runs)
+        with mock.patch('nexus_engine.pipeline.analyze', side_effect=flaky):
+            results = analyze_many([(self.notes, None), ("", self.df), (self.notes, self.df)])
+
+        self.assertEqual(results[0], {'error': "ValueError: no data"})
+        self.assertIsNone(results[1])
+        self.assertNotIn('error', results[2])
+        print("✅ test_analyze_many_reports_errors passed")
+
+    def test_engine_import_is_ui_free(self):
+        """Test importing the engine loads neither Streamlit nor Plotly"""
+        code = (
+            "import sys, nexus_engine; "
+            "print(any(m.split('.')[0] in ('streamlit', 'plotly') for m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), 'False')
+        print("✅ test_engine_import_is_ui_free passed")
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+class TestResultCache(unittest.TestCase):
+    """Test the content-hash LRU/TTL result cache"""
+
+    def test_content_hash_includes_params(self):
+        """Test keys change with content and with parameters"""
+        base = content_hash(b'notes', b'csv', max_rows=1000)
+        self.assertEqual(base, content_hash(b'notes', b'csv', max_rows=1000))
+        self.assertNotEqual(base, content_hash(b'notes', b'csv', max_rows=500))
+        self.assertNotEqual(base, content_hash(b'note', b'scsv', max_rows=1000))
+        print("✅ test_content_hash_includes_params passed")
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted first"""
+        cache = ResultCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        print("✅ test_lru_eviction passed")
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        clock = FakeClock()
+        cache = ResultCache(ttl_seconds=10, clock=clock)
+        cache.set('a', 'value')
+        clock.now = 9
+        self.assertEqual(cache.get('a'), 'value')
+        clock.now = 11
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+        print("✅ test_ttl_expiry passed")
+
+    def test_memory_budget(self):
+        """Test total bytes stay under the budget"""
+        cache = ResultCache(max_bytes=200_000)
+        for i in range(10):
+            cache.set(i, np.zeros(5_000))  # 40KB each
+        self.assertLessEqual(cache.total_bytes, 200_000)
+        self.assertIsNotNone(cache.get(9))
+        self.assertIsNone(cache.get(0))
+        print("✅ test_memory_budget passed")
+
+    def test_analyze_upload_hits_cache(self):
+        """Test repeat analysis of the same upload is served from cache"""
+        cache = ResultCache()
+        notes = b"Lagos is booming. Lagos is our focus. Lagos expansion is critical for Lagos."
+        csv_data = b"Region,Revenue\nLagos,5000\nAbuja,8000\n"
+
+        first = analyze_upload(notes, csv_data, cache=cache)
+        second = analyze_upload(notes, csv_data, cache=cache)
+
+        self.assertIs(first, second)
+        self.assertEqual(first['mismatch_score'], 70)
+        self.assertEqual(cache.stats()['hits'], 1)
+        print("✅ test_analyze_upload_hits_cache passed")
+
+class TestSharedCache(unittest.TestCase):
+    """Test memoized engine functions and invalidation by content hash"""
+
+    def test_memoize_shares_results_by_content(self):
+        """Test equal arguments share one result, counted per namespace and copied out"""
+        cache = ResultCache()
+        calls = []
+
+        @memoize('words', cache=cache)
+        def words(text, limit=3):
+            calls.append(text)
+            return text.split()[:limit]
+
+        first = words("lagos abuja kano enugu")
+        first.append('mutated')
+        second = words(Document("lagos abuja kano enugu").text, limit=3)
+
+        self.assertEqual(second, ['lagos', 'abuja', 'kano'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['namespaces']['words'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        words("lagos abuja kano enugu", limit=2)
+        self.assertEqual(len(calls), 2)
+        print("✅ test_memoize_shares_results_by_content passed")
+
+    def test_fingerprints(self):
+        """Test fingerprints follow content and are absent where there is none"""
+        df = pd.DataFrame({'Region': ['Lagos', 'Abuja'], 'Revenue': [5000, 8000]})
+        csv_data = b"Region,Revenue\nLagos,5000\nAbuja,8000\n"
+        self.assertEqual(fingerprint(Document("Lagos notes")), content_hash("Lagos notes"))
+        self.assertEqual(fingerprint(('Lagos', 3)), fingerprint(('Lagos', 3)))
+        self.assertNotEqual(fingerprint(('Lagos', 3)), fingerprint(['Lagos', 3]))
+        self.assertEqual(
+            fingerprint(load_profile_upload(csv_data, cache=ResultCache())),
+            fingerprint(load_profile_upload(csv_data, cache=ResultCache()))
+        )
+        self.assertIsNone(fingerprint(df))
+        self.assertIsNone(DataProfile(df).fingerprint)
+        self.assertIsNone(stream_document(io.StringIO("Lagos notes")).fingerprint)
+        self.assertIsNone(fingerprint(object()))
+        print("✅ test_fingerprints passed")
+
+    def test_invalidate_content(self):
+        """Test dropping an upload's hash drops everything derived from it"""
+        cache = ResultCache()
+        notes = b"Lagos is booming. Lagos is our focus. Lagos expansion is critical for Lagos."
+        csv_data = b"Region,Revenue\nLagos,5000\nAbuja,8000\n"
+        other = b"Region,Revenue\nKano,100\nEnugu,200\n"
+
+        profile = load_profile_upload(csv_data, cache=cache)
+        load_profile_upload(other, cache=cache)
+        analyze_upload(notes, csv_data, cache=cache)
+        self.assertEqual(profile.source, content_hash(csv_data))
+
+        @memoize('regions', cache=cache)
+        def regions(profile):
+            return sorted(profile.df['Region'].astype(str))
+
+        self.assertEqual(regions(profile), ['Abuja', 'Lagos'])
+        before = len(cache)
+        dropped = cache.invalidate_content(content_hash(csv_data))
+
+        # csv, profile, analysis and the memoized regions; the other upload stays
+        self.assertEqual(dropped, 4)
+        self.assertEqual(len(cache), before - 4)
+        self.assertIsNotNone(cache.get(content_hash('profile', other, max_rows=MAX_ROWS, version=RESULT_SCHEMA_VERSION)))
+        self.assertEqual(cache.invalidate_content(content_hash(csv_data)), 0)
+        print("✅ test_invalidate_content passed")
+
+    def test_cheap_and_per_meeting_results_stay_out(self):
+        """Test constant stories and per-meeting notes never take shared cache entries"""
+        cache = ResultCache()
+        meetings = [(f'week{i}.txt', f"Lagos focus week {i}. Lagos growth again.".encode()) for i in range(4)]
+        series_echoes_upload(meetings, cache=cache)
+        self.assertEqual(len(cache), 1)
+
+        before = RESULT_CACHE.stats()['namespaces'].get('stories')
+        generate_stories("Lagos notes that were never seen before", None)
+        self.assertEqual(RESULT_CACHE.stats()['namespaces'].get('stories'), before)
+        print("✅ test_cheap_and_per_meeting_results_stay_out passed")
+
+class TestStreamingIngestion(unittest.TestCase):
+    """Test chunked CSV reads with early stop and projection"""
+
+    def setUp(self):
+        """Build a CSV far larger than the row cap"""
+        n = 200_000
+        df = pd.DataFrame({
+            'Region': ['Lagos', 'Abuja'] * (n // 2),
+            'Revenue': np.arange(n),
+            'Notes': ['quarterly export row'] * n
+        })
+        self.csv_bytes = df.to_csv(index=False).encode('utf-8')
+
+    def test_stops_reading_at_max_rows(self):
+        """Test only a small prefix of the upload is consumed"""
+        buf = io.BytesIO(self.csv_bytes)
+        df = read_csv_stream(buf, max_rows=1000, chunk_rows=250)
+
+        self.assertEqual(len(df), 1000)
+        self.assertEqual(df['Revenue'].iloc[-1], 999)
+        self.assertLess(buf.tell(), len(self.csv_bytes) // 4)
+        print("✅ test_stops_reading_at_max_rows passed")
+
+    def test_column_projection(self):
+        """Test usecols keeps requested columns and ignores missing ones"""
+        df = read_csv_stream(io.BytesIO(self.csv_bytes), max_rows=10, usecols=['Region', 'Revenue', 'Date'])
+        self.assertEqual(list(df.columns), ['Region', 'Revenue'])
+        print("✅ test_column_projection passed")
+
+    def test_schema_fallback(self):
+        """Test a late value that breaks the sampled schema still parses"""
+        rows = ''.join(f"{i},Lagos\n" for i in range(600)) + "12.5,Abuja\n"
+        df = read_csv_stream(io.BytesIO(("Revenue,Region\n" + rows).encode('utf-8')), sample_rows=100)
+        self.assertEqual(len(df), 601)
+        self.assertEqual(df['Revenue'].iloc[-1], 12.5)
+        print("✅ test_schema_fallback passed")
+
+    def test_validate_csv_caps_rows(self):
+        """Test validate_csv returns the capped frame and rejects bad input"""
+        self.assertEqual(len(validate_csv(io.BytesIO(self.csv_bytes))), 1000)
+        self.assertIsNone(validate_csv(io.BytesIO(b"only_one_column\n1\n2\n")))
+        self.assertIsNone(validate_csv(io.BytesIO(b"")))
+        print("✅ test_validate_csv_caps_rows passed")
+
+class TestDocumentTokenizer(unittest.TestCase):
+    """Test the shared single-pass tokenizer"""
+
+    def test_terms_match_word_pattern(self):
+        """Test terms derived from tokens equal a regex scan of the text"""
+        text = "Don't skip Lagos, LAGOS! e-mail abc123 café growth_rate Lagos."
+        doc = Document(text)
+        import re
+        self.assertEqual(doc.terms, re.findall(r'\b[a-z]+\b', text.lower()))
+        self.assertEqual(doc.term_counts['lagos'], 3)
+        print("✅ test_terms_match_word_pattern passed")
+
+    def test_analyses_accept_document(self):
+        """Test str and Document inputs give identical results"""
+        text = "Lagos is strong. Lagos growth is great but the risk is a real concern for Lagos."
+        doc = Document(text)
+
+        self.assertEqual(extract_keywords(doc, 5), extract_keywords(text, 5))
+        self.assertEqual(detect_echo_chamber(doc), detect_echo_chamber(text))
+        self.assertEqual(analyze_sentiment_basic(doc), analyze_sentiment_basic(text))
+        print("✅ test_analyses_accept_document passed")
+
+    def test_counts_are_computed_once(self):
+        """Test counters are cached on the document"""
+        doc = Document("premium premium premium budget")
+        self.assertIs(doc.word_counts, doc.word_counts)
+        self.assertIs(doc.keyword_counts({'budget'}), doc.keyword_counts({'budget'}))
+        print("✅ test_counts_are_computed_once passed")
+
+class TestLexiconMatching(unittest.TestCase):
+    """Test the compiled phrase matcher, negation and gazetteers"""
+
+    def test_multi_word_and_overlapping_phrases(self):
+        """Test phrases match on whole terms, including overlaps"""
+        gazetteer = Lexicon({'port harcourt': 'Port Harcourt', 'harcourt road': 'Harcourt Road', 'lagos': 'Lagos'})
+        doc = Document("Port Harcourt road works; Lagoslike growth, not in LAGOS.")
+        hits = doc.lexicon_counts(gazetteer)
+
+        self.assertEqual(hits['Port Harcourt', False], 1)
+        self.assertEqual(hits['Harcourt Road', False], 1)
+        self.assertEqual(hits['Lagos', False], 1)
+        self.assertEqual(len(gazetteer), 3)
+        print("✅ test_multi_word_and_overlapping_phrases passed")
+
+    def test_negation_window(self):
+        """Test negated sentiment words count toward the opposite polarity"""
+        self.assertEqual(analyze_sentiment_basic("The launch was good."), 100)
+        self.assertEqual(analyze_sentiment_basic("The launch was not good."), 0)
+        self.assertEqual(analyze_sentiment_basic("Honestly we don't see a problem here"), 100)
+        # Outside the window the negation no longer applies
+        self.assertEqual(analyze_sentiment_basic("Not that anyone asked, but good."), 100)
+        print("✅ test_negation_window passed")
+
+    def test_contraction_stems_need_t(self):
+        """Test 'won' and 'don' negate only as the stems of won't and don't"""
+        self.assertEqual(analyze_sentiment_basic("We won a great deal and strong growth this quarter"), 100)
+        self.assertEqual(analyze_sentiment_basic("Don said the launch was good"), 100)
+        self.assertEqual(analyze_sentiment_basic("We won't see great growth"), 0)
+        print("✅ test_contraction_stems_need_t passed")
+
+    def test_gazetteer_file_drives_mismatch(self):
+        """Test a loaded gazetteer with aliases replaces the built-in regions"""
+        df = pd.DataFrame({'Region': ['Kano', 'Port Harcourt'] * 3, 'Revenue': [9000, 4000] * 3})
+        text = "Everything hinges on PH. PH customers, PH stores, PH again."
+        self.assertEqual(calculate_mismatch_score(text, df), 50)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("# phrase,label\nKano\nPort Harcourt\nPH,Port Harcourt\n")
+        try:
+            gazetteer = load_gazetteer(f.name)
+        finally:
+            os.remove(f.name)
+        self.assertEqual(calculate_mismatch_score(text, df, gazetteer=gazetteer), 70)
+        self.assertEqual(calculate_mismatch_score("Kano leads", df, gazetteer=gazetteer), 20)
+        print("✅ test_gazetteer_file_drives_mismatch passed")
+
+class TestBranchSimulation(unittest.TestCase):
+    """Test the batched (scenarios x regions x runs) Monte Carlo engine"""
+
+    def setUp(self):
+        """Setup regional revenue data"""
+        rng = np.random.default_rng(3)
+        self.df = pd.DataFrame({
+            'Region': rng.choice(['Lagos', 'Abuja', 'Kano'], 300),
+            'Revenue': rng.normal(6000, 1200, 300)
+        })
+        self.stories = generate_stories("", self.df)
+
+    def test_blank_revenue_is_not_simulated(self):
+        """Test an all-NaN Revenue column gives no branches, and NaN regions are left out"""
+        blank = pd.DataFrame({'Revenue': [np.nan] * 5, 'Units': [1, 2, 3, 4, 5]})
+        self.assertIsNone(simulate_branches(blank, self.stories, n_runs=100, seed=1))
+        blank['Region'] = ['Lagos', 'Abuja'] * 2 + ['Kano']
+        self.assertIsNone(simulate_branches(blank, self.stories, n_runs=100, seed=1))
+
+        partial = self.df.copy()
+        partial.loc[partial['Region'] == 'Kano', 'Revenue'] = np.nan
+        sim = simulate_branches(partial, self.stories, n_runs=100, seed=1)
+        self.assertEqual(sorted(sim['regions'][:-1]), ['Abuja', 'Lagos'])
+        self.assertTrue(np.isfinite(sim['mean']).all())
+
+        notes = "Lagos expansion is great. Lagos market growth strong. " * 5
+        self.assertEqual(analyze(notes, blank.drop(columns='Region'))['branches'], [])
+        print("✅ test_blank_revenue_is_not_simulated passed")
+
+    def test_shape_and_determinism(self):
+        """Test one cell per branch/region (+ total) and seeded repeatability"""
+        sim = simulate_branches(self.df, self.stories, n_runs=5000, seed=11)
+        again = simulate_branches(self.df, self.stories, n_runs=5000, seed=11)
+
+        self.assertEqual(sim['mean'].shape, (3, 4))
+        self.assertEqual(sim['regions'][-1], 'All regions')
+        np.testing.assert_array_equal(sim['mean'], again['mean'])
+        print("✅ test_shape_and_determinism passed")
+
+    def test_streaming_percentiles_match_samples(self):
+        """Test histogram percentiles agree with exact percentiles of the runs"""
+        sim = simulate_branches(self.df, self.stories, n_runs=50_000, seed=5, keep_samples=True)
+        samples = sim['samples']
+
+        self.assertEqual(samples.dtype, np.float32)
+        self.assertEqual(samples.shape, (3, 3, 50_000))
+        exact = np.percentile(samples, 95, axis=2)
+        np.testing.assert_allclose(sim['percentiles'][95][:, :-1], exact, rtol=1e-3)
+        print("✅ test_streaming_percentiles_match_samples passed")
+
+    def test_riskier_branches_spread_wider(self):
+        """Test branch growth and risk shape the simulated outcomes"""
+        summary = summarize_branches(simulate_branches(self.df, self.stories, n_runs=20_000, seed=1))
+        growth, stability, bold = summary
+
+        self.assertGreater(bold['mean'], growth['mean'])
+        self.assertGreater(growth['mean'], stability['mean'])
+        self.assertGreater(bold['p95'] - bold['p5'], stability['p95'] - stability['p5'])
+        print("✅ test_riskier_branches_spread_wider passed")
+
+    def test_memory_bounded_by_cells(self):
+        """Test chunks shrink with the number of regions and estimates agree across chunk sizes"""
+        import tracemalloc
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame({'Region': [f'R{i}' for i in range(1000)] * 2, 'Revenue': rng.normal(6000, 900, 2000)})
+        stories = generate_stories("", df)
+
+        tracemalloc.start()
+        sim = simulate_branches(df, stories, n_runs=10_000, seed=2)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, 256 * 1024 ** 2)
+        self.assertEqual(sim['mean'].shape, (3, 1001))
+
+        small = simulate_branches(self.df, self.stories, n_runs=3000, seed=9)
+        chunked = simulate_branches(self.df, self.stories, n_runs=3000, seed=9, chunk_runs=700)
+        np.testing.assert_allclose(chunked['mean'], small['mean'], rtol=0.02)
+        print("✅ test_memory_bounded_by_cells passed")
+
+class TestDataProfile(unittest.TestCase):
+    """Test the once-per-upload dataframe profile"""
+
+    def setUp(self):
+        """Setup a dated regional sales frame"""
+        self.df = pd.DataFrame({
+            'Date': pd.date_range('2025-01-01', periods=60).astype(str),
+            'Region': ['Lagos', 'Abuja', 'Kano'] * 20,
+            'Revenue': [5000, 8000, 6000] * 20,
+            'Units_Sold': list(range(60))
+        })
+
+    def test_summaries_and_aggregates(self):
+        """Test describe(), region aggregates and top region"""
+        profile = DataProfile(self.df)
+
+        self.assertEqual(profile.numeric_columns, ['Revenue', 'Units_Sold'])
+        self.assertEqual(profile.summary.loc['mean', 'Revenue'], self.df['Revenue'].mean())
+        self.assertEqual(profile.region_stats.loc['Abuja', 'sum'], 8000 * 20)
+        self.assertEqual(profile.top_region, 'Abuja')
+        self.assertNotIn('Date', profile.category_columns)
+        print("✅ test_summaries_and_aggregates passed")
+
+    def test_blank_revenue_has_no_top_region(self):
+        """Test an all-NaN Revenue column gives no top region instead of failing the upload"""
+        blank = self.df.assign(Revenue=np.nan)
+        self.assertIsNone(DataProfile(blank).top_region)
+
+        notes = "Lagos expansion is great. Lagos market growth strong. " * 5
+        result = analyze(notes, blank)
+        self.assertIsNone(result['top_region'])
+        self.assertEqual(result['branches'], [])
+        print("✅ test_blank_revenue_has_no_top_region passed")
+
+    def test_date_series_and_histograms(self):
+        """Test weekly buckets and precomputed histogram bins"""
+        profile = DataProfile(self.df)
+
+        self.assertEqual(profile.date_column, 'Date')
+        self.assertEqual(profile.date_series['Revenue'].sum(), self.df['Revenue'].sum())
+        counts, edges = profile.histograms['Units_Sold']
+        self.assertEqual(counts.sum(), 60)
+        self.assertEqual(len(edges), len(counts) + 1)
+        print("✅ test_date_series_and_histograms passed")
+
+    def test_histogram_bars_size_independent_of_rows(self):
+        """Test chart payload is one bar per bin however many rows there are"""
+        big = pd.DataFrame({'Region': ['Lagos'] * 200_000, 'Revenue': np.arange(200_000.0)})
+        bars = DataProfile(big).histogram_bars('Revenue')
+
+        self.assertEqual(len(bars['x']), 30)
+        self.assertEqual(bars['y'].sum(), 200_000)
+        np.testing.assert_allclose(bars['width'], bars['width'][0])
+        self.assertIsNone(DataProfile(big).histogram_bars('Region'))
+        print("✅ test_histogram_bars_size_independent_of_rows passed")
+
+    def test_profile_shared_by_analyses(self):
+        """Test mismatch accepts a profile and uploads are profiled once"""
+        profile = DataProfile(self.df)
+        self.assertEqual(calculate_mismatch_score("Lagos only. Lagos first.", profile), 70)
+
+        cache = ResultCache()
+        data = self.df.to_csv(index=False).encode('utf-8')
+        self.assertIs(load_profile_upload(data, cache=cache), load_profile_upload(data, cache=cache))
+        self.assertIsNone(load_profile_upload(b"bad", cache=cache))
+        print("✅ test_profile_shared_by_analyses passed")
+
+    def test_cached_profile_counts_toward_budget(self):
+        """Test a cached profile is sized by its frame and summaries, not its object header"""
+        profile = DataProfile(self.df)
+        frame_bytes = int(self.df.memory_usage(deep=True).sum())
+        self.assertEqual(profile.nbytes, frame_bytes)
+        profile.group_stats
+        self.assertGreater(profile.nbytes, frame_bytes)
+
+        cache = ResultCache()
+        cache.set('profile', profile)
+        self.assertGreaterEqual(cache.total_bytes, frame_bytes)
+        streamed = stream_profile(io.BytesIO(self.df.to_csv(index=False).encode('utf-8')))
+        cache.set('streamed', streamed)
+        self.assertGreater(cache.total_bytes, profile.nbytes + streamed.memory_bytes)
+        print("✅ test_cached_profile_counts_toward_budget passed")
+
+class TestDtypeCompaction(unittest.TestCase):
+    """Test lossless downcasting of parsed uploads"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'Date': pd.date_range('2025-01-01', periods=400).astype(str),
+            'Region': rng.choice(['Lagos', 'Abuja', 'Kano', 'Port Harcourt'], 400),
+            'Revenue': rng.uniform(1000, 9000, 400).round(2),
+            'Discount': rng.choice([0.0, 0.25, 0.5], 400),
+            'Units_Sold': rng.integers(0, 500, 400),
+            'Note': [f"call {i}" for i in range(400)]
+        })
+
+    def test_compacted_dtypes_and_footprint(self):
+        """Test categorical text, narrow ints/floats and parsed dates, with fewer bytes"""
+        compacted = compact_frame(self.df)
+
+        self.assertIsInstance(compacted['Region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(compacted['Units_Sold'].dtype, np.int16)
+        self.assertEqual(compacted['Discount'].dtype, np.float32)
+        self.assertEqual(compacted['Revenue'].dtype, np.float64)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(compacted['Date']))
+        self.assertFalse(isinstance(compacted['Note'].dtype, pd.CategoricalDtype))
+
+        report = compacted.attrs['compaction']
+        self.assertLess(report['after_bytes'], report['before_bytes'])
+        self.assertEqual(set(report['dtypes']), {'Date', 'Region', 'Discount', 'Units_Sold'})
+        pd.testing.assert_frame_equal(compacted.astype({'Region': str, 'Date': str}), self.df, check_dtype=False)
+        print("✅ test_compacted_dtypes_and_footprint passed")
+
+    def test_profile_unchanged_by_compaction(self):
+        """Test aggregates over the compacted frame match the original"""
+        raw, compacted = DataProfile(self.df), DataProfile(compact_frame(self.df))
+
+        self.assertEqual(compacted.numeric_columns, raw.numeric_columns)
+        self.assertEqual(compacted.date_column, 'Date')
+        np.testing.assert_allclose(compacted.summary.to_numpy(), raw.summary.to_numpy())
+        np.testing.assert_allclose(compacted.region_stats.to_numpy(float), raw.region_stats.to_numpy(float))
+        pd.testing.assert_frame_equal(compacted.date_series, raw.date_series, check_dtype=False)
+
+        data = self.df.to_csv(index=False).encode('utf-8')
+        loaded = load_csv_upload(data, max_rows=None, cache=ResultCache())
+        self.assertEqual(loaded['Units_Sold'].dtype, np.int16)
+        self.assertGreater(loaded.attrs['compaction']['before_bytes'], loaded.attrs['compaction']['after_bytes'])
+        print("✅ test_profile_unchanged_by_compaction passed")
+
+class TestOutOfCore(unittest.TestCase):
+    """Test streaming aggregators against in-memory results"""
+
+    def setUp(self):
+        """Build a CSV and transcript larger than the default caps"""
+        rng = np.random.default_rng(8)
+        n = 30_000
+        self.df = pd.DataFrame({
+            'Date': pd.date_range('2025-01-01', periods=n, freq='h').astype(str),
+            'Region': rng.choice(['Lagos', 'Abuja', 'Kano'], n),
+            'Revenue': rng.normal(6000, 1500, n).round(2)
+        })
+        self.csv_bytes = self.df.to_csv(index=False).encode('utf-8')
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data', 'notes.txt')) as f:
+            self.text = f.read() * 50
+
+    def test_streaming_profile_is_exact(self):
+        """Test chunked aggregates equal a full in-memory profile"""
+        streamed = stream_profile(io.BytesIO(self.csv_bytes), chunk_rows=4000, reservoir_size=200)
+        full = DataProfile(self.df)
+
+        self.assertEqual(streamed.n_rows, 30_000)
+        self.assertEqual(len(streamed.df), 200)
+        pd.testing.assert_frame_equal(streamed.region_stats, full.region_stats, check_dtype=False)
+        self.assertAlmostEqual(streamed.summary.loc['std', 'Revenue'], full.summary.loc['std', 'Revenue'])
+        self.assertAlmostEqual(streamed.date_series['Revenue'].sum(), self.df['Revenue'].sum(), places=2)
+        print("✅ test_streaming_profile_is_exact passed")
+
+    def test_streaming_region_stats_exact_past_category_limit(self):
+        """Test Region revenue covers every row when there are too many regions to group by"""
+        rng = np.random.default_rng(3)
+        n = 60_000
+        df = pd.DataFrame({'Region': rng.integers(0, 60, n).astype(str), 'Revenue': rng.normal(100, 10, n)})
+        df.loc[df['Region'] == '7', 'Revenue'] += 50
+        streamed = stream_profile(io.BytesIO(df.to_csv(index=False).encode('utf-8')), chunk_rows=5000)
+
+        self.assertNotIn('Region', streamed.group_stats)
+        self.assertEqual(streamed.region_stats['count'].sum(), n)
+        self.assertEqual(len(streamed.region_stats), 60)
+        self.assertEqual(str(streamed.top_region), '7')
+        print("✅ test_streaming_region_stats_exact_past_category_limit passed")
+
+    def test_streaming_region_std_with_large_integer_revenue(self):
+        """Test integer revenue squares summed across chunks don't overflow int64"""
+        rng = np.random.default_rng(4)
+        n = 800_000
+        df = pd.DataFrame({'Region': rng.choice(['Lagos', 'Abuja'], n),
+                           'Revenue': rng.integers(4_000_000, 6_000_000, n)})
+        streamed = StreamingProfile(df.iloc[i:i + 200_000] for i in range(0, n, 200_000))
+
+        expected = df.groupby('Region')['Revenue'].std()
+        np.testing.assert_allclose(streamed.region_stats['std'].loc[expected.index], expected, rtol=1e-6)
+        np.testing.assert_allclose(streamed.summary.loc['std', 'Revenue'], df['Revenue'].std(), rtol=1e-6)
+        print("✅ test_streaming_region_std_with_large_integer_revenue passed")
+
+    def test_streaming_document_matches_document(self):
+        """Test merged chunk counters equal one-shot tokenization"""
+        streamed = stream_document(self.text, chunk_chars=1000)
+        doc = Document(self.text)
+
+        self.assertEqual(len(streamed), len(doc))
+        self.assertEqual(extract_keywords(streamed, 10), extract_keywords(doc, 10))
+        self.assertEqual(analyze_sentiment_basic(streamed), analyze_sentiment_basic(doc))
+        self.assertEqual(streamed.lexicon_counts(REGION_GAZETTEER), doc.lexicon_counts(REGION_GAZETTEER))
+        self.assertGreater(streamed.lexicon_counts(REGION_GAZETTEER)['Lagos', False], 0)
+        print("✅ test_streaming_document_matches_document passed")
+
+    def test_text_chunks_keep_tokens_whole(self):
+        """Test chunk boundaries never split a word"""
+        text = "alpha beta gamma delta " * 100
+        chunks = list(iter_text_chunks(text, chunk_chars=7))
+        self.assertEqual(' '.join(''.join(chunks).split()), ' '.join(text.split()))
+        self.assertEqual(sum(len(c.split()) for c in chunks), 400)
+        print("✅ test_text_chunks_keep_tokens_whole passed")
+
+    def test_reservoir_sample_bounded(self):
+        """Test the reservoir never exceeds its size and covers late rows"""
+        sample = ReservoirSample(100, seed=2)
+        for start in range(0, 10_000, 1000):
+            sample.add(pd.DataFrame({'i': np.arange(start, start + 1000)}))
+        frame = sample.frame()
+        self.assertEqual(len(frame), 100)
+        self.assertGreater(frame['i'].max(), 5000)
+        print("✅ test_reservoir_sample_bounded passed")
+
+    def test_analyze_stream_covers_everything(self):
+        """Test full-data analysis reports complete coverage"""
+        result = analyze_stream(self.text, io.BytesIO(self.csv_bytes), n_runs=1000)
+
+        self.assertEqual(result['rows_analyzed'], 30_000)
+        self.assertGreater(result['words_analyzed'], 2000)
+        self.assertFalse(result['rows_capped'])
+        self.assertEqual(result['echoes'][0]['keyword'], 'lagos')
+        print("✅ test_analyze_stream_covers_everything passed")
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    """Test appended notes are folded in without re-tokenizing the whole document"""
+
+    def setUp(self):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data', 'notes.txt')) as f:
+            self.text = f.read() * 3 + " We don't see a problem. Not good for Lagos"
+
+    def test_appends_match_full_tokenization(self):
+        """Test counts after arbitrary appends equal one-shot tokenization"""
+        rng = np.random.default_rng(13)
+        full = Document(self.text)
+        for _ in range(20):
+            cuts = sorted(rng.choice(np.arange(1, len(self.text)), size=5, replace=False)) + [len(self.text)]
+            doc, start = IncrementalDocument(), 0
+            for cut in cuts:
+                self.assertTrue(doc.extends(self.text[:cut]))
+                doc.append(self.text[start:cut])
+                start = cut
+
+            self.assertEqual(len(doc), len(full))
+            self.assertEqual(doc.word_counts, full.word_counts)
+            self.assertEqual(extract_keywords(doc, 10), extract_keywords(full, 10))
+            self.assertEqual(analyze_sentiment_basic(doc), analyze_sentiment_basic(full))
+            self.assertEqual(+doc.lexicon_counts(REGION_GAZETTEER), +full.lexicon_counts(REGION_GAZETTEER))
+        print("✅ test_appends_match_full_tokenization passed")
+
+    def test_lineage_reuses_or_restarts(self):
+        """Test an append is incremental and an edit starts the lineage over"""
+        lineages = ResultCache()
+        first = analyze_incremental('weekly.txt', self.text, None, n_runs=0, lineages=lineages)
+        self.assertFalse(first['incremental'])
+
+        appended = self.text + " Lagos again and again. Lagos."
+        second = analyze_incremental('weekly.txt', appended, None, n_runs=0, lineages=lineages)
+        self.assertTrue(second['incremental'])
+        self.assertEqual(second['new_chars'], len(appended) - len(self.text))
+        self.assertEqual(second['echoes'], analyze(appended, None, n_runs=0, max_words=10 ** 6)['echoes'])
+
+        edited = analyze_incremental('weekly.txt', "Edited. " + self.text, None, n_runs=0, lineages=lineages)
+        self.assertFalse(edited['incremental'])
+        self.assertEqual(edited['words_analyzed'], len(Document("Edited. " + self.text)))
+        print("✅ test_lineage_reuses_or_restarts passed")
+
+class TestMeetingSeries(unittest.TestCase):
+    """Test echo detection across a series of meetings"""
+
+    def setUp(self):
+        """Twelve meetings: 'lagos' grows every week, 'budget' stays flat, 'kano' appears once"""
+        self.meetings = [
+            "Weekly review of budget and hiring plans. " * 3 + "lagos " * (week + 1) + ("kano" if week == 5 else "")
+            for week in range(12)
+        ]
+
+    def test_growing_term_is_an_echo(self):
+        """Test a recurring, growing term is flagged and flat or rare terms are not"""
+        echoes = detect_series_echoes(self.meetings, labels=[f"week{w:02d}" for w in range(12)])
+        keywords = [e['keyword'] for e in echoes]
+
+        self.assertEqual(keywords[0], 'lagos')
+        self.assertNotIn('budget', keywords)
+        self.assertNotIn('kano', keywords)
+        self.assertEqual(echoes[0]['meetings'], 12)
+        self.assertEqual(echoes[0]['first_seen'], 'week00')
+        self.assertEqual(echoes[0]['echo_strength'], 100)
+        print("✅ test_growing_term_is_an_echo passed")
+
+    def test_vectorized_stats_match_per_document_counts(self):
+        """Test sparse-matrix stats equal a direct per-meeting computation"""
+        stats = series_term_stats(self.meetings)
+        shares = np.array([Document(m).term_counts['lagos'] / len(Document(m)) for m in self.meetings])
+        slope = np.polyfit(np.arange(12), shares, 1)[0]
+
+        self.assertEqual(stats.loc['lagos', 'frequency'], sum(range(1, 13)))
+        self.assertAlmostEqual(stats.loc['lagos', 'mean_share'], shares.mean())
+        self.assertAlmostEqual(stats.loc['lagos', 'share_trend'], slope)
+        self.assertNotIn('kano', stats.index)
+        self.assertEqual(detect_series_echoes([]), [])
+        print("✅ test_vectorized_stats_match_per_document_counts passed")
+
+class TestEchoGraph(unittest.TestCase):
+    """Test the keyword co-occurrence graph and its clusters"""
+
+    def test_window_counts(self):
+        """Test pairs are counted only within the window, once per distinct partner"""
+        terms = "lagos lagos growth filler filler filler abuja".split()
+        counts = cooccurrence_counts(terms, {'lagos', 'growth', 'abuja'}, window=3)
+        self.assertEqual(counts, {('growth', 'lagos'): 1})
+        counts = cooccurrence_counts(terms, {'lagos', 'growth', 'abuja'}, window=5)
+        self.assertEqual(counts, {('growth', 'lagos'): 1, ('abuja', 'growth'): 1})
+        print("✅ test_window_counts passed")
+
+    def test_graph_and_clusters(self):
+        """Test edges are pruned to the strongest and clusters rank by centrality"""
+        text = ("lagos market booming lagos market growth. " * 10 +
+                "abuja revenue strong abuja revenue steady. " * 5 + "kano")
+        graph = build_echo_graph(text, window=3, max_edges=3)
+
+        self.assertLessEqual(graph.number_of_edges(), 3)
+        self.assertTrue(graph.has_edge('lagos', 'market'))
+        self.assertEqual(graph.nodes['lagos']['frequency'], 20)
+        self.assertEqual(graph.nodes['kano']['centrality'], 0.0)
+        self.assertAlmostEqual(sum(c for _, c in graph.nodes(data='centrality')), 1.0)
+        pagerank = nx.pagerank(graph.edge_subgraph(graph.edges), weight='weight')
+        self.assertAlmostEqual(graph.nodes['lagos']['centrality'], pagerank['lagos'])
+        self.assertGreater(graph.nodes['lagos']['centrality'], graph.nodes['booming']['centrality'])
+
+        clusters = rank_echo_clusters(graph)
+        self.assertIn('lagos', clusters[0]['terms'])
+        self.assertGreaterEqual(clusters[0]['centrality'], clusters[-1]['centrality'])
+        self.assertFalse(any('kano' in cluster['terms'] for cluster in clusters))
+        self.assertEqual(rank_echo_clusters(build_echo_graph("")), [])
+        print("✅ test_graph_and_clusters passed")
+
+class TestAnalysisStore(unittest.TestCase):
+    """Test the persistent SQLite analysis history"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'history.db')
+        self.store = AnalysisStore(self.path)
+        self.text = b"Lagos expansion. Lagos market. Lagos team focus on Lagos customers. " * 5
+        self.csv = pd.DataFrame({
+            'Region': ['Lagos', 'Abuja'] * 5,
+            'Revenue': [5000.0, 8000.0] * 5
+        }).to_csv(index=False).encode('utf-8')
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_results_survive_restart(self):
+        """Test a stored analysis is served after the in-memory cache is gone"""
+        first = analyze_upload(self.text, self.csv, cache=ResultCache(), store=self.store,
+                               text_name='notes.txt', csv_name='sales.csv')
+        self.store.close()
+
+        reopened = AnalysisStore(self.path)
+        key = analysis_key(self.text, self.csv)
+        self.assertEqual(reopened.get_analysis(key)['mismatch_score'], first['mismatch_score'])
+        again = analyze_upload(self.text, self.csv, cache=ResultCache(), store=reopened)
+        self.assertEqual(again['echoes'], first['echoes'])
+        self.assertEqual(reopened.stats()['analyses'], 1)
+        self.assertEqual(len(reopened.branches(key)), 3)
+        self.store = reopened
+        print("✅ test_results_survive_restart passed")
+
+    def test_results_of_older_engine_are_recomputed(self):
+        """Test history stored under another result version is a miss, not a stale hit"""
+        with mock.patch('nexus_engine.pipeline.RESULT_SCHEMA_VERSION', RESULT_SCHEMA_VERSION - 1):
+            old_key = analysis_key(self.text, self.csv)
+            analyze_upload(self.text, self.csv, cache=ResultCache(), store=self.store)
+        self.store.save_analysis(old_key, {'echoes': [], 'mismatch_score': -1.0})
+
+        result = analyze_upload(self.text, self.csv, cache=ResultCache(), store=self.store)
+        self.assertNotEqual(analysis_key(self.text, self.csv), old_key)
+        self.assertNotEqual(result['mismatch_score'], -1.0)
+        self.assertEqual(self.store.stats()['analyses'], 2)
+        print("✅ test_results_of_older_engine_are_recomputed passed")
+
+    def test_find_by_region_keyword_and_time(self):
+        """Test indexed lookups by region, echo keyword and upload time"""
+        analyze_upload(self.text, self.csv, cache=ResultCache(), store=self.store, text_name='week1.txt')
+        self.store.save_analysis('old', {'echoes': [{'keyword': 'kano', 'frequency': 4}], 'top_region': 'Kano'},
+                                 created_at=1_000_000)
+
+        self.assertEqual(list(self.store.find(region='Abuja')['text_name']), ['week1.txt'])
+        self.assertEqual(list(self.store.find(keyword='Lagos')['text_name']), ['week1.txt'])
+        self.assertEqual(list(self.store.find(region='Kano')['content_hash']), ['old'])
+        self.assertEqual(len(self.store.find(since=2_000_000)), 1)
+        self.assertEqual(self.store.region_history('Abuja')['mean'].iloc[0], 8000.0)
+        self.assertEqual(self.store.top_keywords(limit=1)['keyword'].iloc[0], 'lagos')
+
+        history = query_history("Why does the team keep talking about Lagos?", self.store)
+        self.assertEqual(list(history['text_name']), ['week1.txt'])
+        self.assertIsNone(query_history("Anything about Ibadan?", self.store))
+        print("✅ test_find_by_region_keyword_and_time passed")
+
+class TestColumnarUploads(unittest.TestCase):
+    """Test the memory-mapped Arrow copies of uploaded CSVs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.columnar = ColumnarCache(self.tmp.name, batch_rows=7)
+        self.df = pd.DataFrame({
+            'Region': ['Lagos', 'Abuja', 'Kano', 'Lagos', 'Ibadan', 'Abuja'] * 4,
+            'Category': ['A', 'B'] * 12,
+            'Revenue': np.arange(24, dtype=float) * 100,
+            'Units_Sold': np.arange(24)
+        })
+        self.csv = self.df.to_csv(index=False).encode('utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_converted_once_and_reloaded(self):
+        """Test a reload reads the Arrow file with the CSV's rows and categorical Region/Category"""
+        first = load_csv_upload(self.csv, max_rows=10, cache=ResultCache(), columnar=self.columnar)
+        again = load_csv_upload(self.csv, max_rows=10, cache=ResultCache(), columnar=self.columnar)
+        stats = self.columnar.stats()
+        self.assertEqual((stats['files'], stats['conversions'], stats['loads']), (1, 1, 2))
+
+        self.assertIsInstance(again['Region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(again['Region'].cat.categories), sorted(self.df['Region'].head(10).unique()))
+        expected = validate_csv(io.BytesIO(self.csv), max_rows=10)
+        pd.testing.assert_frame_equal(again.astype({'Region': str, 'Category': str}),
+                                      expected.astype({'Region': str, 'Category': str}), check_dtype=False)
+        pd.testing.assert_frame_equal(first, again)
+        self.assertIsNone(self.columnar.load(b'only_one_column\n1\n'))
+        print("✅ test_converted_once_and_reloaded passed")
+
+    def test_streamed_profile_matches_csv(self):
+        """Test the full-data profile over Arrow batches equals the one over CSV chunks"""
+        from_arrow = stream_profile_upload(self.csv, cache=ResultCache(), columnar=self.columnar)
+        from_csv = stream_profile_upload(self.csv, cache=ResultCache())
+        self.assertEqual(from_arrow.n_rows, 24)
+        self.assertEqual(from_arrow.top_region, from_csv.top_region)
+        self.assertEqual(list(from_arrow.region_stats.index.astype(str)), list(from_csv.region_stats.index))
+        np.testing.assert_allclose(from_arrow.region_stats.to_numpy(float), from_csv.region_stats.to_numpy(float))
+        print("✅ test_streamed_profile_matches_csv passed")
+
+    def test_broken_cache_falls_back_to_csv(self):
+        """Test a valid upload still parses when the cache directory is unusable"""
+        not_a_dir = os.path.join(self.tmp.name, 'file')
+        open(not_a_dir, 'w').close()
+        broken = ColumnarCache(not_a_dir)
+
+        df = load_csv_upload(self.csv, cache=ResultCache(), columnar=broken)
+        self.assertEqual(len(df), 24)
+        self.assertIsNone(load_csv_upload(b'only_one_column\n1\n', cache=ResultCache(), columnar=broken))
+        profile = stream_profile_upload(self.csv, cache=ResultCache(), columnar=broken)
+        self.assertEqual(profile.n_rows, 24)
+        with self.assertRaises(OSError):
+            broken.load(self.csv)
+        print("✅ test_broken_cache_falls_back_to_csv passed")
+
+    def test_prunes_least_recently_used(self):
+        """Test the directory stays within its byte budget"""
+        self.columnar.max_bytes = 1
+        self.columnar.load(self.csv)
+        self.columnar.load(self.csv, max_rows=5)
+        self.assertEqual(self.columnar.stats()['files'], 1)
+        print("✅ test_prunes_least_recently_used passed")
+
+class TestBatchScoring(unittest.TestCase):
+    """Test headless scoring of a directory of TXT/CSV pairs"""
+
+    def setUp(self):
+        """Two stem-matched pairs, one folder pair and a text-only file"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        notes = "Lagos expansion. Lagos market. Lagos team focus on Lagos customers. " * 5
+        sales = pd.DataFrame({'Region': ['Lagos', 'Abuja'] * 5, 'Revenue': np.arange(10) * 100.0 + 5000})
+        for name in ('team_a', 'team_b'):
+            with open(os.path.join(self.root, f'{name}.txt'), 'w') as f:
+                f.write(notes)
+            sales.to_csv(os.path.join(self.root, f'{name}.csv'), index=False)
+        os.makedirs(os.path.join(self.root, 'kano'))
+        with open(os.path.join(self.root, 'kano', 'notes.txt'), 'w') as f:
+            f.write(notes)
+        sales.to_csv(os.path.join(self.root, 'kano', 'sales.csv'), index=False)
+        with open(os.path.join(self.root, 'orphan.txt'), 'w') as f:
+            f.write(notes)
+        self.output = os.path.join(self.root, 'results.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_pairs(self):
+        """Test pairing by stem, by folder, and text-only leftovers"""
+        pairs = {pair_id: csv_path for pair_id, _, csv_path in find_pairs(self.root)}
+        self.assertEqual(set(pairs), {'team_a.txt', 'team_b.txt', os.path.join('kano', 'notes.txt'), 'orphan.txt'})
+        self.assertTrue(pairs['team_a.txt'].endswith('team_a.csv'))
+        self.assertTrue(pairs[os.path.join('kano', 'notes.txt')].endswith('sales.csv'))
+        self.assertIsNone(pairs['orphan.txt'])
+        print("✅ test_find_pairs passed")
+
+    def test_run_batch_writes_jsonl_and_resumes(self):
+        """Test every pair becomes one JSONL record and a rerun skips them"""
+        counts = run_batch(self.root, self.output, workers=1, n_runs=100)
+        self.assertEqual(counts['ok'], 4)
+
+        with open(self.output) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 4)
+        team_a = next(r for r in records if r['pair_id'] == 'team_a.txt')
+        self.assertEqual(team_a['result']['echoes'][0]['keyword'], 'lagos')
+        self.assertEqual(team_a['result']['rows_analyzed'], 10)
+
+        # Simulate an interrupted write, then resume
+        with open(self.output, 'a') as f:
+            f.write('{"pair_id": "torn')
+        counts = run_batch(self.root, self.output, workers=1, n_runs=100)
+        self.assertEqual(counts.get('ok', 0), 0)
+        self.assertEqual(counts['resumed'], 4)
+        with open(self.output) as f:
+            self.assertEqual(len(f.readlines()), 4)
+        print("✅ test_run_batch_writes_jsonl_and_resumes passed")
+
+class TestBackgroundJobs(unittest.TestCase):
+    """Test the bounded process pool running analyses off the script thread"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = AnalysisExecutor(workers=1, max_pending=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def wait_until(self, condition, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.02)
+
+    def test_job_matches_inline_analysis(self):
+        """Test a worker returns the same result as analyze_upload, with progress to 100%"""
+        text = b"Lagos expansion. Lagos market. Lagos team focus on Lagos customers. " * 5
+        csv = pd.DataFrame({'Region': ['Lagos', 'Abuja'] * 5, 'Revenue': [5000.0, 8000.0] * 5}) \
+            .to_csv(index=False).encode('utf-8')
+        job = self.executor.submit(analyze_upload_job, text, csv)
+        result = job.result(timeout=60)
+
+        inline = analyze_upload(text, csv, cache=ResultCache())
+        self.assertEqual(result['mismatch_score'], inline['mismatch_score'])
+        self.assertEqual(result['branches'], inline['branches'])
+        self.assertEqual(job.status(), 'done')
+        self.assertEqual(job.progress(), (1.0, 'Done'))
+        print("✅ test_job_matches_inline_analysis passed")
+
+    def test_bounded_queue_and_cancel(self):
+        """Test a full queue rejects work and cancelled jobs stop, queued or running"""
+        running = self.executor.submit(slow_job, 3000)
+        self.wait_until(lambda: running.progress()[0] > 0)
+        queued = self.executor.submit(slow_job, 10)
+        with self.assertRaises(QueueFull):
+            self.executor.submit(slow_job, 10)
+
+        queued.cancel()
+        running.cancel()
+        with self.assertRaises(JobCancelled):
+            running.result(timeout=30)
+        with self.assertRaises(JobCancelled):
+            queued.result(timeout=30)
+        self.assertEqual((running.status(), queued.status()), ('cancelled', 'cancelled'))
+        self.wait_until(lambda: self.executor.stats()['in_flight'] == 0)
+        self.assertEqual(self.executor.submit(slow_job, 1).result(timeout=30), 1)
+        print("✅ test_bounded_queue_and_cancel passed")
+
+    def test_late_cancel_spares_job_reusing_the_slot(self):
+        """Test cancelling a job whose slot was released doesn't stop the next job in it"""
+        first = self.executor.submit(slow_job, 1)
+        self.assertEqual(first.result(timeout=30), 1)
+        self.wait_until(lambda: self.executor.stats()['in_flight'] == 0)
+        second = self.executor.submit(slow_job, 300)
+        self.wait_until(lambda: second.progress()[0] > 0)
+
+        # The first job's handle still looks in flight, as it would mid-race
+        stale = Future()
+        stale.set_running_or_notify_cancel()
+        for slot in range(self.executor.max_pending):
+            self.executor.cancel(Job(first.id, slot, stale, self.executor))
+        self.assertEqual(second.result(timeout=30), 300)
+        print("✅ test_late_cancel_spares_job_reusing_the_slot passed")
+
+    def test_dead_worker_fails_its_job_and_pool_recovers(self):
+        """Test a killed worker fails its job, returns its slot, and later jobs run on a fresh pool"""
+        executor = AnalysisExecutor(workers=1, max_pending=2)
+        try:
+            running = executor.submit(slow_job, 3000)
+            self.wait_until(lambda: running.progress()[0] > 0)
+            for process in list(executor._pool._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+
+            with self.assertRaises(BrokenProcessPool):
+                running.result(timeout=30)
+            self.assertEqual(running.status(), 'failed')
+            self.wait_until(lambda: executor.stats()['in_flight'] == 0)
+            for _ in range(3):
+                self.assertEqual(executor.submit(slow_job, 1).result(timeout=60), 1)
+            self.assertEqual(executor.stats()['in_flight'], 0)
+        finally:
+            executor.shutdown()
+        print("✅ test_dead_worker_fails_its_job_and_pool_recovers passed")
+
+    def test_default_executor_shuts_down_replaced_pool(self):
+        """Test changing NEXUS_WORKERS shuts down the executor it replaces"""
+        with mock.patch.dict(os.environ, {'NEXUS_WORKERS': '1'}):
+            first = default_executor()
+            self.assertIs(default_executor(), first)
+        with mock.patch.object(first, 'shutdown') as shutdown, \
+                mock.patch.dict(os.environ, {'NEXUS_WORKERS': '2'}):
+            second = default_executor()
+        shutdown.assert_called_once_with(wait=False)
+        self.assertEqual(second.workers, 2)
+
+        with mock.patch.object(second, 'shutdown') as shutdown, \
+                mock.patch.dict(os.environ, {'NEXUS_WORKERS': '0'}):
+            self.assertIsNone(default_executor())
+        shutdown.assert_called_once_with(wait=False)
+        print("✅ test_default_executor_shuts_down_replaced_pool passed")
+
+class TestAnalysisJobs(unittest.TestCase):
+    """Test job ids that outlive reruns and are shared by input hash"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = AnalysisExecutor(workers=1, max_pending=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_deduplicated_by_input_key(self):
+        """Test a second session asking for the same input joins the running job"""
+        cache = ResultCache()
+        jobs = JobRegistry(executor=self.executor, cache=cache)
+        first = jobs.submit('key-a', slow_job, 30, label='notes.txt')
+        second = jobs.submit('key-a', slow_job, 30)
+        other = jobs.submit('key-b', slow_job, 1)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertIn(jobs.status(first)['status'], ('queued', 'running'))
+        self.assertEqual(jobs.result(first, timeout=30), 30)
+        self.assertEqual(jobs.status(first)['status'], 'done')
+        self.assertEqual(jobs.status(first)['label'], 'notes.txt')
+        self.assertEqual(cache.get('key-a'), 30)
+        self.assertEqual(jobs.submit('key-a', slow_job, 30), first)
+        self.assertIsNone(jobs.status('missing'))
+        print("✅ test_deduplicated_by_input_key passed")
+
+    def test_cancel_and_resubmit(self):
+        """Test a cancelled job is not reused and its result is never cached"""
+        cache = ResultCache()
+        jobs = JobRegistry(executor=self.executor, cache=cache)
+        job_id = jobs.submit('key-c', slow_job, 3000)
+        jobs.cancel(job_id)
+
+        self.assertEqual(jobs.status(job_id)['status'], 'cancelled')
+        with self.assertRaises(JobCancelled):
+            jobs.result(job_id)
+        again = jobs.submit('key-c', slow_job, 1)
+        self.assertNotEqual(again, job_id)
+        self.assertEqual(jobs.result(again, timeout=30), 1)
+        print("✅ test_cancel_and_resubmit passed")
+
+    def test_cancel_detaches_one_follower(self):
+        """Test a shared job keeps running until its last follower cancels"""
+        jobs = JobRegistry(executor=self.executor, cache=ResultCache())
+        job_id = jobs.submit('key-f', slow_job, 3000, follower='session-1')
+        self.assertEqual(jobs.submit('key-f', slow_job, 3000, follower='session-2'), job_id)
+        self.assertEqual(jobs.status(job_id)['followers'], 2)
+
+        self.assertFalse(jobs.cancel(job_id, follower='session-1'))
+        self.assertIn(jobs.status(job_id)['status'], ('queued', 'running'))
+        self.assertEqual(jobs.submit('key-f', slow_job, 3000, follower='session-3'), job_id)
+        self.assertFalse(jobs.cancel(job_id, follower='session-2'))
+        self.assertTrue(jobs.cancel(job_id, follower='session-3'))
+        self.assertEqual(jobs.status(job_id)['status'], 'cancelled')
+        print("✅ test_cancel_detaches_one_follower passed")
+
+    def test_inline_without_executor(self):
+        """Test jobs run synchronously with no pool, and failures are reported then retried"""
+        jobs = JobRegistry(executor=None, cache=ResultCache())
+        job_id = jobs.submit('key-d', slow_job, 2)
+        self.assertEqual(jobs.status(job_id)['status'], 'done')
+        self.assertEqual(jobs.result(job_id), 2)
+
+        failed = jobs.submit('key-e', int, 'not a number')
+        self.assertEqual(jobs.status(failed)['status'], 'failed')
+        self.assertIn('ValueError', jobs.status(failed)['error'])
+        self.assertNotEqual(jobs.submit('key-e', int, '7'), failed)
+        print("✅ test_inline_without_executor passed")
+
+class TestSpanTimings(unittest.TestCase):
+    """Test stage timing spans and their percentiles"""
+
+    def test_span_percentiles(self):
+        """Test spans record durations and report p50/p95 in ms"""
+        clock = FakeClock()
+        timings = SpanRecorder(clock=clock)
+        for ms in range(1, 101):
+            with timings.span('solo.profile'):
+                clock.now += ms / 1000
+
+        stats = timings.stats()['solo.profile']
+        self.assertEqual(stats['count'], 100)
+        self.assertAlmostEqual(stats['p50_ms'], 50.5)
+        self.assertAlmostEqual(stats['p95_ms'], 95.05)
+        self.assertAlmostEqual(stats['max_ms'], 100)
+        print("✅ test_span_percentiles passed")
+
+    def test_timed_decorator_and_json(self):
+        """Test decorated calls are timed even when they raise, and dump as JSON"""
+        timings = SpanRecorder(max_samples=3)
+
+        @timings.timed('hybrid')
+        def stage(fail=False):
+            if fail:
+                raise ValueError("bad upload")
+            return 'done'
+
+        self.assertEqual(stage(), 'done')
+        with self.assertRaises(ValueError):
+            stage(fail=True)
+        for _ in range(5):
+            stage()
+
+        report = json.loads(timings.to_json())
+        self.assertEqual(report['stages']['hybrid']['count'], 7)
+        self.assertEqual(len(timings._samples['hybrid']), 3)
+        timings.reset()
+        self.assertEqual(timings.stats(), {})
+        print("✅ test_timed_decorator_and_json passed")
+
+class TestBenchmarks(unittest.TestCase):
+    """Test the benchmark harness report and comparison"""
+
+    def test_report_and_compare(self):
+        """Test a tiny run produces timings and flags slowdowns"""
+        from benchmarks.bench_engine import run_benchmarks, compare_reports
+        from benchmarks.inputs import generate_notes, parse_size
+
+        self.assertEqual(parse_size('10KB'), 10 * 1024)
+        self.assertEqual(len(generate_notes(2048).encode('utf-8')), 2048)
+
+        report = run_benchmarks(['1KB'], ['extract_keywords', 'analyze'], min_time=0, max_repeats=1)
+        self.assertEqual([r['function'] for r in report['results']], ['extract_keywords', 'analyze'])
+        self.assertGreater(report['results'][0]['min_s'], 0)
+
+        slower = {'results': [dict(r, min_s=r['min_s'] * 2) for r in report['results']]}
+        rows = compare_reports(slower, report)
+        self.assertTrue(all(row['regression'] for row in rows))
+        print("✅ test_report_and_compare passed")
+
+    def test_cold_import_is_light(self):
+        """Test importing the engine package loads none of the data stack until a name is used"""
+        from benchmarks.bench_startup import run_startup, time_target
+
+        report = run_startup(['import_nexus_engine'], repeats=1)
+        self.assertEqual(report['results'][0]['modules'], [])
+        _, modules = time_target('from nexus_engine import default_store, span, timed, TIMINGS', repeats=1)
+        self.assertEqual(modules, [])
+        _, modules = time_target('from nexus_engine import analyze', repeats=1)
+        self.assertIn('pandas', modules)
+
+        import nexus_engine
+        self.assertIn('analyze', dir(nexus_engine))
+        with self.assertRaises(AttributeError):
+            nexus_engine.not_an_export
+        print("✅ test_cold_import_is_light passed")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
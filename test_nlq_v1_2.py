@@ -10,29 +10,17 @@ from datetime import datetime
 import sys
 import os
 
-# Import app functions
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Mock streamlit for testing
-class MockStreamlit:
-    @staticmethod
-    def set_page_config(**kwargs):
-        pass
-    
-    @staticmethod
-    def markdown(text, **kwargs):
-        pass
-    
-    @staticmethod
-    def write(text):
-        pass
-
-sys.modules['streamlit'] = MockStreamlit()
-
-# Now we can import the functions we need to test
-from app import (
+# Import engine functions (no Streamlit needed)
+from nexus_engine import (
     parse_nlq_intent,
+    parse_nlq_intents,
+    IntentIndex,
+    QueryCache,
+    normalize_query,
     generate_mock_df,
+    iter_mock_chunks,
     generate_nlq_insights,
     generate_nlq_stories,
     calculate_nlq_score,
@@ -42,6 +30,7 @@ from app import (
     calculate_mismatch_score,
     run_monte_carlo_simulation
 )
+from nexus_engine.intent_model import load_intent_rows, make_pipeline, train_intent_model
 
 class TestNLQMode(unittest.TestCase):
     """Test NLQ Mode functionality"""
@@ -114,6 +103,44 @@ class TestNLQMode(unittest.TestCase):
         self.assertLess(df['Revenue'].iloc[0], df['Revenue'].iloc[-1])
         print("✅ test_generate_mock_df_forecast passed")
     
+    def test_generate_mock_df_is_deterministic_and_chunked(self):
+        """Test mock data depends only on the seed, never on the chunk size"""
+        query_data = {'intent': 'bias_check'}
+        df = generate_mock_df(query_data, n_rows=1001, seasonality=0.2, regions=['A', 'B'])
+        chunks = list(iter_mock_chunks(query_data, n_rows=1001, seasonality=0.2, regions=['A', 'B'], chunk_rows=100))
+        
+        self.assertEqual(len(chunks), 11)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+        pd.testing.assert_frame_equal(generate_mock_df(query_data, n_rows=1001, seasonality=0.2, regions=['A', 'B']), df)
+        self.assertFalse(generate_mock_df(query_data, n_rows=1001, seed=7)['Revenue'].equals(df['Revenue']))
+        
+        # The first region is the one the team focuses on: flat while the other grows
+        flat = generate_mock_df(query_data, n_rows=1001, regions=['A', 'B'])
+        means = flat.groupby('Region', observed=True)['Revenue'].agg(['first', 'last'])
+        self.assertAlmostEqual(means.loc['A', 'last'] / means.loc['A', 'first'], 1.0, delta=0.1)
+        self.assertGreater(means.loc['B', 'last'] / means.loc['B', 'first'], 1.4)
+        print("✅ test_generate_mock_df_is_deterministic_and_chunked passed")
+    
+    def test_generate_mock_df_sizes(self):
+        """Test empty and 10M-row mock datasets, with the row interval shortened to fit"""
+        self.assertEqual(len(generate_mock_df({'intent': 'forecast'}, n_rows=0)), 0)
+        df = generate_mock_df({'intent': 'forecast'}, n_rows=200_000, freq='1min')
+        self.assertEqual(len(df), 200_000)
+        self.assertEqual(df['Date'].iloc[-1] - df['Date'].iloc[0], pd.Timedelta(minutes=199_999))
+        
+        # 10M days would pass pandas' last date (2262), so the default steps by the minute
+        chunks = iter_mock_chunks({'intent': 'forecast'}, n_rows=10_000_000)
+        first = next(chunks)
+        n_rows, last = len(first), first
+        for last in chunks:
+            n_rows += len(last)
+        self.assertEqual(n_rows, 10_000_000)
+        self.assertEqual(last['Date'].iloc[-1] - first['Date'].iloc[0], pd.Timedelta(minutes=9_999_999))
+        self.assertGreater(last['Revenue'].iloc[-1], first['Revenue'].iloc[0])
+        with self.assertRaises(ValueError):
+            generate_mock_df({'intent': 'forecast'}, n_rows=10_000_000, freq='1D')
+        print("✅ test_generate_mock_df_sizes passed")
+    
     def test_generate_nlq_insights_sales_issue(self):
         """Test insights generation for sales issue"""
         query_data = {'intent': 'sales_issue', 'key_terms': [], 'sentiment': 'negative', 'query': ''}
@@ -295,6 +322,83 @@ class TestNLQEdgeCases(unittest.TestCase):
         self.assertIn(result['sentiment'], ['positive', 'negative', 'neutral'])
         print("✅ test_mixed_sentiment_query passed")
 
+class TestNLQIntentEngine(unittest.TestCase):
+    """Test the indexed intent rules and the optional trained model"""
+    
+    def test_index_scores_every_intent_in_one_pass(self):
+        """Test the inverted index counts votes, sentiment and key terms together"""
+        index = IntentIndex({'a_intent': ['alpha', 'shared'], 'b_intent': ['beta', 'shared']},
+                            positive={'good'}, negative={'bad', 'beta'})
+        scores, balance, key_terms = index.scores("shared beta beta good alpha zeta".split())
+        
+        self.assertEqual(scores, [2, 3])
+        self.assertEqual(balance, -1)
+        self.assertEqual(key_terms, ['shared', 'beta', 'good', 'alpha', 'zeta'])
+        self.assertEqual(index.classify("shared")['intent'], 'a_intent')  # ties go to the earlier intent
+        self.assertEqual(index.classify("nothing here")['intent'], 'general_advice')
+        print("✅ test_index_scores_every_intent_in_one_pass passed")
+    
+    def test_batch_matches_single(self):
+        """Test batch parsing without a model equals one-by-one parsing"""
+        queries, _ = load_intent_rows()
+        self.assertEqual(parse_nlq_intents(queries), [parse_nlq_intent(q) for q in queries])
+        print("✅ test_batch_matches_single passed")
+    
+    @unittest.skipIf(make_pipeline is None, "scikit-learn not installed")
+    def test_model_labels_rule_less_queries(self):
+        """Test the trained model fills in queries no keyword rule matched"""
+        model = train_intent_model()
+        queries = ["Are we overlooking the suburban market?", "Revenue slumped badly in Kano",
+                   "How do I hire a chef?"]
+        parsed = parse_nlq_intents(queries, model=model)
+        
+        self.assertEqual(parse_nlq_intent(queries[0])['intent'], 'general_advice')
+        self.assertEqual(parsed[0]['intent'], 'bias_check')
+        self.assertEqual(parsed[1]['intent'], 'sales_issue')
+        self.assertEqual(parsed[2]['intent'], 'general_advice')
+        print("✅ test_model_labels_rule_less_queries passed")
+
+class TestNLQQueryCache(unittest.TestCase):
+    """Test answers are reused for repeated and reworded questions"""
+    
+    def test_normalized_key_ignores_case_order_and_stop_words(self):
+        """Test questions differing only in wording noise share one key"""
+        key = normalize_query("Sales dropping in rural areas")
+        self.assertEqual(key, 'sales_issue|areas dropping rural sales')
+        self.assertEqual(normalize_query("Why are RURAL areas' sales dropping?"), key)
+        self.assertNotEqual(normalize_query("Sales dropping in urban areas"), key)
+        print("✅ test_normalized_key_ignores_case_order_and_stop_words passed")
+    
+    def test_exact_and_near_hits_skip_compute(self):
+        """Test rewordings hit, different questions miss, and the counters add up"""
+        cache = QueryCache()
+        calls = []
+        compute = lambda: calls.append(1) or {'stories': len(calls)}
+        
+        self.assertEqual(cache.get_or_compute("Sales dropping in rural areas", compute)[1], 'miss')
+        self.assertEqual(cache.get_or_compute("Why are sales dropping in rural areas?", compute)[1], 'exact')
+        answer, kind, matched = cache.get_or_compute("Why did rural area sales drop?", compute)
+        self.assertEqual((answer, kind, matched), ({'stories': 1}, 'near', "Sales dropping in rural areas"))
+        self.assertEqual(cache.get_or_compute("Sales dropping in urban areas", compute)[1], 'miss')
+        self.assertEqual(cache.get_or_compute("Is the team too focused on rural areas?", compute)[1], 'miss')
+        
+        self.assertEqual(len(calls), 3)
+        stats = cache.stats()
+        self.assertEqual((stats['exact_hits'], stats['near_hits'], stats['misses']), (1, 1, 3))
+        self.assertAlmostEqual(stats['hit_rate'], 0.4)
+        print("✅ test_exact_and_near_hits_skip_compute passed")
+    
+    def test_evicted_questions_stop_matching(self):
+        """Test the near-duplicate index stays bounded with the answers"""
+        cache = QueryCache(max_entries=2)
+        for query in ["Sales dropping in rural areas", "Forecast growth next quarter", "Any bias toward Lagos?"]:
+            cache.store(query, {'query': query})
+        
+        self.assertEqual(cache.stats()['questions'], 2)
+        self.assertEqual(cache.lookup("Why did rural area sales drop?")[1], 'miss')
+        self.assertEqual(cache.lookup("Forecast growth next quarter")[1], 'exact')
+        print("✅ test_evicted_questions_stop_matching passed")
+
 def run_tests():
     """Run all tests"""
     print("=" * 70)
@@ -308,6 +412,8 @@ def run_tests():
     # Add tests
     suite.addTests(loader.loadTestsFromTestCase(TestNLQMode))
     suite.addTests(loader.loadTestsFromTestCase(TestNLQEdgeCases))
+    suite.addTests(loader.loadTestsFromTestCase(TestNLQIntentEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestNLQQueryCache))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -12,16 +12,7 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Mock streamlit
-class MockStreamlit:
-    session_state = {}
-    def set_page_config(**kwargs): pass
-    def markdown(text, **kwargs): pass
-    def write(text): pass
-
-sys.modules['streamlit'] = MockStreamlit()
-
-from app import (
+from nexus_engine import (
     parse_nlq_intent, generate_mock_df, generate_nlq_insights,
     generate_nlq_stories, calculate_nlq_score, detect_echo_chambers,
     analyze_sentiment_basic, calculate_mismatch_score, extract_keywords,